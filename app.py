@@ -16,11 +16,14 @@ signal.signal = _safe_signal
 os.environ["CREWAI_TELEMETRY_OPT_OUT"] = "true"
 
 import streamlit as st
-import sys
-import io
-from src.main_crew import GryphonEngine
 from src.ui.auth import render_login
+from src.ui.cache import get_client, get_engine
 from src.ui.portfolio import render_portfolio_dashboard
+from src.ui.progress import ProgressView
+from src.ui.jobs import submit_job, render_analysis_jobs
+from src.utils.progress import ProgressEvent
+from src.utils.events import configure_event_logger, event_user, log_event
+from src.utils.tracing import serve_metrics
 
 # Page Config
 st.set_page_config(page_title="Gryphon AI Info", page_icon="🦁", layout="wide")
@@ -28,10 +31,26 @@ st.set_page_config(page_title="Gryphon AI Info", page_icon="🦁", layout="wide"
 # Enable Tracing
 os.environ["CREWAI_TRACING_ENABLED"] = "true"
 
+# Build the engine, its LLM clients and a set of agents once per server process
+try:
+    get_engine()
+except Exception as e:
+    print(f"Engine warm-up skipped: {e}")
+
+# Prometheus metrics of this server process (tool, task and LLM spans) at :GRYPHON_METRICS_PORT/metrics
+if os.getenv("GRYPHON_METRICS_PORT"):
+    try:
+        serve_metrics(int(os.getenv("GRYPHON_METRICS_PORT")))
+    except OSError as e:
+        print(f"Metrics endpoint not started: {e}")
+
 # Authentication Check
 user = render_login()
 
 if user:
+    # Events are buffered in memory and written to public.events in the background
+    configure_event_logger(get_client())
+
     # Sidebar Profile Info
     with st.sidebar:
         st.write(f"👤 **{user.email}**")
@@ -55,55 +74,67 @@ if user:
         with st.sidebar:
             st.header("Analysis Config")
             tickers_input = st.text_input("Stock Tickers (comma-separated)", value="AAPL, TSLA").upper()
+            background = st.toggle("Run in background", value=True,
+                                   help="Queue the analyses on the worker pool; they keep running if you leave or reload the page.")
+            max_concurrency = st.slider("Parallel Analyses", min_value=1, max_value=8, value=3, disabled=background)
             run_btn = st.button("Run Analysis Engine")
 
         # Main Area
-        if run_btn:
-            if not tickers_input:
-                st.error("Please enter at least one ticker.")
-            else:
-                # Parse tickers
-                tickers = [t.strip() for t in tickers_input.split(",") if t.strip()]
+        if run_btn and not tickers_input:
+            st.error("Please enter at least one ticker.")
+        elif background:
+            if run_btn:
+                # One job per ticker; a ticker still pending from an earlier click is not queued again
+                submitted = st.session_state.setdefault("analysis_jobs", [])
+                for ticker in dict.fromkeys(t.strip() for t in tickers_input.split(",") if t.strip()):
+                    submitted.append(submit_job("analysis", {"ticker": ticker}, user_id=user.id).id)
+            render_analysis_jobs(user.id, st.session_state.get("analysis_jobs", []))
+        elif run_btn:
+            # Parse tickers
+            tickers = list(dict.fromkeys(t.strip() for t in tickers_input.split(",") if t.strip()))
+            
+            st.write(f"**Analyzing {len(tickers)} assets:** {', '.join(tickers)}")
+            
+            status = st.status(f"Generative Analysis: {len(tickers)} tickers", expanded=False)
+            view = ProgressView(tickers)
+            results_area = st.container()
+            
+            failed = 0
+            try:
+                engine = get_engine()
                 
-                st.write(f"**Analyzing {len(tickers)} assets:** {', '.join(tickers)}")
-                
-                for ticker in tickers:
-                    with st.status(f"Generative Analysis: {ticker}", expanded=True) as status:
-                        st.write("Initializing Agents...")
-                        
-                        # Capture stdout
-                        log_capture = io.StringIO()
-                        original_stdout = sys.stdout
-                        sys.stdout = log_capture
+                # Progress events and results stream in as they happen; one failure does not stop the batch
+                with event_user(user.id):
+                    for item in engine.stream_many(tickers, max_concurrency=max_concurrency):
+                        if isinstance(item, ProgressEvent):
+                            view.handle(item)
+                            continue
                         
-                        try:
-                            engine = GryphonEngine(ticker)
-                            
-                            # Note: To show "granular" progress inside the agent run, we'd need a custom callback.
-                            # For now, we show "Busy".
-                            
-                            st.write("Engine Started...")
-                            result = engine.run()
-                            st.write("Analysis Complete.")
-                            status.update(label=f"Completed: {ticker}", state="complete", expanded=False)
-                            
-                        except Exception as e:
-                            st.error(f"Error analyzing {ticker}: {str(e)}")
-                            status.update(label=f"Failed: {ticker}", state="error")
-                            result = f"Error: {str(e)}"
+                        if item.ok:
+                            result = item.output
+                        else:
+                            failed += 1
+                            st.error(f"Error analyzing {item.ticker}: {item.error}")
+                            result = f"Error: {item.error}"
                         
-                        finally:
-                            # Reset stdout
-                            sys.stdout = original_stdout
-                            logs = log_capture.getvalue()
-
-                    # Display Results for this ticker
-                    st.markdown(f"## 📊 Verdict: {ticker}")
-                    st.markdown(result)
-                    with st.expander(f"View Agent Logs ({ticker})"):
-                        st.code(logs)
-                        
-                    st.divider()
+                        # Display Results for this ticker
+                        with results_area:
+                            st.markdown(f"## 📊 Verdict: {item.ticker}")
+                            st.markdown(str(result))
+                            st.divider()
+                
+                if failed:
+                    status.update(label=f"Completed with {failed} failure(s)", state="error")
+                else:
+                    status.update(label=f"Completed: {', '.join(tickers)}", state="complete")
+            
+            except Exception as e:
+                st.error(f"Error starting the engine: {str(e)}")
+                log_event("ERROR", user_id=user.id, source="engine", message=str(e))
+                status.update(label="Failed", state="error")
+            
+            with st.expander("View Agent Activity"):
+                st.markdown("  \n".join(view.log) or "No activity recorded.")
 
         else:
             st.info("Select tickers in the sidebar and click 'Run Analysis Engine'.")
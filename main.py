@@ -1,23 +1,54 @@
+import argparse
 import sys
-from src.main_crew import GryphonEngine
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Run the Gryphon investment committee on one or more stock tickers.",
+    )
+    parser.add_argument("tickers", nargs="*", metavar="TICKER", help="Tickers to analyze concurrently")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report the import cost of each module and exit")
+    parser.add_argument("--top", type=int, default=25, help="Modules listed per phase with --profile-startup")
+    return parser.parse_args(argv)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <TICKER>")
+    args = parse_args()
+
+    if args.profile_startup:
+        from src.utils.startup_profile import startup_report
+        print(startup_report(top=args.top))
+        return
+
+    if not args.tickers:
+        print("Usage: python main.py <TICKER> [<TICKER> ...]")
         sys.exit(1)
-        
-    ticker = sys.argv[1]
-    print(f"--- Running Gryphon for {ticker} ---")
-    
+
+    tickers = [t.upper() for t in args.tickers]
+    print(f"--- Running Gryphon for {', '.join(tickers)} ---")
+
+    # Heavy dependencies (crewai, langchain, yfinance) load from here on
+    from src.main_crew import GryphonEngine
+
     try:
-        engine = GryphonEngine(ticker)
-        result = engine.run()
-        print("\n\n########################")
-        print("## FINAL RECOMMENDATION ##")
-        print("########################\n")
-        print(result)
+        engine = GryphonEngine()
     except Exception as e:
         print(f"Error: {e}")
+        sys.exit(1)
+
+    failed = 0
+    for item in engine.run_many(tickers):
+        print("\n\n########################")
+        print(f"## FINAL RECOMMENDATION: {item.ticker} ##")
+        print("########################\n")
+        if item.ok:
+            print(item.output)
+        else:
+            failed += 1
+            print(f"Error: {item.error}")
+
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,30 @@ from src.utils.db import get_supabase
 # Page Config (Independent of main app.py)
 st.set_page_config(page_title="Gryphon Admin", page_icon="🛡️", layout="wide")
 
+def count_rows(supabase, table: str) -> int:
+    """Row count without downloading rows (HEAD request, count only)."""
+    res = supabase.table(table).select("id", count="exact", head=True).execute()
+    return res.count or 0
+
+def fetch_stats(supabase) -> dict:
+    """Totals for the key metrics, aggregated by `public.admin_stats()` in Postgres."""
+    try:
+        rows = supabase.rpc("admin_stats").execute().data
+        if rows:
+            return rows[0]
+    except Exception:
+        pass  # Function not installed yet (older schema.sql): fall back to count-only queries
+    return {
+        "total_users": count_rows(supabase, "profiles"),
+        "total_portfolios": count_rows(supabase, "portfolios"),
+        "total_positions": count_rows(supabase, "positions"),
+    }
+
+def fetch_portfolio_growth(supabase) -> pd.DataFrame:
+    """One row per day with new and cumulative portfolio counts, from `public.portfolio_growth_daily()`."""
+    rows = supabase.rpc("portfolio_growth_daily").execute().data
+    return pd.DataFrame(rows, columns=["day", "new_portfolios", "total_portfolios"])
+
 def render_admin():
     supabase = get_supabase()
     
@@ -13,18 +37,11 @@ def render_admin():
     
     # 1. Fetch Stats
     try:
-        # Users (Since we can't query auth.users directly easily without service role in client, 
-        # we'll query the public.profiles table we setup)
-        users_res = supabase.table("profiles").select("*", count="exact").execute()
-        total_users = users_res.count if users_res.count is not None else len(users_res.data)
-        
-        # Portfolios
-        port_res = supabase.table("portfolios").select("*", count="exact").execute()
-        total_portfolios = port_res.count if port_res.count is not None else len(port_res.data)
-        
-        # Positions (to estimate AUM or Activity)
-        pos_res = supabase.table("positions").select("*", count="exact").execute()
-        total_positions = pos_res.count if pos_res.count is not None else len(pos_res.data)
+        # Users come from the public.profiles table (auth.users is not readable from the client)
+        stats = fetch_stats(supabase)
+        total_users = stats["total_users"]
+        total_portfolios = stats["total_portfolios"]
+        total_positions = stats["total_positions"]
         
     except Exception as e:
         st.error(f"Error fetching stats: {str(e)}")
@@ -43,19 +60,15 @@ def render_admin():
     # 3. Recent Activity (Visuals)
     st.subheader("System Health & Activity")
     
-    # Mock some data if 'events' table is empty/not populated fully yet
-    # In a real app, we'd query the 'period' from an 'events' table.
-    # For now, let's visualize the portfolio growth or something if we had timestamps.
-    
-    if port_res.data:
-        df_port = pd.DataFrame(port_res.data)
-        if "created_at" in df_port.columns:
-            df_port["created_at"] = pd.to_datetime(df_port["created_at"])
-            df_port["date"] = df_port["created_at"].dt.date
-            daily_growth = df_port.groupby("date").size().cumsum().reset_index(name="count")
-            
-            fig = px.line(daily_growth, x="date", y="count", title="Portfolio Growth Over Time")
-            st.plotly_chart(fig, use_container_width=True)
+    try:
+        daily_growth = fetch_portfolio_growth(supabase)
+    except Exception as e:
+        st.warning(f"Portfolio growth unavailable (apply the latest schema.sql): {str(e)}")
+        daily_growth = pd.DataFrame()
+
+    if not daily_growth.empty:
+        fig = px.line(daily_growth, x="day", y="total_portfolios", title="Portfolio Growth Over Time")
+        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No data to visualize yet.")
 
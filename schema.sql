@@ -50,12 +50,19 @@ create policy "Users can manage own portfolio positions." on public.positions fo
 create table public.reports (
   id uuid default uuid_generate_v4() primary key,
   portfolio_id uuid references public.portfolios(id) on delete cascade,
+  content_hash text, -- sha256 of the positions + market-data as-of date (see src/portfolio/reports.py)
+  risk_profile text, -- set on rows holding an advisor plan
   risk_metrics jsonb, -- {beta: 1.2, volatility: 0.15, ...}
   llm_summary text,
   rebalance_recommendation text,
   created_at timestamp with time zone default timezone('utc'::text, now())
 );
 
+-- Migration: deployments created before these columns existed run the three statements below (safe to re-run)
+alter table public.reports add column if not exists content_hash text;
+alter table public.reports add column if not exists risk_profile text;
+create index if not exists reports_content_hash_idx on public.reports (portfolio_id, content_hash, created_at desc);
+
 alter table public.reports enable row level security;
 create policy "Users can view own reports." on public.reports for select using (
   exists ( select 1 from public.portfolios where id = reports.portfolio_id and user_id = auth.uid() )
@@ -80,7 +87,51 @@ create policy "Admins can view all events" on public.events for select using (
     -- Let's allow insert for authenticated users (logging their actions)
     auth.uid() = user_id
 );
-create policy "Users can log events" on public.events for insert with check (auth.uid() = user_id);
+-- Signed-in clients may also log system events that belong to no user (e.g. tool calls)
+create policy "Users can log events" on public.events for insert with check (
+  auth.uid() = user_id or (user_id is null and auth.uid() is not null)
+);
+create index if not exists events_created_at_idx on public.events (created_at);
+
+-- 6. ADMIN AGGREGATES (computed in Postgres so the admin page downloads a few rows, not whole tables)
+-- Both run with the caller's permissions, so row level security still applies.
+create index if not exists portfolios_created_at_idx on public.portfolios (created_at);
+
+create or replace function public.admin_stats()
+returns table (total_users bigint, total_portfolios bigint, total_positions bigint)
+language sql stable as $$
+  select
+    (select count(*) from public.profiles),
+    (select count(*) from public.portfolios),
+    (select count(*) from public.positions);
+$$;
+
+create or replace function public.portfolio_growth_daily()
+returns table (day date, new_portfolios bigint, total_portfolios bigint)
+language sql stable as $$
+  select
+    (created_at at time zone 'utc')::date as day,
+    count(*) as new_portfolios,
+    sum(count(*)) over (order by (created_at at time zone 'utc')::date)::bigint as total_portfolios
+  from public.portfolios
+  group by 1
+  order by 1;
+$$;
+
+-- 7. HELD TICKER SETS (input of the nightly precompute, src/jobs/nightly.py)
+-- Returns only the distinct sets of tickers held together, never who holds them,
+-- so it runs as the owner to see every portfolio.
+create or replace function public.held_ticker_sets()
+returns table (tickers text[])
+language sql stable security definer set search_path = public as $$
+  select distinct array_agg(distinct upper(ticker) order by upper(ticker))
+  from public.positions
+  group by portfolio_id;
+$$;
+
+-- Reads every user's positions, so only the backend (service role) may call it
+revoke execute on function public.held_ticker_sets() from public, anon, authenticated;
+grant execute on function public.held_ticker_sets() to service_role;
 
 -- Trigger to create profile on signup
 create or replace function public.handle_new_user() 
@@ -0,0 +1,201 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple
+from dotenv import load_dotenv
+
+from ..utils.progress import ProgressRoute, bind_route, unbind_route, route_for, with_progress
+
+load_dotenv()
+
+# crewai, langchain and the tools behind the agents are imported when the first
+# client or agent is built, not when this module is imported.
+
+def build_llm(temperature: float = 0):
+    """Creates the Gemini chat client (with the local response cache attached)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from ..utils.llm_cache import get_llm_cache
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    model_name = os.getenv("GOOGLE_MODEL_NAME", "gemini-1.5-flash")
+
+    if not api_key:
+        print("Warning: GOOGLE_API_KEY not found in .env")
+
+    return ChatGoogleGenerativeAI(model=model_name, temperature=temperature, google_api_key=api_key, cache=get_llm_cache())
+
+CONTEXT_WINDOW = 128_000  # Tokens; CrewAI summarizes the history beyond 75% of it
+
+_adapter_class = None
+
+def as_crewai_llm(chat_model):
+    """
+    Wraps a LangChain chat model in CrewAI's own LLM interface.
+
+    Recent CrewAI versions convert any LLM that is not theirs into a LiteLLM
+    client, which would drop the model's response cache and callbacks (token
+    streaming, spans). The adapter is kept as is and calls the LangChain model
+    itself. Versions without `BaseLLM` call LangChain models directly, so the
+    model is returned unchanged there.
+    """
+    global _adapter_class
+    try:
+        from crewai import BaseLLM
+    except ImportError:
+        return chat_model
+
+    if _adapter_class is None:
+        from langchain_core.messages import convert_to_messages
+
+        class LangChainLLM(BaseLLM):
+            def __init__(self, chat_model):
+                name = getattr(chat_model, "model", None) or getattr(chat_model, "model_name", None) or "langchain"
+                super().__init__(model=str(name), temperature=getattr(chat_model, "temperature", None))
+                self.chat_model = chat_model
+
+            def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+                if isinstance(messages, str):
+                    messages = [{"role": "user", "content": messages}]
+                stop = getattr(self, "stop", None) or None
+                return self.chat_model.invoke(convert_to_messages(messages), stop=stop).content
+
+            def supports_function_calling(self) -> bool:
+                return False  # Tools are used through CrewAI's ReAct prompts
+
+            def supports_stop_words(self) -> bool:
+                return True
+
+            def get_context_window_size(self) -> int:
+                return CONTEXT_WINDOW
+
+        _adapter_class = LangChainLLM
+    return _adapter_class(chat_model)
+
+def agent_llm(llm, route: ProgressRoute, name: str):
+    """The LLM for one pooled agent: its own traced copy of `llm`, in CrewAI's interface."""
+    return as_crewai_llm(with_progress(llm, route, name))
+
+class CrewAgents(NamedTuple):
+    scout: object
+    analyst: object
+    risk: object
+    strategist: object
+    route: ProgressRoute  # Progress events of the run holding this set
+
+    @property
+    def tools(self) -> list:
+        return [tool for agent in self[:4] for tool in (agent.tools or [])]
+
+class AgentPool:
+    """
+    Process-wide pool of ready-made agents sharing long-lived LLM clients.
+
+    The LLM clients are built once and reused, so their HTTP connections (and TLS
+    sessions) are kept across analyses. Agent sets are checked out exclusively for
+    one crew run and returned afterwards; up to `max_idle` sets are kept warm.
+    Each set has its own ProgressRoute, which its tools and its agents' (shallow)
+    LLM copies report to; every agent has its own copy so LLM calls are traced
+    per agent (see `agent_llm`).
+    """
+
+    def __init__(self, llm=None, advisor_llm=None, max_idle: int = 8):
+        self._llm = llm
+        self._advisor_llm = advisor_llm
+        self.max_idle = max_idle
+        self._crews: queue.LifoQueue = queue.LifoQueue()
+        self._advisors: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self):
+        with self._lock:
+            if self._llm is None:
+                self._llm = build_llm(temperature=0)
+            return self._llm
+
+    @property
+    def advisor_llm(self):
+        with self._lock:
+            if self._advisor_llm is None:
+                self._advisor_llm = build_llm(temperature=0.2)
+            return self._advisor_llm
+
+    def _build_crew_agents(self) -> CrewAgents:
+        from .factory import ScoutAgent, AnalystAgent, RiskAgent, StrategistAgent
+
+        route = ProgressRoute()
+        agents = CrewAgents(
+            scout=ScoutAgent(agent_llm(self.llm, route, "Scout")).create(),
+            analyst=AnalystAgent(agent_llm(self.llm, route, "Analyst")).create(),
+            risk=RiskAgent(agent_llm(self.llm, route, "Risk")).create(),
+            strategist=StrategistAgent(agent_llm(self.llm, route, "Strategist")).create(),
+            route=route,
+        )
+        bind_route(agents.tools, route)
+        return agents
+
+    def _build_advisor(self):
+        from .factory import AdvisorAgent
+
+        # The Advisor's route only carries the trace of its rebalancing run (see `advisor_route`)
+        route = ProgressRoute()
+        agent = AdvisorAgent(agent_llm(self.advisor_llm, route, "Advisor")).create()
+        bind_route([agent], route)
+        return agent
+
+    @staticmethod
+    def _checkout(idle: queue.LifoQueue, build):
+        try:
+            return idle.get_nowait()
+        except queue.Empty:
+            return build()
+
+    def _checkin(self, idle: queue.LifoQueue, item) -> bool:
+        if idle.qsize() < self.max_idle:
+            idle.put(item)
+            return True
+        return False
+
+    @contextmanager
+    def crew_agents(self) -> Iterator[CrewAgents]:
+        """Checks out a Scout/Analyst/Risk/Strategist set for one crew run."""
+        agents = self._checkout(self._crews, self._build_crew_agents)
+        try:
+            yield agents
+        finally:
+            if not self._checkin(self._crews, agents):
+                unbind_route(agents.tools)
+
+    @contextmanager
+    def advisor(self):
+        """Checks out an Advisor agent for one rebalancing run."""
+        agent = self._checkout(self._advisors, self._build_advisor)
+        try:
+            yield agent
+        finally:
+            if not self._checkin(self._advisors, agent):
+                unbind_route([agent])
+
+    @staticmethod
+    def advisor_route(agent) -> ProgressRoute:
+        """The ProgressRoute of a pooled Advisor agent."""
+        return route_for(agent) or ProgressRoute()
+
+    def warm(self, crews: int = 1, advisors: int = 1):
+        """Builds the LLM clients and enough idle agents up front (e.g. at app startup)."""
+        while self._crews.qsize() < min(crews, self.max_idle):
+            self._crews.put(self._build_crew_agents())
+        while self._advisors.qsize() < min(advisors, self.max_idle):
+            self._advisors.put(self._build_advisor())
+
+_pool: AgentPool | None = None
+_pool_lock = threading.Lock()
+
+def get_agent_pool() -> AgentPool:
+    """Returns the process-wide AgentPool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AgentPool()
+        return _pool
@@ -0,0 +1,68 @@
+"""
+Deterministic LangChain chat model for offline runs of the crew.
+
+Every call sleeps `latency` seconds (standing in for the model round trip),
+streams its answer word by word to the callbacks, and returns a ReAct-style
+final answer derived from a hash of the prompt, so the same prompt always gets
+the same response. Token usage is estimated like tool outputs (`estimate_tokens`).
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from ..tools.formatting import estimate_tokens
+
+VERDICTS = ("BUY", "SELL", "HOLD")
+_TICKER = re.compile(r"\b(?:for|on|in) ([A-Z][A-Z0-9.\-]{0,9})\b")
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.5
+    response_words: int = 120
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "gryphon-fake"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"latency": self.latency, "response_words": self.response_words}
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def respond(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode()).digest()
+        match = _TICKER.search(prompt)
+        subject = match.group(1) if match else "the position"
+        verdict = VERDICTS[digest[0] % len(VERDICTS)]
+        filler = " ".join(f"point{b % 97}" for b in (digest * (self.response_words // len(digest) + 1))[:self.response_words])
+        return (f"Thought: I now know the final answer\n"
+                f"Final Answer: VERDICT: {verdict} on {subject}.\nRationale: {filler}")
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None,
+                  **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        with self._lock:
+            self._calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        text = self.respond(prompt)
+        if run_manager:
+            for word in text.split(" "):
+                run_manager.on_llm_new_token(word + " ")
+
+        usage = {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"token_usage": usage})
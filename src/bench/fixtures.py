@@ -0,0 +1,260 @@
+"""
+Offline stand-ins for the market data, news and search providers.
+
+Fixtures live in a directory:
+
+    <dir>/<TICKER>.csv        Date, Open, High, Low, Close, Volume
+    <dir>/news/<TICKER>.json  list of yfinance news items ({"content": {...}})
+
+They are either generated (`write_synthetic_fixtures`, deterministic per ticker)
+or recorded from the live APIs once (`record_fixtures`). `offline()` puts fake
+`yfinance` and `duckduckgo_search` modules in front of the real ones, so the
+tools, the price store and the YFinanceSource run their normal code paths
+against the fixtures, and points the data directory at a scratch folder.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..data.sources import OHLCV_COLUMNS
+
+TRADING_DAYS = 252
+NEWS_PER_TICKER = 8
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.sha256("\x00".join(map(str, parts)).encode()).digest()[:4], "little")
+
+def universe(size: int) -> list[str]:
+    """`size` synthetic ticker symbols (the benchmark SPY is always added separately)."""
+    return [f"T{i:04d}" for i in range(size)]
+
+def synthetic_bars(tickers: list[str], days: int = 3 * TRADING_DAYS, end: pd.Timestamp | None = None,
+                   seed: int = 0) -> dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV bars from a one-factor model: each ticker follows the SPY factor
+    with its own beta plus idiosyncratic noise. The same (ticker, seed) always
+    yields the same bars.
+    """
+    end = end or pd.Timestamp.today().normalize() - pd.tseries.offsets.BDay(1)
+    dates = pd.bdate_range(end=end, periods=days, name="Date")
+    market = np.random.default_rng(_seed("SPY", seed)).normal(0.0004, 0.011, days)
+
+    frames = {}
+    for ticker in dict.fromkeys(["SPY", *tickers]):
+        rng = np.random.default_rng(_seed(ticker, seed))
+        if ticker == "SPY":
+            returns = market
+        else:
+            beta = rng.uniform(0.5, 1.6)
+            returns = beta * market + rng.normal(0.0002, rng.uniform(0.008, 0.025), days)
+        close = rng.uniform(20, 400) * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.006, days)) * close
+        open_ = close * (1 + rng.normal(0, 0.004, days))
+        frames[ticker] = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, days).astype(float),
+        }, index=dates)
+    return frames
+
+def synthetic_news(ticker: str, count: int = NEWS_PER_TICKER, seed: int = 0) -> list[dict]:
+    """News items in the current yfinance layout (data under "content")."""
+    rng = np.random.default_rng(_seed(ticker, "news", seed))
+    topics = ["beats earnings estimates", "announces buyback", "faces regulatory probe", "launches new product",
+              "cuts guidance", "hires new CFO", "expands into Asia", "settles lawsuit"]
+    publishers = ["Reuters", "Bloomberg", "MarketWatch", "Barron's", "Yahoo Finance"]
+    return [
+        {"id": f"{ticker}-{i}", "content": {
+            "title": f"{ticker} {topics[rng.integers(len(topics))]}",
+            "summary": f"Synthetic story {i} about {ticker}.",
+            "provider": {"displayName": publishers[rng.integers(len(publishers))]},
+            "canonicalUrl": {"url": f"https://news.example.com/{ticker.lower()}/{i}"},
+            "pubDate": f"{pd.Timestamp.today().normalize() - pd.Timedelta(days=i):%Y-%m-%dT%H:%M:%SZ}",
+        }}
+        for i in range(count)
+    ]
+
+def write_synthetic_fixtures(directory: str | Path, tickers: list[str], days: int = 3 * TRADING_DAYS,
+                             seed: int = 0) -> Path:
+    """Writes bars and news for `tickers` (plus SPY) into `directory`."""
+    directory = Path(directory)
+    (directory / "news").mkdir(parents=True, exist_ok=True)
+    for ticker, bars in synthetic_bars(tickers, days=days, seed=seed).items():
+        bars.to_csv(directory / f"{ticker}.csv")
+        with open(directory / "news" / f"{ticker}.json", "w") as f:
+            json.dump(synthetic_news(ticker, seed=seed), f)
+    return directory
+
+def record_fixtures(directory: str | Path, tickers: list[str], period: str = "3y") -> Path:
+    """Saves live Yahoo bars and news for `tickers` (plus SPY) in the fixture layout."""
+    import yfinance as yf
+
+    directory = Path(directory)
+    (directory / "news").mkdir(parents=True, exist_ok=True)
+    for ticker in dict.fromkeys(["SPY", *tickers]):
+        stock = yf.Ticker(ticker)
+        bars = stock.history(period=period).reindex(columns=OHLCV_COLUMNS)
+        bars.index = bars.index.tz_localize(None).rename("Date")
+        bars.to_csv(directory / f"{ticker}.csv")
+        with open(directory / "news" / f"{ticker}.json", "w") as f:
+            json.dump(stock.news or [], f)
+    return directory
+
+# --- Fake provider modules ---
+
+class FixtureMarket:
+    """Serves fixture files through a `yfinance`-shaped module, with optional per-call latency."""
+
+    def __init__(self, directory: str | Path, latency: float = 0.0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.calls = 0
+        self._bars: dict[str, pd.DataFrame] = {}
+
+    def bars(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._bars:
+            path = self.directory / f"{ticker}.csv"
+            self._bars[ticker] = (pd.read_csv(path, index_col=0, parse_dates=True) if path.exists()
+                                  else pd.DataFrame(columns=OHLCV_COLUMNS))
+        return self._bars[ticker]
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _window(self, ticker: str, start: str | None) -> pd.DataFrame:
+        bars = self.bars(ticker)
+        return bars[bars.index >= pd.Timestamp(start)] if start else bars
+
+    def module(self) -> types.ModuleType:
+        market = self
+
+        class Ticker:
+            def __init__(self, ticker: str):
+                self.ticker = ticker.upper()
+
+            def history(self, period: str | None = None, start: str | None = None, **kwargs) -> pd.DataFrame:
+                market._wait()
+                return market._window(self.ticker, start).copy()
+
+            @property
+            def news(self) -> list[dict]:
+                market._wait()
+                path = market.directory / "news" / f"{self.ticker}.json"
+                if not path.exists():
+                    return []
+                with open(path) as f:
+                    return json.load(f)
+
+            @property
+            def info(self) -> dict:
+                market._wait()
+                bars = market.bars(self.ticker)
+                price = float(bars["Close"].iloc[-1]) if len(bars) else None
+                return {"symbol": self.ticker, "currentPrice": price, "currency": "USD"}
+
+        def download(tickers, start: str | None = None, group_by: str = "ticker", **kwargs) -> pd.DataFrame:
+            market._wait()
+            tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+            return pd.concat({t: market._window(t, start) for t in tickers}, axis=1)
+
+        module = types.ModuleType("yfinance")
+        module.Ticker = Ticker
+        module.download = download
+        return module
+
+class FakeSearch:
+    """Deterministic web search results, served through a `duckduckgo_search`-shaped module."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def results(self, query: str, max_results: int = 5) -> list[dict]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        rng = np.random.default_rng(_seed(query.lower()))
+        sites = ["reuters.com", "bloomberg.com", "cnbc.com", "seekingalpha.com", "ft.com", "wsj.com"]
+        return [
+            {"title": f"{query.title()}: result {i + 1}",
+             "href": f"https://{sites[rng.integers(len(sites))]}/article/{_seed(query, i):08x}",
+             "body": f"Synthetic snippet {i + 1} for '{query}'. " * int(rng.integers(1, 4))}
+            for i in range(max_results)
+        ]
+
+    def module(self) -> types.ModuleType:
+        search = self
+
+        class DDGS:
+            def text(self, query: str, max_results: int = 5, **kwargs) -> list[dict]:
+                return search.results(query, max_results)
+
+        module = types.ModuleType("duckduckgo_search")
+        module.DDGS = DDGS
+        return module
+
+def reset_process_state():
+    """Drops the process-wide stores and caches so they are rebuilt on the current data directory."""
+    from ..data import price_store, search_index
+    from ..portfolio import risk_model
+    from ..tools import base_search, indicator_state
+
+    price_store.set_price_store(None)
+    risk_model._cache = None
+    indicator_state._states = None
+    search_index._index = None
+    base_search._results_cache.clear()
+    try:
+        from ..tools import analysis
+        from ..tools.caching import clear_tool_caches
+    except ImportError:  # crewai not installed: the tools are not benchmarked
+        return
+    analysis._snapshot.clear()
+    analysis._precomputed.update(mtime=None, data={})
+    clear_tool_caches()
+
+@contextmanager
+def offline(fixtures: str | Path, market_latency: float = 0.0, search_latency: float = 0.0):
+    """
+    Runs the block against the fixtures in `fixtures`: fake yfinance and search
+    modules, a scratch data directory (prices, indicator states, caches) and no
+    LLM response cache. Everything is restored afterwards.
+    """
+    market = FixtureMarket(fixtures, latency=market_latency)
+    search = FakeSearch(latency=search_latency)
+    saved_modules = {name: sys.modules.get(name) for name in ("yfinance", "duckduckgo_search")}
+    saved_env = {name: os.environ.get(name) for name in ("GRYPHON_DATA_DIR", "GRYPHON_LLM_CACHE")}
+    scratch = tempfile.mkdtemp(prefix="gryphon-bench-")
+
+    sys.modules["yfinance"] = market.module()
+    sys.modules["duckduckgo_search"] = search.module()
+    os.environ.update(GRYPHON_DATA_DIR=scratch, GRYPHON_LLM_CACHE="0")
+    reset_process_state()
+    try:
+        yield types.SimpleNamespace(market=market, search=search, data_dir=Path(scratch))
+    finally:
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        reset_process_state()
+        shutil.rmtree(scratch, ignore_errors=True)
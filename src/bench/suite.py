@@ -0,0 +1,335 @@
+"""
+Offline performance benchmarks.
+
+    python -m src.bench.suite                                   # everything, sizes 10 50 200
+    python -m src.bench.suite --only metrics technical --sizes 25 100 --out bench.json
+    python -m src.bench.suite --compare bench-main.json --out bench.json
+
+Nothing touches the network: prices and news come from fixtures (synthetic by
+default, or a directory recorded with `record_fixtures`), web search from
+FakeSearch, the LLM is FakeChatModel and Supabase is MemorySupabase. Results are
+written as JSON (one row per benchmark, case and universe size, times in ms) so
+runs on different commits can be compared with `--compare`.
+
+Benchmarks that need a missing dependency (crewai, langchain) are reported as
+skipped rather than failing the run.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable
+
+from .fixtures import offline, universe, write_synthetic_fixtures
+
+DEFAULT_SIZES = (10, 50, 200)
+
+@dataclass
+class Result:
+    benchmark: str
+    case: str
+    size: int
+    runs: int = 0
+    mean_ms: float | None = None
+    median_ms: float | None = None
+    min_ms: float | None = None
+    max_ms: float | None = None
+    stdev_ms: float | None = None
+    extra: dict = field(default_factory=dict)
+    skipped: str | None = None
+
+    @property
+    def key(self) -> tuple[str, str, int]:
+        return self.benchmark, self.case, self.size
+
+def timed(fn: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> list[float]:
+    """Wall times of `repeat` calls of `fn` in ms; `setup` runs untimed before each call."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def summarize(benchmark: str, case: str, size: int, times: list[float], **extra) -> Result:
+    return Result(
+        benchmark, case, size, runs=len(times),
+        mean_ms=round(statistics.fmean(times), 3), median_ms=round(statistics.median(times), 3),
+        min_ms=round(min(times), 3), max_ms=round(max(times), 3),
+        stdev_ms=round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+        extra=extra,
+    )
+
+# --- Benchmarks (each returns the Results for one universe size) ---
+
+def bench_prices(tickers: list[str], opts, env) -> list[Result]:
+    """Filling an empty price store for the universe (bulk fetch + .npy writes), then reading it back."""
+    from ..data.price_store import PriceStore, set_price_store, get_price_store
+
+    symbols = tickers + ["SPY"]
+    roots = []
+
+    def fresh_store():
+        root = tempfile.mkdtemp(dir=env.data_dir, prefix="prices-")
+        roots.append(root)
+        set_price_store(PriceStore(root=root))
+
+    read = lambda: get_price_store().closes(symbols, period="2y")
+    cold = timed(read, opts.repeat, setup=fresh_store)
+    warm = timed(read, opts.repeat)
+    set_price_store(None)
+    for root in roots:
+        shutil.rmtree(root, ignore_errors=True)
+    return [summarize("prices", "cold", len(tickers), cold),
+            summarize("prices", "warm", len(tickers), warm)]
+
+def bench_metrics(tickers: list[str], opts, env) -> list[Result]:
+    """`calculate_portfolio_metrics` on one portfolio holding the whole universe."""
+    from ..portfolio import risk_model
+    from ..portfolio.analytics import calculate_portfolio_metrics, ROLLING_WINDOWS, fetch_data
+
+    holdings = {t: float(10 + i % 40) for i, t in enumerate(tickers)}
+    fetch_data(tickers)  # Prices are stored up front; this times the computation
+
+    def reset_cache():
+        risk_model._cache = None
+
+    cold = timed(lambda: calculate_portfolio_metrics(holdings), opts.repeat, setup=reset_cache)
+    warm = timed(lambda: calculate_portfolio_metrics(holdings), opts.repeat)
+    rolling = timed(lambda: calculate_portfolio_metrics(holdings, rolling_windows=ROLLING_WINDOWS), opts.repeat)
+    size = len(tickers)
+    return [summarize("metrics", "cold", size, cold),
+            summarize("metrics", "warm", size, warm),
+            summarize("metrics", "rolling", size, rolling)]
+
+def bench_technical(tickers: list[str], opts, env) -> list[Result]:
+    """`TechnicalAnalysisTool._run` for every ticker of the universe."""
+    from ..tools import analysis
+    from ..tools.caching import clear_tool_caches
+    from ..tools.indicator_state import get_indicator_states
+    from .fixtures import reset_process_state
+
+    tool = analysis.TechnicalAnalysisTool()
+    analysis.prime_technical_snapshot(tickers)  # Prices are stored up front
+
+    def run_all():
+        for t in tickers:
+            tool._run(t)
+
+    def no_state():
+        reset_process_state()
+        shutil.rmtree(get_indicator_states().root, ignore_errors=True)
+        get_indicator_states().root.mkdir(parents=True, exist_ok=True)
+
+    def keep_state():
+        analysis._snapshot.clear()
+        clear_tool_caches()
+
+    size = len(tickers)
+    seeded = timed(run_all, opts.repeat, setup=no_state)
+    incremental = timed(run_all, opts.repeat, setup=keep_state)
+    primed = timed(lambda: (analysis.prime_technical_snapshot(tickers), run_all()), opts.repeat, setup=keep_state)
+    cached = timed(run_all, opts.repeat)
+    per_ticker = lambda times: round(statistics.median(times) / size, 3)
+    return [summarize("technical", "seed_states", size, seeded, per_ticker_ms=per_ticker(seeded)),
+            summarize("technical", "saved_states", size, incremental, per_ticker_ms=per_ticker(incremental)),
+            summarize("technical", "primed_snapshot", size, primed, per_ticker_ms=per_ticker(primed)),
+            summarize("technical", "tool_cache", size, cached, per_ticker_ms=per_ticker(cached))]
+
+def bench_engine(tickers: list[str], opts, env) -> list[Result]:
+    """A full crew run per ticker with the fake LLM (`GryphonEngine.run`, then `run_many` on the universe)."""
+    from ..main_crew import GryphonEngine
+    from ..tools.caching import clear_tool_caches
+    from .fake_llm import FakeChatModel
+
+    llm = FakeChatModel(latency=opts.llm_latency)
+    engine = GryphonEngine(llm=llm)
+    size = len(tickers)
+    results = []
+
+    calls = llm.calls
+    single = timed(lambda: engine.run(tickers[0]), opts.repeat, setup=clear_tool_caches)
+    results.append(summarize("engine", "run", size, single, llm_calls=(llm.calls - calls) / opts.repeat,
+                             llm_latency_s=opts.llm_latency, market_calls=env.market.calls, search_calls=env.search.calls))
+
+    if size <= opts.engine_max:
+        batch = timed(lambda: list(engine.run_many(tickers, max_concurrency=opts.concurrency)), 1, setup=clear_tool_caches)
+        results.append(summarize("engine", "run_many", size, batch, max_concurrency=opts.concurrency,
+                                 per_ticker_ms=round(batch[0] / size, 3)))
+    else:
+        results.append(Result("engine", "run_many", size, skipped=f"universe larger than --engine-max {opts.engine_max}"))
+    return results
+
+def load_dashboard(sb, portfolio_id: str) -> tuple[dict, dict | None]:
+    """The portfolio dashboard's data path (src/ui/portfolio.py) without Streamlit and its caches."""
+    from ..portfolio.analytics import calculate_portfolio_metrics, calculate_risk_contributions, ROLLING_WINDOWS
+    from ..portfolio.reports import market_as_of, portfolio_content_hash, find_report, save_report, encode_report, decode_report
+
+    positions = sb.table("positions").select("*").eq("portfolio_id", portfolio_id).execute().data
+    holdings = {p["ticker"]: float(p["shares"]) for p in positions}
+    as_of = market_as_of()
+    content_hash = portfolio_content_hash(holdings, as_of)
+    report = find_report(sb, portfolio_id, content_hash)
+    if report:
+        return decode_report(report["risk_metrics"])
+
+    metrics = calculate_portfolio_metrics(holdings, rolling_windows=ROLLING_WINDOWS)
+    contributions = calculate_risk_contributions(holdings)
+    save_report(sb, portfolio_id, content_hash, encode_report(metrics, contributions))
+    return metrics, contributions
+
+def bench_dashboard(tickers: list[str], opts, env) -> list[Result]:
+    """Opening a portfolio on the dashboard: computed and saved (cold), then served from the stored report."""
+    from ..portfolio import risk_model
+    from ..portfolio.analytics import fetch_data
+    from ..utils.memory_db import MemorySupabase
+
+    sb = MemorySupabase({
+        "portfolios": [{"id": "p1", "user_id": "u1", "name": "Benchmark"}],
+        "positions": [{"portfolio_id": "p1", "ticker": t, "shares": 10 + i % 40} for i, t in enumerate(tickers)],
+    })
+    fetch_data(tickers)
+
+    def cold_start():
+        risk_model._cache = None
+        sb.tables["reports"] = []
+
+    cold = timed(lambda: load_dashboard(sb, "p1"), opts.repeat, setup=cold_start)
+    warm = timed(lambda: load_dashboard(sb, "p1"), opts.repeat)
+    report_kb = len(json.dumps(sb.tables["reports"][-1]["risk_metrics"], default=str)) / 1024
+    size = len(tickers)
+    return [summarize("dashboard", "compute_and_save", size, cold, report_kb=round(report_kb, 1)),
+            summarize("dashboard", "stored_report", size, warm)]
+
+BENCHMARKS: dict[str, Callable] = {
+    "prices": bench_prices,
+    "metrics": bench_metrics,
+    "technical": bench_technical,
+    "engine": bench_engine,
+    "dashboard": bench_dashboard,
+}
+
+# --- Runner ---
+
+def _fixture_tickers(directory: Path) -> list[str]:
+    return sorted(p.stem for p in directory.glob("*.csv") if p.stem != "SPY")
+
+def run_suite(opts) -> list[Result]:
+    names = opts.only or list(BENCHMARKS)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="gryphon-fixtures-") as generated:
+        if opts.fixtures:
+            fixtures = Path(opts.fixtures)
+            available = _fixture_tickers(fixtures)
+        else:
+            fixtures = write_synthetic_fixtures(generated, universe(max(opts.sizes)), seed=opts.seed)
+            available = universe(max(opts.sizes))
+
+        for size in opts.sizes:
+            tickers = available[:size]
+            for name in names:
+                with offline(fixtures, market_latency=opts.market_latency, search_latency=opts.search_latency) as env:
+                    try:
+                        rows = BENCHMARKS[name](tickers, opts, env)
+                    except ImportError as e:
+                        rows = [Result(name, "-", len(tickers), skipped=f"missing dependency: {e.name or e}")]
+                for row in rows:
+                    _print_row(row)
+                results.extend(rows)
+    return results
+
+def _print_row(r: Result):
+    # Progress goes to stderr so stdout stays valid JSON without --out
+    if r.skipped:
+        print(f"{r.benchmark:<10} {r.case:<18} {r.size:>5}  skipped ({r.skipped})", file=sys.stderr)
+    else:
+        extra = " ".join(f"{k}={v}" for k, v in r.extra.items())
+        print(f"{r.benchmark:<10} {r.case:<18} {r.size:>5}  median {r.median_ms:>10.2f} ms  "
+              f"min {r.min_ms:>10.2f} ms  (n={r.runs}) {extra}", file=sys.stderr)
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=Path(__file__).resolve().parents[2])
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def environment(opts) -> dict:
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "options": {k: v for k, v in vars(opts).items() if k not in ("out", "compare")},
+    }
+
+def compare(results: list[Result], baseline_path: str, threshold: float) -> list[dict]:
+    """Median ratios against a previous results file; ratios above `threshold` are regressions."""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["case"], r["size"]): r for r in json.load(f)["results"]}
+
+    rows = []
+    for r in results:
+        old = baseline.get(r.key)
+        if r.skipped or not old or old.get("skipped") or not old.get("median_ms"):
+            continue
+        ratio = r.median_ms / old["median_ms"]
+        rows.append({"benchmark": r.benchmark, "case": r.case, "size": r.size, "baseline_ms": old["median_ms"],
+                     "median_ms": r.median_ms, "ratio": round(ratio, 3), "regression": ratio > threshold})
+    return rows
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Gryphon's offline performance benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Universe sizes (tickers)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--fixtures", help="Recorded fixture directory (default: synthetic data)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic fixtures")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM seconds per call")
+    parser.add_argument("--market-latency", type=float, default=0.0, help="Fake Yahoo seconds per call")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Fake search seconds per call")
+    parser.add_argument("--engine-max", type=int, default=8, help="Largest universe for the run_many benchmark")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency of run_many")
+    parser.add_argument("--out", help="Write results as JSON to this file (default: stdout)")
+    parser.add_argument("--compare", help="Previous results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Median ratio counted as a regression")
+    opts = parser.parse_args(argv)
+
+    results = run_suite(opts)
+    report = {"environment": environment(opts), "results": [asdict(r) for r in results]}
+
+    regressions = []
+    if opts.compare:
+        report["comparison"] = compare(results, opts.compare, opts.threshold)
+        regressions = [c for c in report["comparison"] if c["regression"]]
+        for c in regressions:
+            print(f"REGRESSION {c['benchmark']}/{c['case']}/{c['size']}: "
+                  f"{c['baseline_ms']:.2f} -> {c['median_ms']:.2f} ms (x{c['ratio']})", file=sys.stderr)
+
+    if opts.out:
+        with open(opts.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {opts.out}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
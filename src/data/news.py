@@ -0,0 +1,86 @@
+"""
+News ingestion into the local search index.
+
+News is fetched per ticker from Yahoo Finance, but stored once: an article
+found for several tickers (market-wide headlines) is one document tagged with
+all of them. `ingest_news` pulls the news of many tickers concurrently (the
+nightly job and the news refresh run it for every held ticker); `ensure_news`
+refreshes a single ticker when its last fetch is older than NEWS_TTL, so the
+news tools answer from the index.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from .search_index import SearchIndex, get_search_index
+
+NEWS_TTL = 900            # Seconds a ticker's fetched news counts as current
+NEWS_WINDOW = 7 * 86400   # Seconds of news history the tools look at
+FETCH_WORKERS = 8         # Concurrent Yahoo news requests during ingestion
+
+def news_fields(item: dict) -> dict:
+    """Title, publisher, date, link and summary of a yfinance news item (old and new layouts)."""
+    # Handle new yfinance structure where data is in 'content'
+    content = item.get('content', item) # Fallback to item if content missing
+
+    # Link can be canonicalUrl or clickThroughUrl, as a string or {"url": ...}
+    link = content.get('canonicalUrl') or content.get('clickThroughUrl') or content.get('link') or ''
+    if isinstance(link, dict):
+        link = link.get('url', '')
+
+    # Provider might be a dict
+    provider = content.get('provider', content.get('publisher', {}))
+    publisher = provider.get('displayName', 'Unknown') if isinstance(provider, dict) else str(provider)
+
+    published = content.get('pubDate') or content.get('providerPublishTime')
+    if isinstance(published, (int, float)):
+        published = pd.Timestamp(published, unit='s')
+    published = pd.Timestamp(published).isoformat() if published else ''
+
+    return {"title": content.get('title', 'No Title'), "publisher": publisher, "date": published[:10],
+            "published": published, "link": link, "summary": (content.get('summary') or '').strip()}
+
+def fetch_news(ticker: str) -> list[dict]:
+    """The ticker's current Yahoo news as index documents tagged with the ticker."""
+    import yfinance as yf  # Imported on first use to keep CLI startup fast
+
+    docs = []
+    for item in yf.Ticker(ticker).news or []:
+        n = news_fields(item)
+        docs.append({"url": n["link"], "title": n["title"], "body": n["summary"], "source": n["publisher"],
+                     "published": n["published"] or None, "tickers": [ticker]})
+    return docs
+
+def ingest_news(tickers: list[str], index: SearchIndex | None = None, max_workers: int = FETCH_WORKERS) -> dict:
+    """Fetches the news of `tickers` concurrently and adds it to the index; returns a summary."""
+    index = get_search_index() if index is None else index
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    summary = {"tickers": len(tickers), "articles": 0, "new": 0, "failed": []}
+    if not tickers:
+        return summary
+
+    def fetch(ticker: str):
+        try:
+            return ticker, fetch_news(ticker), None
+        except Exception as e:
+            return ticker, [], e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+        results = list(executor.map(fetch, tickers))
+
+    docs = [d for _, found, _ in results for d in found]
+    summary["articles"] = len(docs)
+    summary["new"] = index.add(docs)
+    index.mark_fetched([t for t, _, error in results if error is None])
+    summary["failed"] = [f"{t}: {error}" for t, _, error in results if error is not None]
+    return summary
+
+def ensure_news(ticker: str, ttl: float = NEWS_TTL, index: SearchIndex | None = None) -> bool:
+    """Fetches the ticker's news unless it was fetched in the last `ttl` seconds; True if it fetched."""
+    index = get_search_index() if index is None else index
+    fetched_at = index.fetched_at(ticker)
+    if fetched_at is not None and time.time() - fetched_at < ttl:
+        return False
+    index.add(fetch_news(ticker))
+    index.mark_fetched([ticker])
+    return True
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .sources import OHLCV_COLUMNS, PriceSource, YFinanceSource, normalize_bars
+from ..utils.paths import get_data_dir
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|mo|y)$")
+_EPOCH = pd.Timestamp("1970-01-01")
+ADJUSTMENT_TOLERANCE = 1e-4  # Relative change of a completed bar's close that means the history was re-adjusted
+MARKET_TZ = "America/New_York"
+SESSION_SETTLED = pd.Timedelta(hours=16, minutes=30)  # Market time after which the day's bar is final
+
+def _market_now() -> pd.Timestamp:
+    return pd.Timestamp.now(tz=MARKET_TZ)
+
+def session_cutoff(now: pd.Timestamp | None = None) -> pd.Timestamp:
+    """Bars dated before the returned date belong to finished sessions (today's once the market has closed)."""
+    now = now if now is not None else _market_now()
+    today = now.tz_localize(None).normalize() if now.tzinfo else now.normalize()
+    return today + pd.Timedelta(days=1) if now - now.normalize() >= SESSION_SETTLED else today
+
+def period_start(period: str, today: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """Translates a yfinance-style period ("1mo", "2y", "ytd", "max") into a start date."""
+    today = (today or pd.Timestamp.today()).normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(today.year, 1, 1)
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        # "5d" means five trading days; leave room for weekends and holidays
+        return today - pd.Timedelta(days=2 * n + 7)
+    if unit == "mo":
+        return today - pd.DateOffset(months=n)
+    return today - pd.DateOffset(years=n)
+
+class PriceStore:
+    """
+    On-disk daily OHLCV store shared by the tools and the portfolio analytics.
+
+    Each ticker lives in `<root>/<TICKER>.npy`, a float64 array of
+    [day, Open, High, Low, Close, Volume] rows (day = days since epoch) that is
+    memory-mapped on read, plus a small JSON sidecar with fetch metadata.
+    Only bars newer than the last stored date are requested from the source,
+    and a ticker fetched less than `min_refresh` seconds ago is served as is.
+    Prices are split/dividend adjusted, so a delta fetch also re-requests the
+    last completed bar: if its close changed, the stored history predates an
+    adjustment and is fetched again in full.
+    """
+
+    def __init__(self, root: str | Path | None = None, source: PriceSource | None = None, min_refresh: float = 900):
+        self.root = Path(root) if root else get_data_dir("prices")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.source = source or YFinanceSource()
+        self.min_refresh = min_refresh
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # --- Public API ---
+
+    def history(self, ticker: str, period: str = "2y") -> pd.DataFrame:
+        """Returns OHLCV bars for `ticker` covering `period`, refreshing from the source if stale."""
+        self.refresh([ticker], period)
+        return self._slice(self._load(ticker), period)
+
+    def closes(self, tickers: list[str], period: str = "2y") -> pd.DataFrame:
+        """Returns a (dates x tickers) frame of close prices covering `period`."""
+        tickers = list(dict.fromkeys(tickers))
+        self.refresh(tickers, period)
+        columns = {t: self._slice(self._load(t), period)["Close"] for t in tickers}
+        return pd.DataFrame(columns).sort_index()
+
+    def last_date(self, ticker: str) -> pd.Timestamp | None:
+        """Date of the newest stored bar, without touching the source."""
+        data = self._load_array(ticker)
+        if data is None or len(data) == 0:
+            return None
+        return _EPOCH + pd.Timedelta(days=int(data[-1, 0]))
+
+    def last_completed_date(self, ticker: str) -> pd.Timestamp | None:
+        """
+        Date of the newest stored bar of a finished session, without touching the source.
+
+        Unlike `last_date`, it does not move when a live fetch stores a forming
+        intraday bar, so values precomputed after the close stay current all day.
+        """
+        data = self._load_array(ticker)
+        if data is None or len(data) == 0:
+            return None
+        days = np.asarray(data[:, 0])
+        completed = days[days < (session_cutoff() - _EPOCH).days]
+        return _EPOCH + pd.Timedelta(days=int(completed[-1])) if len(completed) else None
+
+    def refresh(self, tickers: list[str], period: str = "2y"):
+        """Brings the stored history of `tickers` up to date, batching fetches by start date."""
+        needed_from = period_start(period)
+        with ExitStack() as stack:
+            for t in sorted(set(tickers)):
+                stack.enter_context(self._lock_for(t))
+
+            # Group tickers by the date we need to fetch from
+            plan: dict[tuple, list[str]] = {}
+            for t in tickers:
+                step = self._plan_fetch(t, needed_from)
+                if step is not None:
+                    plan.setdefault(step, []).append(t)
+
+            for (start, full), group in plan.items():
+                frames = self.source.fetch_many(group, start)
+                for t in group:
+                    self._merge(t, frames.get(t), start, full)
+
+    # --- Internals ---
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _paths(self, ticker: str) -> tuple[Path, Path]:
+        name = ticker.upper().replace("/", "_")
+        return self.root / f"{name}.npy", self.root / f"{name}.json"
+
+    def _load_meta(self, ticker: str) -> dict:
+        _, meta_path = self._paths(ticker)
+        if not meta_path.exists():
+            return {}
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def _load_array(self, ticker: str) -> np.ndarray | None:
+        data_path, _ = self._paths(ticker)
+        if not data_path.exists():
+            return None
+        return np.load(data_path, mmap_mode="r")
+
+    def _load(self, ticker: str) -> pd.DataFrame:
+        data = self._load_array(ticker)
+        if data is None or len(data) == 0:
+            return normalize_bars(None)
+        index = _EPOCH + pd.to_timedelta(np.asarray(data[:, 0]), unit="D")
+        return pd.DataFrame(np.asarray(data[:, 1:]), index=pd.DatetimeIndex(index, name="Date"), columns=OHLCV_COLUMNS)
+
+    def _slice(self, df: pd.DataFrame, period: str) -> pd.DataFrame:
+        match = _PERIOD_RE.match(period)
+        if match and match.group(2) == "d":
+            return df.tail(int(match.group(1)))
+        start = period_start(period)
+        return df if start is None else df[df.index >= start]
+
+    def _plan_fetch(self, ticker: str, needed_from: pd.Timestamp | None) -> tuple | None:
+        """Returns (start, full_refetch) for `ticker`, or None if the stored bars are fresh."""
+        meta = self._load_meta(ticker)
+        last = self.last_date(ticker)
+        fresh = time.time() - meta.get("fetched_at", 0) < self.min_refresh
+
+        # Nothing usable stored yet (don't hammer the source for unknown tickers)
+        if last is None or "covered_from" not in meta:
+            return None if fresh else (needed_from, True)
+        # The stored history does not reach back far enough
+        covered_from = meta["covered_from"]
+        if covered_from is not None and (needed_from is None or needed_from < pd.Timestamp(covered_from)):
+            return (needed_from, True)
+
+        if fresh:
+            return None
+        # Re-request the last stored bar (it may have been a partial intraday bar) and the completed one
+        # before it, whose close tells whether the source re-adjusted the history since
+        data = self._load_array(ticker)
+        overlap = int(data[-2, 0]) if len(data) > 1 else int(data[-1, 0])
+        return (_EPOCH + pd.Timedelta(days=overlap), False)
+
+    def _merge(self, ticker: str, new: pd.DataFrame | None, start: pd.Timestamp | None, full: bool):
+        new = normalize_bars(new)
+        old = self._load(ticker)
+        meta = self._load_meta(ticker)
+
+        if new.empty:
+            merged = old
+        elif full:
+            # A full fetch replaces whatever was stored
+            merged = new
+            meta["covered_from"] = None if start is None else start.strftime("%Y-%m-%d")
+        elif self._readjusted(old, new, start):
+            # A split or dividend since the last fetch: stored prices are on the old adjustment basis
+            covered_from = meta.get("covered_from")
+            start = None if covered_from is None else pd.Timestamp(covered_from)
+            refetched = normalize_bars(self.source.fetch(ticker, start))
+            merged = refetched if not refetched.empty else old
+        else:
+            merged = pd.concat([old[old.index < start], new])
+        meta["fetched_at"] = time.time()
+
+        days = (merged.index - _EPOCH).days.to_numpy(dtype=float)
+        array = np.column_stack([days, merged[OHLCV_COLUMNS].to_numpy(dtype=float)]) if len(merged) else np.empty((0, 6))
+        self._write(ticker, array, meta)
+
+    @staticmethod
+    def _readjusted(old: pd.DataFrame, new: pd.DataFrame, start: pd.Timestamp) -> bool:
+        """True if a re-requested completed bar (not the last stored one) closes differently now."""
+        if old.empty:
+            return False
+        completed = old.index[(old.index >= start) & (old.index < old.index[-1])].intersection(new.index)
+        if completed.empty:
+            return False
+        return not np.allclose(new.loc[completed, "Close"], old.loc[completed, "Close"],
+                               rtol=ADJUSTMENT_TOLERANCE, atol=0)
+
+    def _write(self, ticker: str, array: np.ndarray, meta: dict):
+        data_path, meta_path = self._paths(ticker)
+        # Write to temp files and swap in, so concurrent readers never see partial files
+        tmp_data = data_path.with_suffix(".tmp.npy")
+        np.save(tmp_data, array)
+        os.replace(tmp_data, data_path)
+
+        tmp_meta = meta_path.with_suffix(".tmp.json")
+        with open(tmp_meta, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+_store: PriceStore | None = None
+_store_lock = threading.Lock()
+
+def get_price_store() -> PriceStore:
+    """Returns the process-wide PriceStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        return _store
+
+def set_price_store(store: PriceStore):
+    """Replaces the process-wide PriceStore (e.g. with one backed by a LocalFixtureSource)."""
+    global _store
+    with _store_lock:
+        _store = store
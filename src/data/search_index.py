@@ -0,0 +1,240 @@
+"""
+Local full-text index of documents (search results and news) seen before, in SQLite FTS5.
+
+Online search results are added as they arrive, so the offline search provider
+can answer related queries without the network, e.g. when a provider is rate
+limited. News articles are ingested in bulk for all tracked tickers
+(`src.data.news`) and tagged with the tickers they were found for, so the news
+tools answer from here instead of fetching per call.
+
+Documents are keyed by URL and by a hash of their text: re-adding one, or the
+same story syndicated under another URL, refreshes the existing document and
+adds its ticker tags.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from ..utils.paths import get_data_dir
+
+MAX_AGE = 30 * 86400  # Seconds a document stays searchable
+
+_WORD = re.compile(r"\w+")
+
+def match_expression(query: str) -> str | None:
+    """FTS5 query matching any word of `query` (quoted, so user input cannot inject syntax)."""
+    words = list(dict.fromkeys(w.lower() for w in _WORD.findall(query)))
+    return " OR ".join(f'"{w}"' for w in words) or None
+
+def content_hash(title: str, body: str = "") -> str | None:
+    """Dedup key for the same story under different URLs: the title's words (plus the body's for short titles)."""
+    words = [w.lower() for w in _WORD.findall(title)]
+    if len(words) < 5:  # "Stock market today" is not one story
+        words += [w.lower() for w in _WORD.findall(body)][:40]
+    return hashlib.sha1(" ".join(words).encode()).hexdigest() if words else None
+
+def timestamp(published) -> float | None:
+    """Epoch seconds of an ISO date/time string or epoch number, None if it cannot be read."""
+    if published is None or published == "":
+        return None
+    if isinstance(published, (int, float)):
+        return float(published)
+    try:
+        parsed = datetime.fromisoformat(str(published))
+    except ValueError:
+        return None
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+class SearchIndex:
+    def __init__(self, path: str | None = None):
+        self.path = str(path or get_data_dir() / "search_index.sqlite")
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                create table if not exists docs (
+                    id integer primary key,
+                    url text not null unique,
+                    title text not null,
+                    body text not null,
+                    source text,
+                    published text,
+                    added_at real not null,
+                    content_hash text,
+                    published_at real
+                );
+                create virtual table if not exists docs_fts using fts5(
+                    title, body, content='docs', content_rowid='id', tokenize='porter unicode61'
+                );
+                create trigger if not exists docs_ai after insert on docs begin
+                    insert into docs_fts (rowid, title, body) values (new.id, new.title, new.body);
+                end;
+                create trigger if not exists docs_ad after delete on docs begin
+                    insert into docs_fts (docs_fts, rowid, title, body) values ('delete', old.id, old.title, old.body);
+                end;
+                create trigger if not exists docs_au after update on docs begin
+                    insert into docs_fts (docs_fts, rowid, title, body) values ('delete', old.id, old.title, old.body);
+                    insert into docs_fts (rowid, title, body) values (new.id, new.title, new.body);
+                end;
+            """)
+            # Indexes created before ticker tags lack the newer columns
+            columns = {r["name"] for r in conn.execute("pragma table_info(docs)")}
+            if "content_hash" not in columns:
+                conn.execute("alter table docs add column content_hash text")
+                conn.execute("alter table docs add column published_at real")
+                conn.executemany("update docs set content_hash = ?, published_at = ? where id = ?", [
+                    (content_hash(r["title"], r["body"]), timestamp(r["published"]), r["id"])
+                    for r in conn.execute("select id, title, body, published from docs").fetchall()
+                ])
+            conn.executescript("""
+                create index if not exists docs_content_hash on docs (content_hash);
+                create index if not exists docs_published_at on docs (published_at);
+                create table if not exists doc_tickers (
+                    ticker text not null,
+                    doc_id integer not null,
+                    primary key (ticker, doc_id)
+                ) without rowid;
+                create table if not exists feeds (
+                    ticker text primary key,
+                    fetched_at real not null
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, docs: list[dict]) -> int:
+        """
+        Adds or refreshes documents ({url, title, body, source, published, tickers}).
+
+        A document matching an indexed one by URL or content hash refreshes it
+        (keeping the longer body) and adds its tickers to the tags. Returns how
+        many new documents were indexed.
+        """
+        now = time.time()
+        added = 0
+        with self._lock, self._connect() as conn:
+            for d in docs:
+                if not d.get("url"):
+                    continue
+                title, body = d.get("title") or "", d.get("body") or ""
+                digest = content_hash(title, body)
+                row = conn.execute(
+                    "select id from docs where url = ? or content_hash = ? order by url = ? desc limit 1",
+                    (d["url"], digest, d["url"]),
+                ).fetchone()
+                values = (title, body, d.get("source"), d.get("published"), now, digest, timestamp(d.get("published")))
+                if row is None:
+                    doc_id = conn.execute("""
+                        insert into docs (title, body, source, published, added_at, content_hash, published_at, url)
+                        values (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, values + (d["url"],)).lastrowid
+                    added += 1
+                else:
+                    doc_id = row["id"]
+                    conn.execute("""
+                        update docs set
+                            title = ?1, source = coalesce(?3, source), added_at = ?5, content_hash = ?6,
+                            published = coalesce(?4, published), published_at = coalesce(?7, published_at),
+                            body = case when length(?2) > length(body) then ?2 else body end
+                        where id = ?8
+                    """, values + (doc_id,))
+                conn.executemany("insert or ignore into doc_tickers (ticker, doc_id) values (?, ?)",
+                                 [(t.upper(), doc_id) for t in d.get("tickers") or []])
+        return added
+
+    def search(self, query: str, limit: int = 5, max_age: float = MAX_AGE,
+               tickers: list[str] | None = None) -> list[dict]:
+        """
+        Best matches for `query` by BM25 (titles weigh double) among documents
+        published (or, without a date, seen) in the last `max_age` seconds,
+        optionally only those tagged with one of `tickers`.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        where, params = self._filters(max_age, tickers)
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                select d.url, d.title, d.body, d.source, d.published
+                from docs_fts join docs d on d.id = docs_fts.rowid
+                where docs_fts match ? and {where}
+                order by bm25(docs_fts, 2.0, 1.0)
+                limit ?
+            """, (expression, *params, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def latest(self, tickers: list[str], limit: int = 5, max_age: float = MAX_AGE) -> list[dict]:
+        """Newest documents tagged with any of `tickers`."""
+        where, params = self._filters(max_age, tickers)
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                select d.url, d.title, d.body, d.source, d.published
+                from docs d
+                where {where}
+                order by coalesce(d.published_at, d.added_at) desc
+                limit ?
+            """, (*params, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    @staticmethod
+    def _filters(max_age: float, tickers: list[str] | None) -> tuple[str, list]:
+        where, params = ["coalesce(d.published_at, d.added_at) >= ?"], [time.time() - max_age]
+        if tickers is not None:
+            where.append(f"d.id in (select doc_id from doc_tickers where ticker in ({','.join('?' * len(tickers))}))")
+            params += [t.upper() for t in tickers]
+        return " and ".join(where), params
+
+    def tickers(self, url: str) -> list[str]:
+        """Ticker tags of the document at `url`."""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                select t.ticker from doc_tickers t join docs d on d.id = t.doc_id where d.url = ? order by t.ticker
+            """, (url,)).fetchall()
+        return [r["ticker"] for r in rows]
+
+    # --- News feed bookkeeping ---
+
+    def mark_fetched(self, tickers: list[str], at: float | None = None):
+        """Records that the news of `tickers` was fetched (now, by default)."""
+        at = time.time() if at is None else at
+        with self._lock, self._connect() as conn:
+            conn.executemany("insert or replace into feeds (ticker, fetched_at) values (?, ?)",
+                             [(t.upper(), at) for t in tickers])
+
+    def fetched_at(self, ticker: str) -> float | None:
+        with self._connect() as conn:
+            row = conn.execute("select fetched_at from feeds where ticker = ?", (ticker.upper(),)).fetchone()
+        return row["fetched_at"] if row else None
+
+    def prune(self, max_age: float = MAX_AGE) -> int:
+        with self._lock, self._connect() as conn:
+            pruned = conn.execute("delete from docs where added_at < ?", (time.time() - max_age,)).rowcount
+            conn.execute("delete from doc_tickers where doc_id not in (select id from docs)")
+            return pruned
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("select count(*) from docs").fetchone()[0]
+
+_index: SearchIndex | None = None
+_index_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex:
+    """Returns the process-wide SearchIndex."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
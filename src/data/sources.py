@@ -0,0 +1,81 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduces a raw price frame to daily OHLCV bars on a tz-naive date index."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+
+    df = df.reindex(columns=OHLCV_COLUMNS).astype(float)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+
+    df = df.dropna(subset=["Close"])
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+class PriceSource(ABC):
+    """Abstract interface for daily OHLCV providers used by the PriceStore."""
+
+    @abstractmethod
+    def fetch(self, ticker: str, start: pd.Timestamp | None = None) -> pd.DataFrame:
+        """Returns bars from `start` (inclusive) onwards, or the full history if `start` is None."""
+        pass
+
+    def fetch_many(self, tickers: list[str], start: pd.Timestamp | None = None) -> dict[str, pd.DataFrame]:
+        """Fetches several tickers sharing the same start date. Override for bulk endpoints."""
+        return {t: self.fetch(t, start) for t in tickers}
+
+class YFinanceSource(PriceSource):
+    """Yahoo Finance bars (split/dividend adjusted, as returned by `Ticker.history`)."""
+
+    def fetch(self, ticker: str, start: pd.Timestamp | None = None) -> pd.DataFrame:
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        if start is None:
+            df = stock.history(period="max")
+        else:
+            df = stock.history(start=start.strftime("%Y-%m-%d"))
+        return normalize_bars(df)
+
+    def fetch_many(self, tickers: list[str], start: pd.Timestamp | None = None) -> dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        if len(tickers) == 1:
+            return {tickers[0]: self.fetch(tickers[0], start)}
+
+        kwargs = {"period": "max"} if start is None else {"start": start.strftime("%Y-%m-%d")}
+        data = yf.download(tickers, group_by="ticker", auto_adjust=True, progress=False, threads=True, **kwargs)
+
+        frames = {}
+        for t in tickers:
+            if isinstance(data.columns, pd.MultiIndex) and t in data.columns.get_level_values(0):
+                frames[t] = normalize_bars(data[t])
+            else:
+                frames[t] = normalize_bars(None)
+        return frames
+
+class LocalFixtureSource(PriceSource):
+    """
+    Serves bars from `<directory>/<TICKER>.csv` files (Date, Open, High, Low, Close, Volume).
+    Useful for tests and offline runs; never touches the network.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def fetch(self, ticker: str, start: pd.Timestamp | None = None) -> pd.DataFrame:
+        path = self.directory / f"{ticker}.csv"
+        if not path.exists():
+            return normalize_bars(None)
+
+        df = normalize_bars(pd.read_csv(path, index_col=0, parse_dates=True))
+        if start is not None:
+            df = df[df.index >= start]
+        return df
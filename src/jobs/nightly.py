@@ -0,0 +1,170 @@
+"""
+Nightly precompute for every ticker held in any portfolio.
+
+    python -m src.jobs.nightly            # e.g. from cron after the US close
+
+Work scales with the distinct tickers (and distinct ticker sets), not with users:
+1. Refresh the price store for all held tickers (and the benchmark) in bulk.
+2. Compute the Analyst's indicators in one vectorized pass and save them, so
+   TechnicalAnalysisTool answers from the saved values during the day.
+3. Advance the streaming indicator states to the newest bar.
+4. Save the return statistics (covariance etc.) of every held ticker set, so
+   portfolio metrics load them instead of recomputing from prices.
+5. Compute the metrics of every portfolio in one batch and save them as
+   reports, so the dashboard serves them without computing.
+6. Ingest the news of all held tickers into the local news index.
+
+News goes stale faster than prices, so step 6 can also run on its own during
+the day (`--news-only`). The same work can be queued for the workers as a
+"precompute" job.
+"""
+import argparse
+import time
+
+from ..portfolio.risk_model import BENCHMARK, DEFAULT_WINDOW, get_covariance_cache
+
+def held_ticker_sets(client) -> list[list[str]]:
+    """Distinct ticker sets across all portfolios, via `public.held_ticker_sets()`."""
+    rows = client.rpc("held_ticker_sets").execute().data or []
+    return [sorted(r["tickers"]) for r in rows if r.get("tickers")]
+
+def held_portfolios(client, page_size: int = 1000) -> dict[str, dict[str, float]]:
+    """Holdings ({ticker: shares}) of every portfolio by id; needs the service-role client."""
+    portfolios: dict[str, dict[str, float]] = {}
+    start = 0
+    while True:
+        rows = (client.table("positions").select("portfolio_id, ticker, shares")
+                .order("id").range(start, start + page_size - 1).execute().data or [])
+        for r in rows:
+            portfolios.setdefault(r["portfolio_id"], {})[r["ticker"]] = float(r["shares"])
+        if len(rows) < page_size:
+            return portfolios
+        start += page_size
+
+def precompute(ticker_sets: list[list[str]], window: str = DEFAULT_WINDOW, news_only: bool = False,
+               portfolios: dict[str, dict[str, float]] | None = None, client=None) -> dict:
+    """
+    Runs the precompute (or only the news ingestion) for the given ticker sets and returns a summary.
+
+    With `portfolios` (id -> holdings) their metrics are computed too, and saved
+    as reports when a `client` is given.
+    """
+    from ..data.news import ingest_news
+    from ..data.price_store import get_price_store
+    from ..tools.analysis import prime_technical_snapshot
+    from ..tools.indicator_state import get_indicator_states
+
+    start = time.perf_counter()
+    tickers = sorted({t for s in ticker_sets for t in s})
+    summary = {"tickers": len(tickers), "ticker_sets": len(ticker_sets), "failed": []}
+    if not tickers:
+        return {**summary, "seconds": 0.0}
+    if news_only:
+        summary["news"] = ingest_news(tickers)
+        summary["seconds"] = round(time.perf_counter() - start, 2)
+        return summary
+
+    # 1. One bulk refresh (delta fetches, grouped by start date)
+    store = get_price_store()
+    store.refresh(tickers + [BENCHMARK], period=window)
+    as_of = store.last_completed_date(BENCHMARK)  # Today's session once the market has closed
+
+    # 2. Technical indicators for the whole universe in one pass
+    table = prime_technical_snapshot(tickers, period=window, persist=True)
+    summary["technical"] = len(table)
+
+    # 3. Streaming states, for tickers whose saved snapshot goes stale intraday
+    states = get_indicator_states()
+    for ticker in table.index:
+        try:
+            states.latest(ticker, period=window)
+        except Exception as e:
+            summary["failed"].append(f"{ticker}: {e}")
+
+    # 4. Portfolio metric inputs per distinct ticker set
+    cache = get_covariance_cache()
+    for ticker_set in ticker_sets:
+        try:
+            cache.get(ticker_set, window=window, as_of=as_of, persist=True)
+        except Exception as e:
+            summary["failed"].append(f"{','.join(ticker_set)}: {e}")
+    if as_of is not None:
+        summary["pruned"] = cache.prune_disk(before=as_of)
+
+    # 5. Metrics of every portfolio, saved under the key the dashboard looks up
+    if portfolios:
+        summary["reports"] = save_portfolio_reports(portfolios, as_of, window=window, client=client)
+
+    # 6. News for every held ticker, each article stored once
+    summary["news"] = ingest_news(tickers)
+
+    summary["as_of"] = f"{as_of:%Y-%m-%d}" if as_of is not None else None
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    return summary
+
+def save_portfolio_reports(portfolios: dict[str, dict[str, float]], as_of, window: str = DEFAULT_WINDOW,
+                           client=None) -> dict:
+    """Computes the metrics of all `portfolios` in one batch and saves the ones not stored yet."""
+    from ..portfolio.analytics import ROLLING_WINDOWS, calculate_portfolio_metrics_batch, calculate_risk_contributions
+    from ..portfolio.reports import encode_report, find_report, portfolio_content_hash, save_report
+
+    ids = list(portfolios)
+    results = calculate_portfolio_metrics_batch([portfolios[i] for i in ids], rolling_windows=ROLLING_WINDOWS,
+                                                window=window)
+    summary = {"portfolios": len(ids), "computed": 0, "saved": 0, "failed": []}
+    for portfolio_id, metrics in zip(ids, results):
+        if "error" in metrics:
+            summary["failed"].append(f"{portfolio_id}: {metrics['error']}")
+            continue
+        summary["computed"] += 1
+        if client is None or as_of is None or window != DEFAULT_WINDOW:
+            continue  # The dashboard's reports are computed over the default window
+        try:
+            content_hash = portfolio_content_hash(portfolios[portfolio_id], as_of)
+            if find_report(client, portfolio_id, content_hash) is None:
+                contributions = calculate_risk_contributions(portfolios[portfolio_id])
+                save_report(client, portfolio_id, content_hash, encode_report(metrics, contributions))
+                summary["saved"] += 1
+        except Exception as e:
+            summary["failed"].append(f"{portfolio_id}: {e}")
+    return summary
+
+def run_nightly(client=None, window: str = DEFAULT_WINDOW, news_only: bool = False) -> dict:
+    """Collects the held ticker sets from Supabase (as the service role) and precomputes them."""
+    if client is None:
+        from ..utils.db import get_service_supabase
+        client = get_service_supabase()
+    portfolios = None if news_only else held_portfolios(client)
+    return precompute(held_ticker_sets(client), window=window, news_only=news_only, portfolios=portfolios, client=client)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute technical reports and metric inputs for held tickers.")
+    parser.add_argument("--window", default=DEFAULT_WINDOW, help="Lookback period (default: %(default)s)")
+    parser.add_argument("--news-only", action="store_true", help="Only ingest the news of held tickers")
+    parser.add_argument("--queue", action="store_true", help="Enqueue as a background job instead of running here")
+    args = parser.parse_args()
+
+    if args.queue:
+        from .queue import get_job_queue
+        job = get_job_queue().submit("precompute", {"window": args.window, "news_only": args.news_only})
+        print(f"Queued precompute job {job.id}")
+        return
+
+    summary = run_nightly(window=args.window, news_only=args.news_only)
+    if not args.news_only:
+        print(f"Precomputed {summary['tickers']} tickers / {summary['ticker_sets']} ticker sets "
+              f"as of {summary.get('as_of')} in {summary['seconds']}s")
+    if "news" in summary:
+        news = summary["news"]
+        print(f"Ingested {news['articles']} articles ({news['new']} new) for {news['tickers']} tickers")
+        summary["failed"] += news["failed"]
+    if "reports" in summary:
+        reports = summary["reports"]
+        print(f"Computed metrics of {reports['computed']}/{reports['portfolios']} portfolios "
+              f"({reports['saved']} reports saved)")
+        summary["failed"] += reports["failed"]
+    for failure in summary["failed"]:
+        print(f"  failed: {failure}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Persistent job queue for analyses and rebalancing plans, stored in SQLite.
+
+The Streamlit app (or the CLI) submits jobs; worker processes (`src/jobs/worker.py`)
+claim them by priority and record progress, results and errors. The UI polls
+the job rows. An identical job the same user submitted that is still queued
+or running is reused instead of enqueued twice. Per-kind and per-user limits
+cap how many jobs run at once. Only the worker holding a job's lease can record
+its outcome, so a worker whose job was handed to another after a stall cannot
+overwrite the new result.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..utils.paths import get_data_dir
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+# Max jobs of a kind running at once across all workers (unlisted kinds: no limit)
+DEFAULT_LIMITS = {"analysis": int(os.getenv("GRYPHON_MAX_ANALYSES", 4)), "rebalance": 2}
+STALE_AFTER = 600  # Seconds without a heartbeat before a running job is handed to another worker
+MAX_ATTEMPTS = 2
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict
+    priority: int = 0
+    status: str = QUEUED
+    user_id: str | None = None
+    result: Any = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list)
+    attempts: int = 0
+    worker: str | None = None
+    created_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"], kind=row["kind"], payload=json.loads(row["payload"]), priority=row["priority"],
+            status=row["status"], user_id=row["user_id"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"], events=json.loads(row["events"] or "[]"), attempts=row["attempts"],
+            worker=row["worker"], created_at=row["created_at"], started_at=row["started_at"], finished_at=row["finished_at"],
+        )
+
+def dedup_key(kind: str, payload: dict, user_id: str | None = None) -> str:
+    """Identity of a request; per user, so every job (and its events) belongs to the user who asked."""
+    request = f"{kind}\x00{user_id or ''}\x00{json.dumps(payload, sort_keys=True, default=str)}"
+    return hashlib.sha256(request.encode()).hexdigest()
+
+class JobQueue:
+    """
+    SQLite-backed priority queue shared by the app and the worker processes.
+
+    Args:
+        path: Database file (default: `<data dir>/jobs.sqlite`).
+        limits: Max running jobs per kind.
+        per_user: Max running jobs per user (None = no limit).
+    """
+
+    def __init__(self, path: str | None = None, limits: dict[str, int] | None = None, per_user: int | None = None):
+        self.path = str(path or get_data_dir() / "jobs.sqlite")
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.per_user = per_user
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers (the UI) never wait for workers
+        finally:
+            conn.close()
+        with self._connect() as conn:
+            conn.execute("""
+                create table if not exists jobs (
+                    id text primary key,
+                    kind text not null,
+                    payload text not null,
+                    dedup_key text not null,
+                    priority integer not null default 0,
+                    status text not null,
+                    user_id text,
+                    result text,
+                    error text,
+                    events text,
+                    attempts integer not null default 0,
+                    worker text,
+                    heartbeat real,
+                    created_at real not null,
+                    started_at real,
+                    finished_at real
+                )
+            """)
+            conn.execute("create index if not exists jobs_pending on jobs (status, priority desc, created_at)")
+            # At most one queued or running job per identical request
+            conn.execute(f"create unique index if not exists jobs_dedup on jobs (dedup_key) where status in {ACTIVE}")
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("begin immediate" if immediate else "begin")
+            try:
+                yield conn
+                conn.execute("commit")
+            except BaseException:
+                conn.execute("rollback")
+                raise
+        finally:
+            conn.close()
+
+    # --- Producers / UI ---
+
+    def submit(self, kind: str, payload: dict, priority: int = 0, user_id: str | None = None) -> Job:
+        """Enqueues a job, or returns the user's identical queued/running one."""
+        key = dedup_key(kind, payload, user_id)
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(f"select * from jobs where dedup_key = ? and status in {ACTIVE}", (key,)).fetchone()
+            if row:
+                if priority > row["priority"]:
+                    conn.execute("update jobs set priority = ? where id = ?", (priority, row["id"]))
+                return self._get(conn, row["id"])
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "insert into jobs (id, kind, payload, dedup_key, priority, status, user_id, events, created_at) "
+                "values (?, ?, ?, ?, ?, ?, ?, '[]', ?)",
+                (job_id, kind, json.dumps(payload, default=str), key, priority, QUEUED, user_id, time.time()),
+            )
+            return self._get(conn, job_id)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._connect() as conn:
+            return self._get(conn, job_id)
+
+    def jobs(self, user_id: str | None = None, limit: int = 50) -> list[Job]:
+        """Newest jobs first, optionally only one user's."""
+        query, params = "select * from jobs", []
+        if user_id is not None:
+            query, params = query + " where user_id = ?", [user_id]
+        with self._connect() as conn:
+            rows = conn.execute(query + " order by created_at desc limit ?", (*params, limit)).fetchall()
+        return [Job.from_row(r) for r in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not started yet."""
+        with self._connect(immediate=True) as conn:
+            cur = conn.execute("update jobs set status = ?, finished_at = ? where id = ? and status = ?",
+                               (CANCELLED, time.time(), job_id, QUEUED))
+            return cur.rowcount > 0
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute("select status, count(*) from jobs group by status").fetchall()
+        return {status: n for status, n in rows}
+
+    # --- Workers ---
+
+    def claim(self, worker_id: str, kinds: list[str] | None = None) -> Job | None:
+        """Atomically takes the highest-priority queued job that fits the concurrency limits."""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            self._requeue_stale(conn, now)
+            running = dict(conn.execute(f"select kind, count(*) from jobs where status = '{RUNNING}' group by kind").fetchall())
+            full_kinds = [k for k, limit in self.limits.items() if running.get(k, 0) >= limit]
+
+            query = f"select * from jobs where status = '{QUEUED}'"
+            params: list = []
+            if kinds:
+                query += f" and kind in ({','.join('?' * len(kinds))})"
+                params += kinds
+            if full_kinds:
+                query += f" and kind not in ({','.join('?' * len(full_kinds))})"
+                params += full_kinds
+            if self.per_user is not None:
+                query += (f" and (user_id is null or (select count(*) from jobs r where r.status = '{RUNNING}'"
+                          " and r.user_id = jobs.user_id) < ?)")
+                params.append(self.per_user)
+            row = conn.execute(query + " order by priority desc, created_at limit 1", params).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "update jobs set status = ?, worker = ?, heartbeat = ?, started_at = ?, attempts = attempts + 1 where id = ?",
+                (RUNNING, worker_id, now, now, row["id"]),
+            )
+            return self._get(conn, row["id"])
+
+    def heartbeat(self, job_id: str, events: list[dict] | None = None):
+        """Marks a running job alive, optionally appending progress events."""
+        with self._connect(immediate=True) as conn:
+            if events:
+                row = conn.execute("select events from jobs where id = ?", (job_id,)).fetchone()
+                merged = json.loads(row["events"] or "[]") + events if row else events
+                conn.execute("update jobs set heartbeat = ?, events = ? where id = ?", (time.time(), json.dumps(merged), job_id))
+            else:
+                conn.execute("update jobs set heartbeat = ? where id = ?", (time.time(), job_id))
+
+    def complete(self, job_id: str, result: Any, worker_id: str) -> bool:
+        """Records the result; False if `worker_id` no longer holds the job (nothing is written)."""
+        return self._finish(job_id, worker_id, DONE, result=json.dumps(result, default=str))
+
+    def fail(self, job_id: str, error: str, worker_id: str) -> bool:
+        """Records the error; False if `worker_id` no longer holds the job (nothing is written)."""
+        return self._finish(job_id, worker_id, FAILED, error=error)
+
+    # --- Internals ---
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: str | None = None,
+                error: str | None = None) -> bool:
+        with self._connect(immediate=True) as conn:
+            cur = conn.execute(
+                f"update jobs set status = ?, result = ?, error = ?, finished_at = ? "
+                f"where id = ? and worker = ? and status = '{RUNNING}'",
+                (status, result, error, time.time(), job_id, worker_id),
+            )
+            return cur.rowcount > 0
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, job_id: str) -> Job | None:
+        row = conn.execute("select * from jobs where id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    @staticmethod
+    def _requeue_stale(conn: sqlite3.Connection, now: float):
+        """Hands jobs of crashed workers back to the queue (or fails them after MAX_ATTEMPTS)."""
+        cutoff = now - STALE_AFTER
+        conn.execute(f"update jobs set status = '{FAILED}', error = 'Worker stopped responding', finished_at = ? "
+                     f"where status = '{RUNNING}' and heartbeat < ? and attempts >= ?", (now, cutoff, MAX_ATTEMPTS))
+        conn.execute(f"update jobs set status = '{QUEUED}', worker = null "
+                     f"where status = '{RUNNING}' and heartbeat < ?", (cutoff,))
+
+_queue: JobQueue | None = None
+
+def get_job_queue() -> JobQueue:
+    """Returns the process-wide JobQueue on the default database."""
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
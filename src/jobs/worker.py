@@ -0,0 +1,172 @@
+"""
+Worker processes for the job queue.
+
+Run a pool from the command line:
+
+    python -m src.jobs.worker --workers 4
+
+Each process builds its own GryphonEngine (agents, LLM clients, caches) and
+its own event logger, claims jobs one at a time and records their progress
+events, result or error. Events logged while a job runs belong to its user.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import socket
+import threading
+import time
+from typing import Callable
+
+from ..utils.events import configure_event_logger, event_user, get_event_logger
+from .queue import JobQueue, Job
+
+POLL_INTERVAL = 1.0       # Seconds between claims when the queue is empty
+HEARTBEAT_INTERVAL = 5.0  # Seconds between progress flushes / heartbeats of a running job
+
+def _run_analysis(engine, job: Job, on_event) -> str:
+    # Same wrapper as the app's direct path: ANALYSIS_START/FINISH/ERROR events and start/end progress
+    result = engine.analyze(job.payload["ticker"], on_event=on_event)
+    if not result.ok:
+        raise RuntimeError(result.error)
+    return str(result.output)
+
+def _run_rebalance(engine, job: Job, on_event) -> str:
+    p = job.payload
+    return str(engine.rebalance(p["holdings"], p["metrics"], p["risk_profile"]))
+
+def _run_precompute(engine, job: Job, on_event) -> dict:
+    from .nightly import run_nightly
+    return run_nightly(window=job.payload.get("window", "2y"), news_only=job.payload.get("news_only", False))
+
+HANDLERS: dict[str, Callable] = {"analysis": _run_analysis, "rebalance": _run_rebalance, "precompute": _run_precompute}
+
+class _ProgressBuffer:
+    """Collects a job's progress events and flushes them with the heartbeat (tokens are not stored)."""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._events: list[dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+        self._thread.start()
+
+    def __call__(self, event):
+        if event.kind == "llm_token":
+            return
+        with self._lock:
+            self._events.append({"kind": event.kind, "ticker": event.ticker, "time": event.time, "data": event.data})
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+        self.queue.heartbeat(self.job_id, events)
+
+    def _beat(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: heartbeat failed for job {self.job_id}: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+def process_job(queue: JobQueue, engine, job: Job):
+    """Runs one claimed job and records its outcome."""
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        queue.fail(job.id, f"Unknown job kind: {job.kind}", job.worker)
+        return
+
+    progress = _ProgressBuffer(queue, job.id)
+    try:
+        with event_user(job.user_id):
+            result = handler(engine, job, progress)
+    except Exception as e:
+        progress.close()
+        _record(queue.fail(job.id, str(e), job.worker), job)
+        return
+    finally:
+        logger = get_event_logger()
+        if logger is not None:
+            logger.flush()  # Workers are terminated, not shut down: don't keep events buffered
+    progress.close()
+    _record(queue.complete(job.id, result, job.worker), job)
+
+def _record(recorded: bool, job: Job):
+    if not recorded:
+        print(f"[{job.worker}] {job.kind} job {job.id} was handed to another worker; its outcome was not saved")
+
+def run_worker(queue_path: str | None = None, worker_id: str | None = None, kinds: list[str] | None = None,
+               max_jobs: int | None = None, stop: threading.Event | None = None):
+    """Claims and runs jobs until `stop` is set (or `max_jobs` have run)."""
+    from ..main_crew import GryphonEngine
+
+    queue = JobQueue(queue_path)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        from ..utils.db import get_service_supabase
+        configure_event_logger(get_service_supabase())
+    except Exception as e:
+        print(f"[{worker_id}] Event logging disabled: {e}")
+    engine = GryphonEngine()
+    handled = 0
+    while not (stop and stop.is_set()) and (max_jobs is None or handled < max_jobs):
+        job = queue.claim(worker_id, kinds)
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        print(f"[{worker_id}] {job.kind} job {job.id} started")
+        process_job(queue, engine, job)
+        handled += 1
+
+class WorkerPool:
+    """A set of worker processes serving one queue."""
+
+    def __init__(self, workers: int = 2, queue_path: str | None = None, kinds: list[str] | None = None):
+        self.workers = workers
+        self.queue_path = queue_path
+        self.kinds = kinds
+        self.processes: list[mp.Process] = []
+
+    def start(self) -> "WorkerPool":
+        ctx = mp.get_context("spawn")  # Fresh interpreters: no inherited threads or sockets
+        for i in range(self.workers):
+            p = ctx.Process(target=run_worker, kwargs={"queue_path": self.queue_path, "kinds": self.kinds},
+                            name=f"gryphon-worker-{i}", daemon=True)
+            p.start()
+            self.processes.append(p)
+        return self
+
+    def alive(self) -> int:
+        return sum(p.is_alive() for p in self.processes)
+
+    def stop(self, timeout: float = 5.0):
+        for p in self.processes:
+            p.terminate()
+        for p in self.processes:
+            p.join(timeout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Gryphon job workers.")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+    parser.add_argument("--kind", action="append", dest="kinds", help="Only run jobs of this kind (repeatable)")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker(kinds=args.kinds)
+        return
+    pool = WorkerPool(args.workers, kinds=args.kinds).start()
+    print(f"Started {args.workers} workers. Press Ctrl+C to stop.")
+    try:
+        for p in pool.processes:
+            p.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,293 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
-import os
-from crewai import Crew, Process
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
 
-from .agents.factory import ScoutAgent, AnalystAgent, RiskAgent, StrategistAgent
-from .tasks import GryphonTasks
+from .agents.pool import AgentPool, get_agent_pool
+from .utils.events import log_event
+from .utils.progress import ProgressCallback, ProgressEvent, ProgressRoute
+from .utils.tracing import RunTrace, Span, flush_metrics, payload_bytes
 
 load_dotenv()
 
+# crewai, langchain, yfinance and the tools are imported inside the methods that
+# use them, so `import src.main_crew` (and `main.py --help`) stays cheap.
+
+def schedule_task_graph(tasks: list) -> list:
+    """
+    Orders tasks by their `context` dependencies and marks the ones that can run concurrently.
+
+    CrewAI's sequential process starts `async_execution` tasks in the background
+    and joins all of them before the next synchronous task. So every task in a
+    dependency level with more than one task is made async, and the next level
+    starts with a synchronous task that acts as the join point. For Gryphon's
+    crew this runs Scout and Analyst together and starts Risk once both finish.
+    """
+    level = {}
+    for task in tasks:  # tasks are given in a valid topological order
+        deps = [level[id(c)] for c in (task.context or []) if id(c) in level]
+        level[id(task)] = 1 + max(deps) if deps else 0
+
+    levels: dict[int, list] = {}
+    for task in tasks:
+        levels.setdefault(level[id(task)], []).append(task)
+
+    ordered = []
+    previous_parallel = False
+    for depth in sorted(levels):
+        group = levels[depth]
+        parallel = len(group) > 1
+        for i, task in enumerate(group):
+            task.async_execution = parallel and not (i == 0 and previous_parallel)
+            ordered.append(task)
+        previous_parallel = parallel
+
+    # A crew cannot end on an async task
+    ordered[-1].async_execution = False
+    return ordered
+
+def track_task_progress(tasks: list, names: list[str], route: ProgressRoute):
+    """
+    Reports task_start/task_end events (and a task span) for a task graph through task callbacks.
+
+    CrewAI only signals when a task finishes, so a task is reported as started
+    once every task in its `context` has finished (which is when the scheduled
+    crew starts it). Call right before kickoff; the first tasks start then.
+    """
+    name_of = {id(t): name for t, name in zip(tasks, names)}
+    waiting_on = {id(t): {id(c) for c in (t.context or []) if id(c) in name_of} for t in tasks}
+    started: dict[int, float] = {}
+    lock = threading.Lock()
+
+    def start_ready():
+        for t in tasks:
+            if id(t) not in started and not waiting_on[id(t)]:
+                started[id(t)] = time.perf_counter()
+                route.emit("task_start", task=name_of[id(t)], agent=getattr(t.agent, "role", None))
+
+    def on_finish(task, previous):
+        def callback(output):
+            with lock:
+                duration = time.perf_counter() - started.get(id(task), time.perf_counter())
+                text = str(getattr(output, "raw", output))
+                route.record(Span("task", name_of[id(task)], duration, attrs={
+                    "agent": getattr(task.agent, "role", None), "output_bytes": payload_bytes(text),
+                }))
+                route.emit("task_end", task=name_of[id(task)], duration_s=round(duration, 2), output=text)
+                for deps in waiting_on.values():
+                    deps.discard(id(task))
+                start_ready()
+            if previous:
+                previous(output)
+        return callback
+
+    for t in tasks:
+        t.callback = on_finish(t, t.callback)
+    with lock:
+        start_ready()
+
+@dataclass
+class AnalysisResult:
+    """Outcome of one ticker's crew run within a batch."""
+    ticker: str
+    output: Any = None
+    error: str | None = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class GryphonEngine:
-    def __init__(self, ticker: str):
+    def __init__(self, ticker: str | None = None, llm=None, pool: AgentPool | None = None):
         self.ticker = ticker
-        self.llm = self._setup_llm()
+        # Agents and the LLM client come from a long-lived pool shared by every crew
+        self.pool = pool or (AgentPool(llm=llm) if llm is not None else get_agent_pool())
+        self.llm = self.pool.llm
 
-    def _setup_llm(self):
-        # Google Gemini Setup
-        api_key = os.getenv("GOOGLE_API_KEY")
-        model_name = os.getenv("GOOGLE_MODEL_NAME", "gemini-1.5-flash") 
-        
-        if not api_key:
-            print("Warning: GOOGLE_API_KEY not found in .env")
-        
-        return ChatGoogleGenerativeAI(model=model_name, temperature=0, google_api_key=api_key)
+    def run(self, ticker: str | None = None, on_event: ProgressCallback | None = None):
+        """
+        Runs the crew for one ticker and returns its final output.
 
-    def run(self):
-        print(f"Starting Gryphon Engine for {self.ticker}...")
-        
-        # 1. Create Agents
-        scout = ScoutAgent(self.llm).create()
-        analyst = AnalystAgent(self.llm).create()
-        risk = RiskAgent(self.llm).create()
-        strategist = StrategistAgent(self.llm).create()
-        
-        # 2. Define Tasks
-        tasks = GryphonTasks()
+        `on_event` receives ProgressEvents (task start/finish, tool calls with
+        timings, streamed LLM tokens, and the run's trace summary at the end)
+        from whichever thread produces them.
+        """
+        ticker = ticker or self.ticker
+        if not ticker:
+            raise ValueError("No ticker given to GryphonEngine.run")
+        print(f"Starting Gryphon Engine for {ticker}...")
+        from crewai import Crew, Process
+        from .tasks import GryphonTasks
+        from .utils.llm_cache import get_llm_cache
         
-        t_scout = tasks.scout_task(scout, self.ticker)
-        t_analyst = tasks.analyst_task(analyst, self.ticker)
-        t_risk = tasks.risk_task(risk, self.ticker, context_tasks=[t_scout, t_analyst])
-        t_strategist = tasks.strategist_task(strategist, self.ticker, context_tasks=[t_scout, t_analyst, t_risk])
+        # 1. Check out Agents (built once, reused across runs)
+        trace = RunTrace("analysis", ticker)
+        start = time.perf_counter()
+        with self.pool.crew_agents() as agents, agents.route.attach(on_event, ticker, trace=trace) as route:
+            scout, analyst, risk, strategist = agents[:4]
+            
+            # 2. Define Tasks
+            tasks = GryphonTasks()
+            
+            t_scout = tasks.scout_task(scout, ticker)
+            t_analyst = tasks.analyst_task(analyst, ticker)
+            t_risk = tasks.risk_task(risk, ticker, context_tasks=[t_scout, t_analyst])
+            t_strategist = tasks.strategist_task(strategist, ticker, context_tasks=[t_scout, t_analyst, t_risk])
+            
+            # 3. Assemble Crew
+            # Scout and Analyst are independent and run concurrently; Risk waits for both
+            crew = Crew(
+                agents=[scout, analyst, risk, strategist],
+                tasks=schedule_task_graph([t_scout, t_analyst, t_risk, t_strategist]),
+                process=Process.sequential,
+                verbose=True
+            )
+            
+            # 4. Kickoff
+            track_task_progress([t_scout, t_analyst, t_risk, t_strategist], ["Scout", "Analyst", "Risk", "Strategist"], route)
+            error = True
+            try:
+                result = crew.kickoff()
+                error = False
+            finally:
+                route.record(Span("run", "analysis", time.perf_counter() - start,
+                                  attrs={"output_bytes": 0 if error else payload_bytes(result), "error": error}))
+                route.emit("run_trace", rows=trace.summary())
+                flush_metrics()
         
-        # 3. Assemble Crew
-        crew = Crew(
-            agents=[scout, analyst, risk, strategist],
-            tasks=[t_scout, t_analyst, t_risk, t_strategist],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        # 4. Kickoff
-        result = crew.kickoff()
+        llm_cache = get_llm_cache()
+        if llm_cache:
+            print(llm_cache.describe())
+        print(trace.format_table())
+        return result
+
+    def rebalance(self, holdings: dict, metrics: dict, risk_profile: str):
+        """Runs the Advisor on a portfolio and returns its rebalancing plan."""
+        from crewai import Crew
+        from .tasks import GryphonTasks
+
+        # The pooled Advisor (LLM client and agent are reused)
+        trace = RunTrace("rebalance")
+        start = time.perf_counter()
+        with self.pool.advisor() as advisor_agent, \
+                self.pool.advisor_route(advisor_agent).attach(None, None, trace=trace) as route:
+            t_rebalance = GryphonTasks().rebalance_task(
+                agent=advisor_agent,
+                holdings=holdings,
+                metrics=metrics,
+                risk_profile=risk_profile
+            )
+            crew = Crew(agents=[advisor_agent], tasks=[t_rebalance], verbose=True)
+            track_task_progress([t_rebalance], ["Advisor"], route)
+            error = True
+            try:
+                result = crew.kickoff()
+                error = False
+            finally:
+                route.record(Span("run", "rebalance", time.perf_counter() - start,
+                                  attrs={"input_bytes": payload_bytes(holdings) + payload_bytes(metrics),
+                                         "output_bytes": 0 if error else payload_bytes(result), "error": error}))
+                flush_metrics()
+
+        print(trace.format_table())
         return result
+
+    def _prime(self, tickers: list[str]):
+        """Computes the technical indicators for the whole batch in one pass."""
+        try:
+            from .tools.analysis import prime_technical_snapshot
+            prime_technical_snapshot(tickers)
+        except Exception as e:
+            # Not fatal: the Analyst falls back to per-ticker computation
+            print(f"Warning: could not precompute indicators: {e}")
+
+    def analyze(self, ticker: str, on_event: ProgressCallback | None = None) -> AnalysisResult:
+        """
+        Runs one ticker, capturing any failure in the result instead of raising.
+
+        Logs ANALYSIS_START/FINISH (or ERROR) events and emits analysis_start/end
+        progress around `run`; every entry point that analyzes a ticker for a
+        user goes through here.
+        """
+        start = time.perf_counter()
+        log_event("ANALYSIS_START", ticker=ticker)
+        with ProgressRoute().attach(on_event, ticker) as progress:
+            progress.emit("analysis_start")
+            try:
+                output = self.run(ticker, on_event=on_event)
+                duration = time.perf_counter() - start
+                log_event("ANALYSIS_FINISH", ticker=ticker, duration_ms=round(duration * 1000))
+                progress.emit("analysis_end", ok=True, duration_s=round(duration, 2))
+                return AnalysisResult(ticker, output=output, duration=duration)
+            except Exception as e:
+                duration = time.perf_counter() - start
+                log_event("ERROR", ticker=ticker, source="analysis", message=str(e), duration_ms=round(duration * 1000))
+                progress.emit("analysis_end", ok=False, error=str(e), duration_s=round(duration, 2))
+                return AnalysisResult(ticker, error=str(e), duration=duration)
+
+    def run_many(self, tickers: list[str], max_concurrency: int = 4,
+                 on_event: ProgressCallback | None = None) -> Iterator[AnalysisResult]:
+        """
+        Analyzes several tickers concurrently on a bounded thread pool.
+
+        Yields an AnalysisResult per ticker in completion order. A failing
+        ticker yields a result with `error` set and does not abort the batch.
+        Progress events of every ticker go to `on_event` (see `run`).
+        """
+        tickers = list(dict.fromkeys(tickers))
+        self._prime(tickers)
+        pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="gryphon")
+        try:
+            # Each crew runs in a copy of the caller's context (e.g. the user its events belong to)
+            futures = [pool.submit(contextvars.copy_context().run, self.analyze, t, on_event) for t in tickers]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # If the consumer stops early, drop the tickers that have not started yet
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stream_many(self, tickers: list[str], max_concurrency: int = 4) -> Iterator[ProgressEvent | AnalysisResult]:
+        """
+        Queue-based variant of `run_many` for live views.
+
+        The batch runs on a background thread; this generator yields its
+        ProgressEvents and AnalysisResults in the order they happen.
+        """
+        events: queue.Queue = queue.Queue()
+        done = object()
+
+        def work():
+            try:
+                for result in self.run_many(tickers, max_concurrency, on_event=events.put):
+                    events.put(result)
+            except Exception as e:
+                events.put(e)
+            finally:
+                events.put(done)
+
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(work,), name="gryphon-stream", daemon=True)
+        worker.start()
+        while (item := events.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def arun_many(self, tickers: list[str], max_concurrency: int = 4,
+                        on_event: ProgressCallback | None = None) -> AsyncIterator[AnalysisResult]:
+        """Async variant of `run_many`; crews run in worker threads, bounded by a semaphore."""
+        tickers = list(dict.fromkeys(tickers))
+        await asyncio.to_thread(self._prime, tickers)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _analyze(ticker: str) -> AnalysisResult:
+            async with semaphore:
+                return await asyncio.to_thread(self.analyze, ticker, on_event)
+
+        for next_done in asyncio.as_completed([_analyze(t) for t in tickers]):
+            yield await next_done
@@ -1,40 +1,30 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from ..data.price_store import get_price_store
+from .risk_model import BENCHMARK, DEFAULT_WINDOW, ReturnStats, get_covariance_cache
+
+RISK_FREE_RATE = 0.04
+TRADING_DAYS = 252
+ROLLING_WINDOWS = (21, 63, 252)
+
 def fetch_data(tickers: list[str], period="2y") -> pd.DataFrame:
     """Fetches historical adjusted close prices for tickers + SPY benchmark."""
     all_tickers = tickers + ["SPY"]
-    # yfinance allows space-separated tickers
-    # Use 'Close' as newer yfinance versions might default to auto_adjust=True or similar
-    data = yf.download(all_tickers, period=period, progress=False)
-    
-    # Handle MultiIndex if present (Price, Ticker)
-    if isinstance(data.columns, pd.MultiIndex):
-        # specific handling for 'Close' or 'Adj Close'
-        if 'Adj Close' in data.columns.get_level_values(0):
-             return data['Adj Close']
-        elif 'Close' in data.columns.get_level_values(0):
-             return data['Close']
-        else:
-             # Fallback: just return the first level if it matches tickers? 
-             # Or maybe it has no Price level if single ticker? (But we always have SPY)
-             return data.xs('Close', axis=1, level=0, drop_level=True)
-             
-    # Fallback for single index (older versions or single ticker)
-    if "Adj Close" in data:
-        return data["Adj Close"]
-    return data["Close"]
-
-def calculate_portfolio_metrics(holdings: dict[str, float]) -> dict:
+    # Served from the local price store; only bars newer than the last stored date hit Yahoo
+    return get_price_store().closes(all_tickers, period=period)
+
+def calculate_portfolio_metrics(holdings: dict[str, float], rolling_windows: tuple[int, ...] | None = None) -> dict:
     """
     Calculates portfolio metrics based on share counts.
-    
+
     Args:
-        holdings: Dict mapping ticker symbol to number of shares. 
+        holdings: Dict mapping ticker symbol to number of shares.
                   e.g., {"AAPL": 10, "TSLA": 5}
-    
+        rolling_windows: Optional windows (in trading days) for rolling metric series,
+                  e.g. ROLLING_WINDOWS.
+
     Returns:
         Dict containing:
         - total_value
@@ -43,85 +33,249 @@ def calculate_portfolio_metrics(holdings: dict[str, float]) -> dict:
         - sharpe_ratio
         - max_drawdown
         - asset_allocation (dict of weights)
+        - rolling (only with rolling_windows): {window: DataFrame of beta, volatility,
+          sharpe_ratio and drawdown per day}
     """
     if not holdings:
         return {"error": "No holdings provided"}
 
-    tickers = list(holdings.keys())
-    
-    # 1. Fetch Data
+    # 1. Fetch Data (return statistics are shared across portfolios with the same tickers)
     try:
-        prices = fetch_data(tickers)
+        stats = get_covariance_cache().get(list(holdings.keys()))
     except Exception as e:
         return {"error": f"Failed to fetch market data: {str(e)}"}
 
-    if prices.empty:
-        return {"error": "No price data found"}
+    return _metrics_from_stats(stats, [holdings], rolling_windows)[0]
+
+def calculate_portfolio_metrics_batch(portfolios: list[dict[str, float]] | pd.DataFrame,
+                                      rolling_windows: tuple[int, ...] | None = None,
+                                      window: str = DEFAULT_WINDOW) -> list[dict]:
+    """
+    Calculates the metrics of `calculate_portfolio_metrics` for many portfolios at once.
+
+    Prices are refreshed once for the union of tickers. Portfolios holding the
+    same tickers share one ReturnStats entry, and each group's metrics are
+    computed with matrix operations over a (tickers x portfolios) weight matrix.
+
+    Args:
+        portfolios: List of holdings dicts, or a (portfolios x tickers) DataFrame of share counts
+                    (NaN = ticker not held).
+        rolling_windows: Optional windows for rolling metric series (see `rolling_metrics`).
+        window: Lookback period of the return statistics.
+
+    Returns:
+        One metrics dict per portfolio, in input order ({"error": ...} for ones that cannot be computed).
+    """
+    if isinstance(portfolios, pd.DataFrame):
+        portfolios = [row.dropna().to_dict() for _, row in portfolios.iterrows()]
+    results: list[dict | None] = [None] * len(portfolios)
 
-    # 2. Calculate Current Value & Weights
-    latest_prices = prices.iloc[-1]
-    portfolio_value = 0.0
-    weights = {}
-    
-    for t in tickers:
-        # Handle case where ticker might be missing in data
-        if t not in latest_prices:
+    groups: dict[frozenset, list[int]] = {}
+    for i, holdings in enumerate(portfolios):
+        if holdings:
+            groups.setdefault(frozenset(holdings), []).append(i)
+        else:
+            results[i] = {"error": "No holdings provided"}
+    if not groups:
+        return results
+
+    # 1. Fetch Data (once for every portfolio, then one ReturnStats per ticker set)
+    store = get_price_store()
+    cache = get_covariance_cache()
+    try:
+        store.refresh(sorted(set().union(*groups)) + [BENCHMARK], period=window)
+        as_of = store.last_completed_date(BENCHMARK)
+    except Exception as e:
+        return [r or {"error": f"Failed to fetch market data: {str(e)}"} for r in results]
+
+    for tickers, members in groups.items():
+        try:
+            stats = cache.get(list(tickers), window=window, as_of=as_of)
+        except Exception as e:
+            for i in members:
+                results[i] = {"error": f"Failed to fetch market data: {str(e)}"}
             continue
-        val = latest_prices[t] * holdings[t]
-        portfolio_value += val
-        
-    if portfolio_value == 0:
+        for i, metrics in zip(members, _metrics_from_stats(stats, [portfolios[i] for i in members], rolling_windows)):
+            results[i] = metrics
+    return results
+
+def _metrics_from_stats(stats: ReturnStats, portfolios: list[dict[str, float]],
+                        rolling_windows: tuple[int, ...] | None = None) -> list[dict]:
+    """Metrics of portfolios that all hold the tickers of `stats`, one matrix pass for the group."""
+    if not stats.tickers or len(stats.dates) < 2:
+        return [{"error": "No price data found"} for _ in portfolios]
+
+    # 2. Calculate Current Value & Weights, (portfolios x tickers)
+    shares = np.array([[float(h.get(t, 0.0)) for t in stats.tickers] for h in portfolios])
+    position_values = shares * stats.latest_prices
+    portfolio_values = position_values.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.nan_to_num(position_values / portfolio_values[:, None])
+
+    # 3. Calculate Metrics from the cached moments: w'Σw, w'cov(R, SPY), w'μ
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = weights @ stats.benchmark_cov / stats.benchmark_var
+        daily_vol = np.sqrt(np.einsum("pi,ij,pj->p", weights, stats.cov, weights))
+        volatility = daily_vol * np.sqrt(TRADING_DAYS)
+        risk_free_daily = RISK_FREE_RATE / TRADING_DAYS
+        sharpe_ratio = ((weights @ stats.mean - risk_free_daily) / daily_vol) * np.sqrt(TRADING_DAYS)
+
+    # Max Drawdown needs the return path, (dates x portfolios)
+    portfolio_returns = stats.returns @ weights.T
+    cumulative_returns = np.cumprod(1 + portfolio_returns, axis=0)
+    peak = np.maximum.accumulate(cumulative_returns, axis=0)
+    max_drawdown = ((cumulative_returns - peak) / peak).min(axis=0)
+
+    series = None
+    if rolling_windows:
+        series = rolling_metrics(
+            pd.DataFrame(portfolio_returns, index=stats.dates),
+            pd.Series(stats.benchmark_returns, index=stats.dates),
+            rolling_windows,
+        )
+
+    results = []
+    for p, holdings in enumerate(portfolios):
+        if portfolio_values[p] == 0:
+            results.append({"error": "Portfolio value is zero"})
+            continue
+        by_ticker = dict(zip(stats.tickers, weights[p]))
+        metrics = {
+            "total_value": round(float(portfolio_values[p]), 2),
+            "beta": round(float(beta[p]), 2),
+            "volatility": round(float(volatility[p]), 2),
+            "sharpe_ratio": round(float(sharpe_ratio[p]), 2),
+            "max_drawdown": round(float(max_drawdown[p]), 2),
+            "weights": {t: round(float(by_ticker[t]), 2) for t in holdings if by_ticker.get(t)}
+        }
+        if series is not None:
+            metrics["rolling"] = {
+                w: pd.DataFrame({name: frame[p] for name, frame in by_metric.items()})
+                for w, by_metric in series.items()
+            }
+        results.append(metrics)
+    return results
+
+def calculate_risk_contributions(holdings: dict[str, float]) -> dict:
+    """
+    Decomposes annualized portfolio volatility into per-position contributions.
+
+    Args:
+        holdings: Dict mapping ticker symbol to number of shares.
+
+    Returns:
+        Dict containing:
+        - volatility (annualized, sqrt(w'Σw * 252))
+        - positions: {ticker: {weight, marginal, component, percent}} where
+          marginal = ∂σ/∂w_i, component = w_i * marginal (components sum to volatility)
+          and percent = component / volatility
+    """
+    if not holdings:
+        return {"error": "No holdings provided"}
+
+    try:
+        stats = get_covariance_cache().get(list(holdings.keys()))
+    except Exception as e:
+        return {"error": f"Failed to fetch market data: {str(e)}"}
+
+    if not stats.tickers or len(stats.dates) < 2:
+        return {"error": "No price data found"}
+
+    position_values = np.array([holdings[t] for t in stats.tickers]) * stats.latest_prices
+    if position_values.sum() == 0:
         return {"error": "Portfolio value is zero"}
+    weights = position_values / position_values.sum()
 
-    for t in tickers:
-        if t in latest_prices:
-            weights[t] = (latest_prices[t] * holdings[t]) / portfolio_value
-
-    # 3. Calculate Returns
-    returns = prices.pct_change().dropna()
-    
-    # Portfolio Daily Returns = Sum(Weight_i * Return_i)
-    # We construct portfolio return series
-    portfolio_returns = pd.Series(0, index=returns.index)
-    for t, w in weights.items():
-        if t in returns.columns:
-            portfolio_returns += returns[t] * w
-            
-    benchmark_returns = returns["SPY"]
-    
-    # 4. Calculate Metrics
-    
-    # Beta
-    # Covariance(Port, SPY) / Variance(SPY)
-    covariance = np.cov(portfolio_returns, benchmark_returns)[0][1]
-    benchmark_variance = np.var(benchmark_returns)
-    beta = covariance / benchmark_variance
-    
-    # Volatility (Annualized)
-    # Daily Std Dev * Sqrt(252)
-    daily_vol = np.std(portfolio_returns)
-    volatility = daily_vol * np.sqrt(252)
-    
-    # Sharpe Ratio (Assuming risk-free rate ~ 4%)
-    # (Mean Return - Risk Free) / Volatility
-    risk_free_daily = 0.04 / 252
-    excess_daily_return = portfolio_returns.mean() - risk_free_daily
-    sharpe_ratio = (excess_daily_return / daily_vol) * np.sqrt(252)
-    
-    # Max Drawdown
-    cumulative_returns = (1 + portfolio_returns).cumprod()
-    peak = cumulative_returns.cummax()
-    drawdown = (cumulative_returns - peak) / peak
-    max_drawdown = drawdown.min()
+    cov = stats.cov * TRADING_DAYS
+    volatility = np.sqrt(weights @ cov @ weights)
+    if volatility == 0:
+        return {"error": "Portfolio has no volatility"}
+    marginal = cov @ weights / volatility
+    component = weights * marginal
 
     return {
-        "total_value": round(portfolio_value, 2),
-        "beta": round(beta, 2),
-        "volatility": round(volatility, 2),
-        "sharpe_ratio": round(sharpe_ratio, 2),
-        "max_drawdown": round(max_drawdown, 2),
-        "weights": {k: round(v, 2) for k, v in weights.items()}
+        "volatility": round(float(volatility), 4),
+        "positions": {
+            t: {
+                "weight": round(float(weights[i]), 4),
+                "marginal": round(float(marginal[i]), 4),
+                "component": round(float(component[i]), 4),
+                "percent": round(float(component[i] / volatility), 4),
+            }
+            for i, t in enumerate(stats.tickers)
+        },
+    }
+
+def _window_sums(cumsum: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-row sums from a cumulative sum (NaN until the window is full)."""
+    out = np.full(cumsum.shape, np.nan)
+    if len(cumsum) >= window:
+        out[window - 1:] = cumsum[window - 1:]
+        out[window:] -= cumsum[:-window]
+    return out
+
+def rolling_metrics(returns: pd.DataFrame, benchmark_returns: pd.Series,
+                    windows: tuple[int, ...] = ROLLING_WINDOWS) -> dict[int, dict[str, pd.DataFrame]]:
+    """
+    Rolling beta, volatility, Sharpe ratio and drawdown for every column of `returns`.
+
+    Each window is computed in a single pass from running sums (and a running max
+    for drawdown), so the cost is O(days x columns) per window regardless of its
+    length. Conventions match the point estimates of `calculate_portfolio_metrics`.
+
+    Args:
+        returns: (dates x series) daily returns, e.g. per ticker or per portfolio.
+        benchmark_returns: Benchmark daily returns on the same dates.
+        windows: Window lengths in trading days.
+
+    Returns:
+        {window: {"beta" | "volatility" | "sharpe_ratio" | "drawdown": DataFrame shaped like `returns`}}
+    """
+    x = returns.to_numpy(dtype=float)
+    b = benchmark_returns.reindex(returns.index).to_numpy(dtype=float)[:, None]
+
+    # Center on the full-sample means so the running sums do not lose precision
+    x_c = x - x.mean(axis=0)
+    b_c = b - b.mean()
+    sums = {
+        "x": np.cumsum(x_c, axis=0),
+        "b": np.cumsum(b_c, axis=0),
+        "xx": np.cumsum(x_c ** 2, axis=0),
+        "bb": np.cumsum(b_c ** 2, axis=0),
+        "xb": np.cumsum(x_c * b_c, axis=0),
     }
+    x_offset = x.mean(axis=0)
+    cumulative = pd.DataFrame(np.cumprod(1 + x, axis=0))
+    risk_free_daily = RISK_FREE_RATE / TRADING_DAYS
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=returns.index, columns=returns.columns)
+
+    result = {}
+    for w in windows:
+        s = {k: _window_sums(v, w) for k, v in sums.items()}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_x, mean_b = s["x"] / w, s["b"] / w
+            var_x = np.maximum(s["xx"] / w - mean_x ** 2, 0)
+            var_b = np.maximum(s["bb"] / w - mean_b ** 2, 0)
+            cov_xb = (s["xb"] - w * mean_x * mean_b) / (w - 1)
+
+            daily_vol = np.sqrt(var_x)
+            beta = cov_xb / var_b
+            sharpe = (mean_x + x_offset - risk_free_daily) / daily_vol * np.sqrt(TRADING_DAYS)
+
+        # Drawdown from the highest value within the trailing window
+        peak = cumulative.rolling(w, min_periods=1).max().to_numpy()
+        drawdown = cumulative.to_numpy() / peak - 1
+        drawdown[:w - 1] = np.nan
+
+        result[w] = {
+            "beta": frame(beta),
+            "volatility": frame(daily_vol * np.sqrt(TRADING_DAYS)),
+            "sharpe_ratio": frame(sharpe),
+            "drawdown": frame(drawdown),
+        }
+    return result
 
 if __name__ == "__main__":
     # Quick Test
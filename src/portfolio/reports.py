@@ -0,0 +1,93 @@
+"""
+Stored portfolio reports, reused while a portfolio and the market data are unchanged.
+
+A report is keyed by a content hash of the positions plus the market-data as-of
+date (the benchmark's last finished session, which the metrics are computed up
+to). Metrics are saved once per hash; advisor plans are saved per hash and risk
+profile.
+"""
+import hashlib
+import json
+import pandas as pd
+
+from ..data.price_store import get_price_store
+from .risk_model import BENCHMARK, DEFAULT_WINDOW
+
+REPORT_VERSION = 1  # Bump when the stored metrics change shape or meaning
+
+def market_as_of(window: str = DEFAULT_WINDOW) -> pd.Timestamp | None:
+    """Date of the benchmark's last finished session (a throttled delta refresh at most)."""
+    store = get_price_store()
+    store.refresh([BENCHMARK], period=window)
+    return store.last_completed_date(BENCHMARK)
+
+def portfolio_content_hash(holdings: dict[str, float], as_of: pd.Timestamp | None) -> str:
+    """Stable hash of the positions (order and ticker case independent) and the as-of date."""
+    positions: dict[str, float] = {}
+    for ticker, shares in holdings.items():
+        key = ticker.strip().upper()
+        positions[key] = positions.get(key, 0.0) + float(shares)
+    payload = {
+        "version": REPORT_VERSION,
+        "positions": sorted((t, repr(s)) for t, s in positions.items()),
+        "as_of": as_of.strftime("%Y-%m-%d") if as_of is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
+
+def _frame_to_json(frame: pd.DataFrame) -> dict:
+    values = frame.round(6).astype(object).where(frame.notna(), None)
+    return {"index": [d.strftime("%Y-%m-%d") for d in frame.index], "columns": values.to_dict(orient="list")}
+
+def _frame_from_json(data: dict) -> pd.DataFrame:
+    return pd.DataFrame(data["columns"], index=pd.DatetimeIndex(data["index"]), dtype=float)
+
+def encode_report(metrics: dict, contributions: dict | None = None) -> dict:
+    """JSON-ready `risk_metrics` payload (rolling frames and risk contributions included)."""
+    payload = {k: v for k, v in metrics.items() if k != "rolling"}
+    if metrics.get("rolling"):
+        payload["rolling"] = {str(w): _frame_to_json(frame) for w, frame in metrics["rolling"].items()}
+    if contributions:
+        payload["contributions"] = contributions
+    return payload
+
+def decode_report(risk_metrics: dict) -> tuple[dict, dict | None]:
+    """Inverse of `encode_report`: returns (metrics, contributions)."""
+    metrics = dict(risk_metrics)
+    contributions = metrics.pop("contributions", None)
+    if "rolling" in metrics:
+        metrics["rolling"] = {int(w): _frame_from_json(data) for w, data in metrics["rolling"].items()}
+    return metrics, contributions
+
+def find_report(sb, portfolio_id: str, content_hash: str, risk_profile: str | None = None) -> dict | None:
+    """
+    Newest stored report for this content hash, or None.
+
+    Without `risk_profile` only a metrics report matches (plan rows carry the
+    metrics without the rolling series and contributions); with it, only one
+    holding an advisor plan for that profile.
+    """
+    query = (sb.table("reports").select("*")
+             .eq("portfolio_id", portfolio_id)
+             .eq("content_hash", content_hash))
+    if risk_profile is None:
+        query = query.is_("risk_profile", "null")
+    else:
+        query = query.eq("risk_profile", risk_profile)
+    rows = query.order("created_at", desc=True).limit(5).execute().data or []
+    for row in rows:
+        if row.get("risk_metrics") and (risk_profile is None or row.get("rebalance_recommendation")):
+            return row
+    return None
+
+def save_report(sb, portfolio_id: str, content_hash: str, risk_metrics: dict,
+                risk_profile: str | None = None, recommendation: str | None = None) -> dict:
+    """Inserts a report row; `risk_metrics` is an `encode_report` payload."""
+    row = {
+        "portfolio_id": portfolio_id,
+        "content_hash": content_hash,
+        "risk_metrics": risk_metrics,
+        "risk_profile": risk_profile,
+        "rebalance_recommendation": recommendation,
+    }
+    res = sb.table("reports").insert(row).execute()
+    return res.data[0] if res.data else row
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..data.price_store import get_price_store
+from ..utils.paths import get_data_dir
+
+BENCHMARK = "SPY"
+DEFAULT_WINDOW = "2y"
+
+@dataclass(frozen=True)
+class ReturnStats:
+    """
+    Return statistics for a ticker set over a window, shared by every portfolio drawn from it.
+
+    Only days on which every ticker and the benchmark traded are used, so the
+    numbers match a dropna() over the combined price frame.
+    """
+    tickers: tuple[str, ...]
+    as_of: pd.Timestamp
+    window: str
+    dates: pd.DatetimeIndex
+    returns: np.ndarray          # (days x tickers) daily returns
+    benchmark_returns: np.ndarray  # (days,)
+    latest_prices: np.ndarray    # (tickers,) last close of each ticker
+    mean: np.ndarray             # (tickers,) mean daily return
+    cov: np.ndarray              # (tickers x tickers) daily covariance, ddof=0
+    benchmark_cov: np.ndarray    # (tickers,) covariance with the benchmark, ddof=1
+    benchmark_var: float         # benchmark variance, ddof=0
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, tickers: list[str], window: str, as_of: pd.Timestamp) -> "ReturnStats":
+        # Tickers without any data are left out of the metrics
+        tickers = [t for t in tickers if t in prices.columns and prices[t].notna().any()]
+        latest = prices[tickers].iloc[-1].to_numpy(dtype=float)
+
+        columns = list(dict.fromkeys(tickers + [BENCHMARK]))
+        returns = prices[columns].pct_change(fill_method=None).dropna()
+        assets = returns[tickers].to_numpy(dtype=float)
+        bench = returns[BENCHMARK].to_numpy(dtype=float)
+
+        n = len(returns)
+        centered = assets - assets.mean(axis=0)
+        bench_centered = bench - bench.mean()
+        return cls(
+            tickers=tuple(tickers),
+            as_of=as_of,
+            window=window,
+            dates=returns.index,
+            returns=assets,
+            benchmark_returns=bench,
+            latest_prices=np.nan_to_num(latest),
+            mean=assets.mean(axis=0),
+            cov=centered.T @ centered / n,
+            benchmark_cov=centered.T @ bench_centered / (n - 1),
+            benchmark_var=float(bench_centered @ bench_centered / n),
+        )
+
+    def save(self, path: Path):
+        """Writes the statistics to an .npz file (atomically)."""
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp, tickers=np.array(self.tickers, dtype=str), as_of=np.array(str(self.as_of)), window=np.array(self.window),
+            dates=self.dates.values.astype("datetime64[ns]").astype(np.int64), returns=self.returns,
+            benchmark_returns=self.benchmark_returns, latest_prices=self.latest_prices, mean=self.mean,
+            cov=self.cov, benchmark_cov=self.benchmark_cov, benchmark_var=np.array(self.benchmark_var),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ReturnStats":
+        with np.load(path) as data:
+            as_of = str(data["as_of"])
+            return cls(
+                tickers=tuple(str(t) for t in data["tickers"]),
+                as_of=pd.Timestamp(as_of) if as_of not in ("None", "NaT") else None,
+                window=str(data["window"]),
+                dates=pd.DatetimeIndex(data["dates"].astype("datetime64[ns]"), name="Date"),
+                returns=data["returns"], benchmark_returns=data["benchmark_returns"],
+                latest_prices=data["latest_prices"], mean=data["mean"], cov=data["cov"],
+                benchmark_cov=data["benchmark_cov"], benchmark_var=float(data["benchmark_var"]),
+            )
+
+class CovarianceCache:
+    """
+    LRU cache of ReturnStats keyed by (ticker set, window, as-of date).
+    The window is a lookback period in price-store notation ("1y", "2y", ...).
+
+    The as-of date defaults to the benchmark's last finished session, so a
+    forming intraday bar does not change the key. A new trading day does, and
+    stale entries simply age out of the LRU.
+
+    Entries saved with `persist=True` (by the nightly precompute) are also kept
+    on disk. Any process can then load them instead of refreshing and reading
+    every ticker's prices.
+    """
+
+    def __init__(self, max_entries: int = 256, root: str | Path | None = None):
+        self.max_entries = max_entries
+        self.root = Path(root) if root else None
+        self._entries: OrderedDict[tuple, ReturnStats] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def _disk_path(self, key: tuple) -> Path | None:
+        tickers, window, as_of = key
+        if as_of is None:
+            return None
+        root = self.root or get_data_dir("return_stats")
+        digest = hashlib.sha1(f"{window}:{','.join(sorted(tickers))}".encode()).hexdigest()[:20]
+        return root / f"{as_of:%Y-%m-%d}_{digest}.npz"
+
+    def get(self, tickers: list[str], window: str = DEFAULT_WINDOW, as_of: pd.Timestamp | None = None,
+            persist: bool = False) -> ReturnStats:
+        store = get_price_store()
+        if as_of is None:
+            # The benchmark's last finished session dates the market data
+            store.refresh([BENCHMARK], period=window)
+            as_of = store.last_completed_date(BENCHMARK)
+
+        key = (frozenset(tickers), window, as_of)
+        path = self._disk_path(key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                stats = self._entries[key]
+                if persist and path is not None and not path.exists():
+                    stats.save(path)
+                return stats
+
+        stats = None
+        if path is not None and path.exists():
+            try:
+                stats = ReturnStats.load(path)
+                with self._lock:
+                    self.disk_hits += 1
+            except Exception:
+                stats = None  # Unreadable file: recompute
+        if stats is None:
+            with self._lock:
+                self.misses += 1
+            prices = store.closes(sorted(set(tickers)) + [BENCHMARK], period=window)
+            if as_of is not None:
+                prices = prices[prices.index <= as_of]
+            stats = ReturnStats.from_prices(prices, sorted(set(tickers)), window, as_of)
+            if persist and path is not None:
+                stats.save(path)
+
+        with self._lock:
+            self._entries[key] = stats
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def prune_disk(self, before: pd.Timestamp) -> int:
+        """Deletes saved entries dated before `before`; returns how many were removed."""
+        root = self.root or get_data_dir("return_stats")
+        removed = 0
+        for path in root.glob("*.npz"):
+            if path.name[:10] < f"{before:%Y-%m-%d}":
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.disk_hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0}
+
+_cache: CovarianceCache | None = None
+_cache_lock = threading.Lock()
+
+def get_covariance_cache() -> CovarianceCache:
+    """Returns the process-wide CovarianceCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CovarianceCache()
+        return _cache
@@ -0,0 +1,137 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from .risk_model import get_covariance_cache
+
+MAX_ALLOCATION = 0.05   # House limit per position
+RISK_BUDGET = 0.01      # Max expected tail loss per position, as a fraction of capital
+CHUNK_SIZE = 25_000     # Paths simulated per batch
+
+def _nearest_cholesky(cov: np.ndarray) -> np.ndarray:
+    """Cholesky factor of `cov`, clipping negative eigenvalues if it is not positive definite."""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh(cov)
+        return vecs * np.sqrt(np.clip(vals, 0, None))
+
+def _simulate_chunk(args) -> np.ndarray:
+    """Simulates one batch of buy-and-hold portfolio returns over the horizon."""
+    log_returns, weights, n_paths, horizon, method, seed = args
+    rng = np.random.default_rng(seed)
+
+    if method == "bootstrap":
+        # Resample whole historical days, keeping the cross-asset correlation of each day
+        growth = np.zeros((n_paths, log_returns.shape[1]))
+        for _ in range(horizon):
+            growth += log_returns[rng.integers(0, len(log_returns), n_paths)]
+    elif method == "parametric":
+        # Multivariate normal daily log returns; the horizon sum is N(h*mu, h*cov)
+        mu = log_returns.mean(axis=0)
+        chol = _nearest_cholesky(np.atleast_2d(np.cov(log_returns, rowvar=False)))
+        z = rng.standard_normal((n_paths, len(mu)))
+        growth = horizon * mu + np.sqrt(horizon) * z @ chol.T
+    else:
+        raise ValueError(f"Unknown simulation method: {method}")
+
+    return np.expm1(growth) @ weights
+
+def simulate_returns(returns: np.ndarray, weights: np.ndarray, n_paths: int = 100_000, horizon: int = 10,
+                     method: str = "bootstrap", seed: int | None = None, workers: int = 1) -> np.ndarray:
+    """
+    Monte Carlo distribution of portfolio returns over `horizon` trading days.
+
+    Args:
+        returns: (days x assets) historical daily simple returns.
+        weights: (assets,) portfolio weights.
+        n_paths: Number of simulated paths.
+        horizon: Holding period in trading days.
+        method: "bootstrap" (resample historical days) or "parametric" (multivariate normal).
+        seed: Seed for reproducible results. The same seed gives the same paths for any `workers`.
+        workers: Number of processes to spread the batches over (1 = in-process).
+
+    Returns:
+        (n_paths,) simulated horizon returns.
+    """
+    log_returns = np.log1p(np.asarray(returns, dtype=float).reshape(len(returns), -1))
+    weights = np.asarray(weights, dtype=float).ravel()
+
+    sizes = [CHUNK_SIZE] * (n_paths // CHUNK_SIZE)
+    if n_paths % CHUNK_SIZE:
+        sizes.append(n_paths % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(log_returns, weights, size, horizon, method, s) for size, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [_simulate_chunk(job) for job in jobs]
+    return np.concatenate(chunks)
+
+def value_at_risk(simulated: np.ndarray, confidence: float = 0.95) -> tuple[float, float]:
+    """Returns (VaR, CVaR) as positive loss fractions at the given confidence."""
+    cutoff = np.quantile(simulated, 1 - confidence)
+    tail = simulated[simulated <= cutoff]
+    return float(-cutoff), float(-tail.mean())
+
+def monte_carlo_risk(holdings: dict[str, float], capital: float | None = None, confidence: float = 0.95,
+                     horizon: int = 10, n_paths: int = 100_000, method: str = "bootstrap",
+                     seed: int | None = None, workers: int = 1) -> dict:
+    """
+    Simulated risk report for a position or portfolio.
+
+    Args:
+        holdings: Dict mapping ticker to weight (any positive scale; normalized here).
+        capital: Total portfolio value, used for dollar figures and position sizing.
+        confidence: VaR/CVaR confidence level.
+        horizon, n_paths, method, seed, workers: see `simulate_returns`.
+
+    Returns:
+        Dict containing var, cvar, expected_return, prob_loss (horizon fractions),
+        stop_loss_pct, suggested_allocation and, with capital, the suggested position
+        value and its dollar VaR/CVaR.
+    """
+    if not holdings:
+        return {"error": "No holdings provided"}
+
+    try:
+        stats = get_covariance_cache().get(list(holdings.keys()))
+    except Exception as e:
+        return {"error": f"Failed to fetch market data: {str(e)}"}
+
+    if not stats.tickers or len(stats.dates) < 2:
+        return {"error": "No price data found"}
+
+    weights = np.array([holdings.get(t, 0.0) for t in stats.tickers], dtype=float)
+    if weights.sum() <= 0:
+        return {"error": "Weights must be positive"}
+    weights /= weights.sum()
+
+    simulated = simulate_returns(stats.returns, weights, n_paths=n_paths, horizon=horizon,
+                                 method=method, seed=seed, workers=workers)
+    var, cvar = value_at_risk(simulated, confidence)
+
+    # Stop just beyond the normal range of moves; size so the tail loss stays inside the risk budget
+    allocation = min(MAX_ALLOCATION, RISK_BUDGET / cvar) if cvar > 0 else MAX_ALLOCATION
+    report = {
+        "tickers": list(stats.tickers),
+        "method": method,
+        "horizon_days": horizon,
+        "confidence": confidence,
+        "paths": n_paths,
+        "expected_return": round(float(simulated.mean()), 4),
+        "prob_loss": round(float((simulated < 0).mean()), 4),
+        "var": round(var, 4),
+        "cvar": round(cvar, 4),
+        "stop_loss_pct": round(var, 4),
+        "suggested_allocation": round(allocation, 4),
+    }
+    if capital:
+        position_value = allocation * capital
+        report.update({
+            "suggested_position_value": round(position_value, 2),
+            "var_amount": round(var * position_value, 2),
+            "cvar_amount": round(cvar * position_value, 2),
+        })
+    return report
@@ -5,7 +5,9 @@ class GryphonTasks:
         return Task(
             description=f"""
             Collect the latest news, market sentiment, and major headlines for {ticker}.
-            1. Search for recent news articles (last 7 days).
+            1. Start with the Market News Finder: it holds the last 7 days of {ticker} news and can search them
+               with a query (e.g. "guidance"). Use Web Search for anything missing, putting related queries in
+               one call separated by ';' (e.g. "{ticker} earnings; {ticker} analyst rating; {ticker} lawsuit").
             2. Identify the general sentiment (Bullish/Bearish/Neutral).
             3. Look for any upcoming events (Earnings, Product Launches).
             4. Summarize the top 3 drivers moving the stock.
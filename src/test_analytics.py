@@ -0,0 +1,144 @@
+from src.bench.fixtures import write_synthetic_fixtures
+from src.data import price_store
+from src.data.price_store import PriceStore, get_price_store, set_price_store
+from src.data.sources import LocalFixtureSource
+from src.portfolio import risk_model
+from src.jobs.nightly import save_portfolio_reports
+from src.portfolio.analytics import (RISK_FREE_RATE, TRADING_DAYS, calculate_portfolio_metrics,
+                                     calculate_portfolio_metrics_batch, rolling_metrics)
+from src.utils.memory_db import MemorySupabase
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+
+TOLERANCE = 1e-9
+
+def _returns(n: int = 600, seed: int = 11) -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2022-01-03", periods=n)
+    bench = pd.Series(rng.normal(0.0004, 0.011, n), index=index)
+    returns = pd.DataFrame({
+        "low_beta": 0.6 * bench + rng.normal(0, 0.008, n),
+        "high_beta": 1.5 * bench + rng.normal(0.0002, 0.02, n),
+    }, index=index)
+    return returns, bench
+
+def test_rolling_metrics_match_pandas():
+    print("\n--- Testing rolling metrics against pandas rolling windows ---")
+    returns, bench = _returns()
+    result = rolling_metrics(returns, bench, windows=(21, 252))
+    risk_free_daily = RISK_FREE_RATE / TRADING_DAYS
+
+    for w, metrics in result.items():
+        for column in returns:
+            x = returns[column]
+            rolling = x.rolling(w)
+            std = rolling.std(ddof=0)
+            cumulative = (1 + x).cumprod()
+            expected = {
+                "beta": rolling.cov(bench) / bench.rolling(w).var(ddof=0),
+                "volatility": std * np.sqrt(TRADING_DAYS),
+                "sharpe_ratio": (rolling.mean() - risk_free_daily) / std * np.sqrt(TRADING_DAYS),
+                "drawdown": cumulative / cumulative.rolling(w, min_periods=1).max() - 1,
+            }
+            expected["drawdown"].iloc[:w - 1] = np.nan
+            for name, series in expected.items():
+                actual = metrics[name][column]
+                assert actual.isna().equals(series.isna()), f"{name} {w}d: NaN pattern differs"
+                diff = (actual - series).abs().max()
+                assert diff < TOLERANCE, f"{name} {w}d {column}: max diff {diff}"
+    print("✅ Rolling metrics Passed")
+
+def test_portfolio_metrics_match_pandas():
+    print("\n--- Testing portfolio metrics against a pandas reference ---")
+    fixtures = write_synthetic_fixtures(tempfile.mkdtemp(), ["AAA", "BBB", "CCC"])
+    saved_store, saved_dir = price_store._store, os.environ.get("GRYPHON_DATA_DIR")
+    os.environ["GRYPHON_DATA_DIR"] = tempfile.mkdtemp()
+    set_price_store(PriceStore(tempfile.mkdtemp(), source=LocalFixtureSource(fixtures)))
+    risk_model._cache = None
+    try:
+        holdings = {"AAA": 10, "BBB": 5, "CCC": 20}
+        metrics = calculate_portfolio_metrics(holdings)
+        missing = calculate_portfolio_metrics({"ZZZ": 4})
+
+        prices = get_price_store().closes(list(holdings) + ["SPY"], period="2y")
+    finally:
+        set_price_store(saved_store)
+        risk_model._cache = None
+        if saved_dir is None:
+            os.environ.pop("GRYPHON_DATA_DIR")
+        else:
+            os.environ["GRYPHON_DATA_DIR"] = saved_dir
+
+    # Reference: the original pandas computation over the combined price frame
+    values = pd.Series(holdings) * prices[list(holdings)].iloc[-1]
+    weights = values / values.sum()
+    returns = prices.pct_change(fill_method=None).dropna()
+    portfolio = returns[list(holdings)] @ weights
+    cumulative = (1 + portfolio).cumprod()
+    expected = {
+        "total_value": values.sum(),
+        "beta": portfolio.cov(returns["SPY"]) / returns["SPY"].var(ddof=0),
+        "volatility": portfolio.std(ddof=0) * np.sqrt(TRADING_DAYS),
+        "sharpe_ratio": (portfolio.mean() - RISK_FREE_RATE / TRADING_DAYS) / portfolio.std(ddof=0) * np.sqrt(TRADING_DAYS),
+        "max_drawdown": (cumulative / cumulative.cummax() - 1).min(),
+    }
+    for name, value in expected.items():
+        assert abs(metrics[name] - value) <= 0.0051, (name, metrics[name], value)
+    assert missing == {"error": "No price data found"}
+    print("✅ Portfolio metrics Passed")
+
+def test_batch_matches_single_portfolio():
+    print("\n--- Testing batch portfolio metrics row by row ---")
+    fixtures = write_synthetic_fixtures(tempfile.mkdtemp(), ["AAA", "BBB", "CCC"])
+    saved_store, saved_dir = price_store._store, os.environ.get("GRYPHON_DATA_DIR")
+    os.environ["GRYPHON_DATA_DIR"] = tempfile.mkdtemp()
+    set_price_store(PriceStore(tempfile.mkdtemp(), source=LocalFixtureSource(fixtures)))
+    risk_model._cache = None
+    portfolios = [
+        {"AAA": 10, "BBB": 5, "CCC": 20},
+        {"CCC": 1, "AAA": 3, "BBB": 7},  # Same ticker set, other weights
+        {"BBB": 2},
+        {"AAA": 4, "ZZZ": 3},            # Unknown tickers are left out
+        {"ZZZ": 4},
+        {},
+    ]
+    try:
+        batch = calculate_portfolio_metrics_batch(portfolios, rolling_windows=(21, 63))
+        single = [calculate_portfolio_metrics(p, rolling_windows=(21, 63)) for p in portfolios]
+        frame = calculate_portfolio_metrics_batch(pd.DataFrame(portfolios[:3]))
+
+        sb = MemorySupabase()
+        by_id = {f"p{i}": p for i, p in enumerate(portfolios[:5])}
+        as_of = get_price_store().last_completed_date("SPY")
+        first = save_portfolio_reports(by_id, as_of, client=sb)
+        again = save_portfolio_reports(by_id, as_of, client=sb)
+    finally:
+        set_price_store(saved_store)
+        risk_model._cache = None
+        if saved_dir is None:
+            os.environ.pop("GRYPHON_DATA_DIR")
+        else:
+            os.environ["GRYPHON_DATA_DIR"] = saved_dir
+
+    for i, (b, s) in enumerate(zip(batch, single)):
+        assert b.keys() == s.keys(), (i, b, s)
+        for key in s:
+            if key == "rolling":
+                for w in s["rolling"]:
+                    pd.testing.assert_frame_equal(b["rolling"][w], s["rolling"][w])
+            else:
+                assert b[key] == s[key], (i, key, b[key], s[key])
+    assert single[4] == {"error": "No price data found"} and single[5] == {"error": "No holdings provided"}
+    assert [{k: v for k, v in m.items() if k != "rolling"} for m in single[:3]] == frame
+
+    # The nightly precompute saves each portfolio once per as-of date
+    assert first["computed"] == 4 and first["saved"] == 4 and len(first["failed"]) == 1, first
+    assert again["saved"] == 0 and len(sb.tables["reports"]) == 4
+    print("✅ Batch portfolio metrics Passed")
+
+if __name__ == "__main__":
+    test_rolling_metrics_match_pandas()
+    test_portfolio_metrics_match_pandas()
+    test_batch_matches_single_portfolio()
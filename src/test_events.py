@@ -0,0 +1,97 @@
+from src.utils.events import EventLogger, event_user
+from src.utils.memory_db import MemorySupabase
+import threading
+import time
+
+class FlakySupabase(MemorySupabase):
+    """Stand-in whose inserts fail while `down` is set."""
+    down = False
+
+    def _execute(self, query):
+        if self.down and query.action == "insert":
+            raise ConnectionError("Supabase unreachable")
+        return super()._execute(query)
+
+def test_size_based_flush():
+    print("\n--- Testing size-based flushing ---")
+    db = MemorySupabase()
+    logger = EventLogger(db, batch_size=10, flush_interval=60)
+    for i in range(25):
+        logger.log("TOOL_CALL", {"i": i})
+    time.sleep(0.2)
+
+    inserts = [c for c in db.calls if c == ("insert", "events")]
+    assert len(db.tables["events"]) == 20, db.tables.get("events")
+    assert len(inserts) == 2  # Two full batches; the other 5 wait for the timer
+    logger.close()
+    assert len(db.tables["events"]) == 25
+    assert logger.stats()["written"] == 25
+    print("✅ Size-based flush Passed")
+
+def test_time_based_flush():
+    print("\n--- Testing time-based flushing ---")
+    db = MemorySupabase()
+    logger = EventLogger(db, batch_size=100, flush_interval=0.1)
+    logger.log("ANALYSIS_START", {"ticker": "AAPL"}, user_id="u1")
+    time.sleep(0.5)
+
+    rows = db.tables.get("events", [])
+    assert len(rows) == 1
+    assert rows[0]["event_type"] == "ANALYSIS_START" and rows[0]["user_id"] == "u1"
+    assert rows[0]["details"] == {"ticker": "AAPL"}
+    logger.close()
+    print("✅ Time-based flush Passed")
+
+def test_bounded_queue_drops():
+    print("\n--- Testing bounded queue ---")
+    db = MemorySupabase()
+    release = threading.Event()
+    original = db._execute
+    db._execute = lambda q: (release.wait(), original(q))[1]  # Stall the writer
+
+    logger = EventLogger(db, batch_size=1, flush_interval=60, max_queue=5)
+    start = time.perf_counter()
+    results = [logger.log("TOOL_CALL") for _ in range(50)]
+    assert time.perf_counter() - start < 0.5  # Callers never block on a slow database
+    assert results.count(False) == logger.stats()["dropped"] > 0
+
+    release.set()
+    logger.close()
+    stats = logger.stats()
+    assert stats["written"] + stats["dropped"] == 50
+    print(f"✅ Bounded queue Passed ({stats['dropped']} dropped)")
+
+def test_failed_inserts_are_counted():
+    print("\n--- Testing failed inserts ---")
+    db = FlakySupabase()
+    db.down = True
+    logger = EventLogger(db, batch_size=3, flush_interval=60)
+    for _ in range(3):
+        logger.log("ERROR", {"message": "boom"})
+    assert logger.flush()
+    db.down = False
+    logger.log("ANALYSIS_FINISH")
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["failed"] == 3 and stats["written"] == 1
+    print("✅ Failed inserts Passed")
+
+def test_event_user_context():
+    print("\n--- Testing user attribution ---")
+    db = MemorySupabase()
+    logger = EventLogger(db)
+    with event_user("u42"):
+        logger.log("ANALYSIS_START")
+    logger.log("ANALYSIS_START")
+    logger.close()
+
+    assert [r["user_id"] for r in db.tables["events"]] == ["u42", None]
+    print("✅ User attribution Passed")
+
+if __name__ == "__main__":
+    test_size_based_flush()
+    test_time_based_flush()
+    test_bounded_queue_drops()
+    test_failed_inserts_are_counted()
+    test_event_user_context()
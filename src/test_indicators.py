@@ -0,0 +1,128 @@
+from src.data import price_store
+from src.data.price_store import PriceStore, set_price_store
+from src.test_price_store import ScriptedSource
+from src.tools.indicators import compute_indicators, latest_indicators
+from src.tools.indicator_state import IndicatorStateStore, TickerIndicators
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+
+TOLERANCE = 1e-9
+
+def _closes(n: int = 400, seed: int = 7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n))),
+                     index=pd.bdate_range("2022-01-03", periods=n))
+
+# Reference implementations: the pandas_ta formulas written out in plain pandas
+
+def _ref_ema(close: pd.Series, length: int) -> pd.Series:
+    close = close.copy()
+    seed = close.iloc[:length].mean()
+    close.iloc[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+def _ref_rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    diff = close.diff()
+    gain = diff.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    loss = diff.clip(upper=0).abs().ewm(alpha=1 / length, min_periods=length).mean()
+    return 100 * gain / (gain + loss)
+
+def _reference(close: pd.Series) -> dict[str, pd.Series]:
+    line = _ref_ema(close, 12) - _ref_ema(close, 26)
+    valid = line.loc[line.first_valid_index():]
+    signal = _ref_ema(valid, 9).reindex(close.index)
+    return {
+        "RSI_14": _ref_rsi(close),
+        "SMA_50": close.rolling(50).mean(),
+        "SMA_200": close.rolling(200).mean(),
+        "MACD_12_26_9": line,
+        "MACDh_12_26_9": line - signal,
+        "MACDs_12_26_9": signal,
+    }
+
+def _assert_close(actual, expected, name):
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    assert (np.isnan(actual) == np.isnan(expected)).all(), f"{name}: NaN pattern differs"
+    assert np.allclose(actual, expected, rtol=0, atol=TOLERANCE, equal_nan=True), \
+        f"{name}: max diff {np.nanmax(np.abs(actual - expected))}"
+
+def test_vectorized_matches_reference():
+    print("\n--- Testing vectorized indicators against the reference ---")
+    # Tickers with different history lengths: the short ones start with NaN
+    closes = pd.DataFrame({"LONG": _closes(400, 1), "MID": _closes(400, 2), "NEW": _closes(400, 3)})
+    closes.iloc[:150, 1] = np.nan
+    closes.iloc[:330, 2] = np.nan
+
+    result = compute_indicators(closes)
+    for ticker in closes:
+        own = closes[ticker].dropna()
+        for name, expected in _reference(own).items():
+            _assert_close(result[name][ticker].loc[own.index], expected, f"{ticker} {name}")
+            assert result[name][ticker].loc[:own.index[0]].iloc[:-1].isna().all()  # Nothing before the first close
+
+    latest = latest_indicators(closes)
+    assert np.isnan(latest.loc["NEW", "SMA_200"])  # 70 closes: not enough for SMA200
+    _assert_close(latest["RSI_14"], result["RSI_14"].iloc[-1], "latest RSI_14")
+    print("✅ Vectorized indicators Passed")
+
+def test_streaming_matches_vectorized():
+    print("\n--- Testing streaming indicators on a growing series ---")
+    close = _closes(300)
+    expected = compute_indicators(close.to_frame("X"))
+    state = TickerIndicators()
+    for i, (date, value) in enumerate(close.items()):
+        preview = state.latest(pending_close=float(value))  # Forming bar, not committed
+        state.update(date, float(value))
+        if i % 10 == 0:
+            state = TickerIndicators.from_dict(json.loads(json.dumps(state.to_dict())))  # Survives a save/load
+        committed = state.latest()
+        for name, frame in expected.items():
+            _assert_close(preview[name], frame["X"].iloc[i], f"preview {name} at bar {i}")
+            _assert_close(committed[name], frame["X"].iloc[i], f"{name} at bar {i}")
+    print("✅ Streaming indicators Passed")
+
+def _bars(close: pd.Series) -> pd.DataFrame:
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                        index=close.index.rename("Date"))
+
+def test_state_store_reseeds_after_adjustment():
+    print("\n--- Testing saved indicator states across a split and the session close ---")
+    close = _closes(300)
+    source = ScriptedSource(_bars(close.iloc[:-1]))
+    states = IndicatorStateStore(tempfile.mkdtemp())
+    saved_store, saved_now = price_store._store, price_store._market_now
+    last = close.index[-1]
+    try:
+        set_price_store(PriceStore(tempfile.mkdtemp(), source=source, min_refresh=0))
+        price_store._market_now = lambda: last.tz_localize(price_store.MARKET_TZ) + pd.Timedelta(hours=11)
+        states.latest("X", period="max")
+
+        # A 2:1 split re-adjusts the whole history, and the last session is still forming
+        adjusted = close / 2
+        source.bars = _bars(adjusted)
+        intraday = states.latest("X", period="max")
+        expected = TickerIndicators()
+        expected.seed(adjusted.iloc[:-1])
+        for name, value in expected.latest(float(adjusted.iloc[-1])).items():
+            _assert_close(intraday[name], value, f"intraday {name}")
+        assert states.load("X").as_of == close.index[-2]  # The forming bar was not committed
+
+        # After the close (in market time) the same bar is final
+        price_store._market_now = lambda: last.tz_localize(price_store.MARKET_TZ) + pd.Timedelta(hours=17)
+        final = states.latest("X", period="max")
+        expected.update(last, float(adjusted.iloc[-1]))
+        for name, value in expected.latest().items():
+            _assert_close(final[name], value, f"final {name}")
+        assert states.load("X").as_of == last
+    finally:
+        set_price_store(saved_store)
+        price_store._market_now = saved_now
+    print("✅ Indicator state reseed Passed")
+
+if __name__ == "__main__":
+    test_vectorized_matches_reference()
+    test_streaming_matches_vectorized()
+    test_state_store_reseeds_after_adjustment()
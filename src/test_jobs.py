@@ -0,0 +1,128 @@
+from src.jobs.queue import JobQueue, DONE, FAILED, QUEUED, RUNNING
+from src.jobs import queue as job_queue
+from src.jobs.worker import process_job
+from src.utils.events import EventLogger
+from src.utils.memory_db import MemorySupabase
+from types import SimpleNamespace
+import tempfile
+import os
+
+def _queue(**kwargs) -> JobQueue:
+    return JobQueue(os.path.join(tempfile.mkdtemp(), "jobs.sqlite"), **kwargs)
+
+class FakeEngine:
+    """Logs analysis events like GryphonEngine.analyze and captures failures in the result."""
+
+    def __init__(self, logger: EventLogger | None = None):
+        self.logger = logger
+
+    def analyze(self, ticker, on_event=None):
+        if self.logger:
+            self.logger.log("ANALYSIS_START", {"ticker": ticker})
+        if ticker == "FAIL":
+            return SimpleNamespace(ok=False, error="crew crashed", output=None)
+        return SimpleNamespace(ok=True, error=None, output=f"HOLD {ticker}")
+
+def test_dedup_and_priority():
+    print("\n--- Testing dedup and priority ---")
+    q = _queue()
+    a = q.submit("analysis", {"ticker": "AAPL"})
+    b = q.submit("analysis", {"ticker": "MSFT"}, priority=5)
+    again = q.submit("analysis", {"ticker": "AAPL"}, priority=10)
+    assert again.id == a.id and again.priority == 10  # Pending duplicate reused and bumped
+
+    assert q.claim("w1").id == a.id
+    assert q.claim("w1").id == b.id
+    assert q.claim("w1") is None
+
+    q.complete(a.id, "HOLD", "w1")
+    assert q.submit("analysis", {"ticker": "AAPL"}).id != a.id  # Finished jobs are not reused
+
+    mine = q.submit("analysis", {"ticker": "NVDA"}, user_id="u1")
+    theirs = q.submit("analysis", {"ticker": "NVDA"}, user_id="u2")
+    assert theirs.id != mine.id and theirs.user_id == "u2"  # Each user's request is their own job
+    assert q.submit("analysis", {"ticker": "NVDA"}, user_id="u2").id == theirs.id
+    print("✅ Dedup and priority Passed")
+
+def test_concurrency_limits():
+    print("\n--- Testing concurrency limits ---")
+    q = _queue(limits={"analysis": 1}, per_user=1)
+    q.submit("analysis", {"ticker": "AAPL"}, user_id="u1")
+    q.submit("analysis", {"ticker": "MSFT"}, user_id="u2")
+    q.submit("rebalance", {"portfolio": 1}, user_id="u1")
+    q.submit("rebalance", {"portfolio": 2}, user_id="u2")
+
+    first = q.claim("w1")
+    second = q.claim("w2")
+    assert first.kind == "analysis" and second.kind == "rebalance"  # Analysis limit reached
+    assert second.user_id != first.user_id                           # Per-user limit
+    assert q.claim("w3") is None
+    print("✅ Concurrency limits Passed")
+
+def test_stale_jobs_are_requeued():
+    print("\n--- Testing stale job recovery ---")
+    q = _queue()
+    job = q.submit("analysis", {"ticker": "AAPL"})
+    q.claim("crashed-worker")
+    original = job_queue.STALE_AFTER
+    job_queue.STALE_AFTER = -1
+    try:
+        reclaimed = q.claim("w2")
+        assert reclaimed.id == job.id and reclaimed.attempts == 2
+        assert q.claim("w3") is None and q.get(job.id).status == FAILED  # Gives up after MAX_ATTEMPTS
+    finally:
+        job_queue.STALE_AFTER = original
+    print("✅ Stale job recovery Passed")
+
+def test_only_lease_holder_records_outcome():
+    print("\n--- Testing outcomes from a stalled worker ---")
+    q = _queue()
+    job = q.submit("analysis", {"ticker": "AAPL"})
+    q.claim("stalled-worker")
+    original = job_queue.STALE_AFTER
+    job_queue.STALE_AFTER = -1
+    try:
+        assert q.claim("w2").worker == "w2"  # Handed over after the missed heartbeats
+    finally:
+        job_queue.STALE_AFTER = original
+
+    assert not q.complete(job.id, "stale verdict", "stalled-worker")
+    assert not q.fail(job.id, "stale error", "stalled-worker")
+    assert q.get(job.id).status == RUNNING
+    assert q.complete(job.id, "HOLD", "w2") and q.get(job.id).result == "HOLD"
+    assert not q.fail(job.id, "late error", "w2")  # Finished jobs stay finished
+    print("✅ Lease check Passed")
+
+def test_process_job():
+    print("\n--- Testing job execution ---")
+    q = _queue()
+    ok = q.submit("analysis", {"ticker": "AAPL"})
+    bad = q.submit("analysis", {"ticker": "FAIL"})
+    unknown = q.submit("export", {})
+    for _ in range(3):
+        process_job(q, FakeEngine(), q.claim("w1"))
+
+    assert q.get(ok.id).status == DONE and q.get(ok.id).result == "HOLD AAPL"
+    assert q.get(bad.id).status == FAILED and "crew crashed" in q.get(bad.id).error
+    assert q.get(unknown.id).status == FAILED
+    assert q.stats() == {DONE: 1, FAILED: 2}
+    print("✅ Job execution Passed")
+
+def test_job_events_belong_to_its_user():
+    print("\n--- Testing job event attribution ---")
+    q, db = _queue(), MemorySupabase()
+    logger = EventLogger(db, batch_size=100, flush_interval=60)
+    q.submit("analysis", {"ticker": "AAPL"}, user_id="u1")
+    process_job(q, FakeEngine(logger), q.claim("w1"))
+    logger.close()
+
+    assert [(r["event_type"], r["user_id"]) for r in db.tables["events"]] == [("ANALYSIS_START", "u1")]
+    print("✅ Job event attribution Passed")
+
+if __name__ == "__main__":
+    test_dedup_and_priority()
+    test_concurrency_limits()
+    test_stale_jobs_are_requeued()
+    test_only_lease_holder_records_outcome()
+    test_process_job()
+    test_job_events_belong_to_its_user()
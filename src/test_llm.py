@@ -0,0 +1,33 @@
+from crewai import Agent, Task
+from src.agents.pool import agent_llm
+from src.bench.fake_llm import FakeChatModel
+from src.utils.llm_cache import SQLiteLLMCache
+from src.utils.progress import ProgressRoute
+from src.utils.tracing import RunTrace
+import os
+import tempfile
+
+def test_agent_llm_keeps_cache_and_callbacks():
+    print("\n--- Testing the LLM cache and progress callbacks through a CrewAI agent ---")
+    cache = SQLiteLLMCache(os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite"))
+    model = FakeChatModel(latency=0, response_words=20, cache=cache)
+    route = ProgressRoute()
+    agent = Agent(role="Scout", goal="Summarize the news", backstory="A news analyst.",
+                  llm=agent_llm(model, route, "Scout"), allow_delegation=False, verbose=False)
+    task = Task(description="Summarize the news for AAPL.", expected_output="A verdict.", agent=agent)
+
+    events, trace = [], RunTrace("analysis", "AAPL")
+    with route.attach(events.append, "AAPL", trace):
+        first = agent.execute_task(task)
+        second = agent.execute_task(task)
+
+    assert first == second and "VERDICT" in str(first)
+    assert model.calls == 1, model.calls            # The second step was answered by the cache
+    assert cache.stats()["hits"] >= 1
+    assert any(e.kind == "llm_token" for e in events)  # Tokens streamed from the first call
+    spans = [s for s in trace.spans if s.kind == "llm" and s.name == "Scout"]
+    assert [s.attrs.get("cache") for s in spans] == ["miss", "hit"], [s.attrs for s in spans]
+    print("✅ Agent LLM cache and callbacks Passed")
+
+if __name__ == "__main__":
+    test_agent_llm_keeps_cache_and_callbacks()
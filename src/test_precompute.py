@@ -0,0 +1,94 @@
+from src.data import price_store
+from src.data.price_store import PriceStore, set_price_store
+from src.data.sources import PriceSource
+from src.portfolio.risk_model import BENCHMARK, CovarianceCache
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+
+TICKERS = ["AAA", "BBB"]
+
+class ScriptedSource(PriceSource):
+    """Serves `self.bars[ticker]`, which the test extends with a forming bar between refreshes."""
+
+    def __init__(self, bars: dict[str, pd.DataFrame]):
+        self.bars = bars
+
+    def fetch(self, ticker, start=None):
+        bars = self.bars[ticker]
+        return bars if start is None else bars[bars.index >= start]
+
+def _bars(n: int, end: pd.Timestamp, seed: int) -> pd.DataFrame:
+    closes = 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, n))
+    index = pd.bdate_range(end=end, periods=n, name="Date")
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1e6}, index=index)
+
+def _intraday_setup():
+    """A store holding every session up to yesterday, with the market clock at 11:00 today."""
+    now = pd.Timestamp.now(tz=price_store.MARKET_TZ).normalize() + pd.Timedelta(hours=11)
+    today = now.tz_localize(None).normalize()
+    yesterday = today - pd.offsets.BDay(1)
+    source = ScriptedSource({t: _bars(300, yesterday, seed) for seed, t in enumerate(TICKERS + [BENCHMARK])})
+    store = PriceStore(tempfile.mkdtemp(), source=source, min_refresh=0)
+    store.refresh(TICKERS + [BENCHMARK], period="1y")
+    price_store._market_now = lambda: now
+    return store, source, today, yesterday
+
+def _add_forming_bar(store: PriceStore, source: ScriptedSource, today: pd.Timestamp):
+    for ticker, bars in source.bars.items():
+        forming = bars.iloc[[-1]].set_axis(pd.DatetimeIndex([today], name="Date")) * 1.01
+        source.bars[ticker] = pd.concat([bars, forming])
+    store.refresh(TICKERS + [BENCHMARK], period="1y")
+    assert store.last_date(BENCHMARK) == today
+
+def test_covariance_cache_survives_intraday_bar():
+    print("\n--- Testing precomputed return stats with a forming intraday bar ---")
+    saved_store, saved_now = price_store._store, price_store._market_now
+    try:
+        store, source, today, yesterday = _intraday_setup()
+        set_price_store(store)
+        root = tempfile.mkdtemp()
+        as_of = store.last_completed_date(BENCHMARK)
+        assert as_of == yesterday
+        CovarianceCache(root=root).get(TICKERS, window="1y", as_of=as_of, persist=True)  # Nightly precompute
+
+        _add_forming_bar(store, source, today)
+        cache = CovarianceCache(root=root)  # A fresh process the next morning
+        stats = cache.get(TICKERS, window="1y")
+        assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 0, cache.stats()
+        assert stats.as_of == yesterday and stats.dates[-1] == yesterday
+    finally:
+        set_price_store(saved_store)
+        price_store._market_now = saved_now
+    print("✅ Precomputed return stats Passed")
+
+def test_technical_snapshot_survives_intraday_bar():
+    print("\n--- Testing the precomputed technical snapshot with a forming intraday bar ---")
+    from src.tools import analysis
+
+    saved_store, saved_now = price_store._store, price_store._market_now
+    saved_dir = os.environ.get("GRYPHON_DATA_DIR")
+    os.environ["GRYPHON_DATA_DIR"] = tempfile.mkdtemp()
+    try:
+        store, source, today, _ = _intraday_setup()
+        set_price_store(store)
+        analysis.prime_technical_snapshot(TICKERS, period="1y", persist=True)  # Nightly precompute
+
+        _add_forming_bar(store, source, today)
+        analysis._snapshot.clear()  # A fresh process the next morning
+        for ticker in TICKERS:
+            assert analysis._lookup(ticker) is not None, ticker
+    finally:
+        set_price_store(saved_store)
+        price_store._market_now = saved_now
+        analysis._snapshot.clear()
+        if saved_dir is None:
+            os.environ.pop("GRYPHON_DATA_DIR")
+        else:
+            os.environ["GRYPHON_DATA_DIR"] = saved_dir
+    print("✅ Precomputed technical snapshot Passed")
+
+if __name__ == "__main__":
+    test_covariance_cache_survives_intraday_bar()
+    test_technical_snapshot_survives_intraday_bar()
@@ -0,0 +1,51 @@
+from src.data.price_store import PriceStore
+from src.data.sources import PriceSource
+import numpy as np
+import pandas as pd
+import tempfile
+
+class ScriptedSource(PriceSource):
+    """Serves `self.bars`, which the test edits between refreshes, and records the requested start dates."""
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.starts = []
+
+    def fetch(self, ticker, start=None):
+        self.starts.append(start)
+        return self.bars if start is None else self.bars[self.bars.index >= start]
+
+def _bars(closes, end="2024-06-28") -> pd.DataFrame:
+    closes = np.asarray(closes, dtype=float)
+    index = pd.bdate_range(end=end, periods=len(closes), name="Date")
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1e6}, index=index)
+
+def test_delta_fetch():
+    print("\n--- Testing incremental delta fetch ---")
+    source = ScriptedSource(_bars(np.arange(100, 120)))
+    store = PriceStore(tempfile.mkdtemp(), source=source, min_refresh=0)
+    store.history("AAPL", period="max")
+
+    source.bars = _bars(np.arange(100, 121), end="2024-07-01")  # One new session
+    history = store.history("AAPL", period="max")
+    assert source.starts[-1] == pd.Timestamp("2024-06-27")  # Only the last two stored bars were re-requested
+    assert history["Close"].tolist() == list(range(100, 121))
+    print("✅ Delta fetch Passed")
+
+def test_adjustment_triggers_full_refetch():
+    print("\n--- Testing refetch after a split ---")
+    source = ScriptedSource(_bars(np.arange(100, 120)))
+    store = PriceStore(tempfile.mkdtemp(), source=source, min_refresh=0)
+    store.history("AAPL", period="max")
+
+    # A 2:1 split: the source now reports the whole history halved, plus a new session
+    source.bars = _bars(np.arange(100, 121) / 2, end="2024-07-01")
+    history = store.history("AAPL", period="max")
+    assert source.starts[-1] is None  # Full refetch after the overlap mismatch
+    assert np.allclose(history["Close"], np.arange(100, 121) / 2)
+    assert history["Close"].pct_change().abs().max() < 0.05  # No false jump at the old/new boundary
+    print("✅ Adjustment refetch Passed")
+
+if __name__ == "__main__":
+    test_delta_fetch()
+    test_adjustment_triggers_full_refetch()
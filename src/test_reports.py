@@ -0,0 +1,37 @@
+from src.portfolio.reports import decode_report, encode_report, find_report, portfolio_content_hash, save_report
+from src.utils.memory_db import MemorySupabase
+import pandas as pd
+
+def _metrics() -> tuple[dict, dict]:
+    dates = pd.bdate_range("2024-01-02", periods=3)
+    rolling = {21: pd.DataFrame({"beta": [None, 1.1, 1.2], "volatility": [0.2, 0.21, 0.22]}, index=dates)}
+    metrics = {"total_value": 1000.0, "beta": 1.2, "volatility": 0.22, "sharpe_ratio": 0.8,
+               "max_drawdown": -0.1, "weights": {"AAPL": 1.0}, "rolling": rolling}
+    contributions = {"volatility": 0.22, "positions": {"AAPL": {"weight": 1.0, "percent": 1.0}}}
+    return metrics, contributions
+
+def test_plan_does_not_hide_metrics_report():
+    print("\n--- Testing the metrics lookup after a saved plan ---")
+    sb = MemorySupabase()
+    content_hash = portfolio_content_hash({"AAPL": 10}, pd.Timestamp("2024-01-04"))
+    metrics, contributions = _metrics()
+    save_report(sb, "p1", content_hash, encode_report(metrics, contributions))
+
+    # The Advisor's plan is saved later with the metrics it was given (no rolling series)
+    plan_metrics = {k: v for k, v in metrics.items() if k != "rolling"}
+    save_report(sb, "p1", content_hash, encode_report(plan_metrics), risk_profile="Moderate (Balanced)",
+                recommendation="Trim AAPL")
+    sb.tables["reports"][0]["created_at"] = "2024-01-04T00:00:00+00:00"  # Plan row is the newest
+
+    report = find_report(sb, "p1", content_hash)
+    assert report is not None and report["risk_profile"] is None
+    loaded, loaded_contributions = decode_report(report["risk_metrics"])
+    assert 21 in loaded["rolling"] and loaded_contributions == contributions
+
+    plan = find_report(sb, "p1", content_hash, "Moderate (Balanced)")
+    assert plan["rebalance_recommendation"] == "Trim AAPL"
+    assert find_report(sb, "p1", content_hash, "Aggressive (Growth)") is None
+    print("✅ Metrics lookup after a plan Passed")
+
+if __name__ == "__main__":
+    test_plan_does_not_hide_metrics_report()
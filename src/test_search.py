@@ -0,0 +1,145 @@
+from src.data.news import ingest_news
+from src.data.search_index import SearchIndex
+from src.tools.base_search import BaseSearch, SearchResult, merge_results, multi_search, normalize_url
+import sys
+import tempfile
+import time
+import types
+
+class StaticSearch(BaseSearch):
+    """Provider returning fixed URLs per query after `delay` seconds."""
+
+    def __init__(self, name: str, results: dict[str, list[str]], delay: float = 0.0, weight: float = 1.0):
+        self.name, self.results, self.delay, self.weight = name, results, delay, weight
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        time.sleep(self.delay)
+        if query == "boom":
+            raise ConnectionError("rate limited")
+        return [SearchResult(f"{query} #{i}", url, f"snippet {i}", source=self.name)
+                for i, url in enumerate(self.results.get(query, [])[:max_results])]
+
+def test_url_normalization():
+    print("\n--- Testing URL normalization ---")
+    a = normalize_url("https://www.Reuters.com/markets/aapl/?utm_source=x&id=3#top")
+    b = normalize_url("http://reuters.com/markets/aapl?id=3")
+    assert a == b, (a, b)
+    assert normalize_url("https://a.com/x?id=1") != normalize_url("https://a.com/x?id=2")
+    print("✅ URL normalization Passed")
+
+def test_fan_out_dedup_and_ranking():
+    print("\n--- Testing concurrent fan-out with dedup ---")
+    web = StaticSearch("web", {
+        "aapl earnings": ["https://a.com/1", "https://b.com/2", "https://c.com/3"],
+        "aapl rating": ["https://www.b.com/2/", "https://d.com/4"],
+    }, delay=0.2)
+    local = StaticSearch("local", {"aapl earnings": ["https://b.com/2?utm_campaign=z"]}, delay=0.2, weight=0.5)
+
+    start = time.perf_counter()
+    results, errors = multi_search(["aapl earnings", "aapl rating", "boom"], providers=[web, local], limit=10)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5, elapsed  # 6 searches of 0.2s each ran concurrently
+    urls = [normalize_url(r.url) for r in results]
+    assert len(urls) == len(set(urls)) == 4
+    assert normalize_url(results[0].url) == normalize_url("https://b.com/2")  # Found by 3 lists
+    assert set(results[0].providers) == {"web", "local"}
+    assert len(errors) == 2 and all("rate limited" in e for e in errors)
+    print("✅ Fan-out, dedup and ranking Passed")
+
+def test_merge_is_weighted():
+    print("\n--- Testing weighted rank fusion ---")
+    strong = StaticSearch("strong", {}, weight=1.0)
+    weak = StaticSearch("weak", {}, weight=0.1)
+    merged = merge_results([(weak, [SearchResult("w", "https://w.com")]),
+                            (strong, [SearchResult("s", "https://s.com")])], limit=2)
+    assert [r.title for r in merged] == ["s", "w"]
+    print("✅ Weighted fusion Passed")
+
+class IndexedSearch(StaticSearch):
+    """Index-backed provider holding earlier results of the "live" provider."""
+
+    fallback_for = ("live",)
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        return [SearchResult(f"indexed {url}", url, source=self.name, origin="live")
+                for url in self.results.get(query, [])[:max_results]]
+
+def test_index_does_not_double_count_live_results():
+    print("\n--- Testing indexed copies of live results ---")
+    queries = ["aapl earnings", "aapl rating", "aapl lawsuit"]
+    # Provider names differ from the other tests, whose results are still in the results cache
+    web = StaticSearch("live", {q: [f"https://fresh.com/{i}"] for i, q in enumerate(queries)})
+    index = IndexedSearch("archive", {q: ["https://old.com/seen-before"] for q in queries + ["boom"]}, weight=0.5)
+
+    results, errors = multi_search(queries, providers=[web, index], limit=10)
+    assert "https://old.com/seen-before" not in [r.url for r in results]  # Only the index returned it
+    assert results[0].url == "https://fresh.com/0"
+
+    # Where the live provider fails, the indexed copies fill in
+    results, errors = multi_search(["boom"], providers=[web, index], limit=10)
+    assert [r.url for r in results] == ["https://old.com/seen-before"] and len(errors) == 1
+    print("✅ Indexed copies of live results Passed")
+
+def test_local_index():
+    print("\n--- Testing the local full-text index ---")
+    index = SearchIndex(tempfile.mktemp(suffix=".sqlite"))
+    index.add([
+        {"url": "https://a.com/1", "title": "Apple beats earnings", "body": "iPhone sales rose"},
+        {"url": "https://a.com/2", "title": "Microsoft cloud growth", "body": "Azure revenue"},
+    ])
+    index.add([{"url": "https://a.com/1", "title": "Apple beats earnings", "body": "iPhone sales rose strongly in Q3"}])
+    assert len(index) == 2
+
+    hits = index.search("apple earning")  # Porter stemming matches "earnings"
+    assert [h["url"] for h in hits] == ["https://a.com/1"]
+    assert hits[0]["body"].endswith("in Q3")
+    assert index.search('azure" OR *') and index.search("???") == []
+    print("✅ Local index Passed")
+
+def test_news_index():
+    print("\n--- Testing news ingestion shared across tickers ---")
+    day = 86400
+    published = lambda days_ago: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - days_ago * day))
+    feeds = {
+        "AAPL": [{"content": {"title": "Stocks rally as the Fed signals rate cuts ahead", "pubDate": published(1),
+                              "canonicalUrl": {"url": "https://a.com/fed"}, "provider": {"displayName": "Reuters"}}},
+                 {"content": {"title": "Apple faces antitrust lawsuit over App Store", "pubDate": published(2),
+                              "canonicalUrl": {"url": "https://a.com/lawsuit"}}},
+                 {"content": {"title": "Apple unveils new iPhone lineup at its fall event", "pubDate": published(20),
+                              "canonicalUrl": {"url": "https://a.com/old"}}}],
+        # Same headline syndicated under another URL
+        "MSFT": [{"content": {"title": "Stocks rally as the Fed signals rate cuts ahead", "pubDate": published(1),
+                              "canonicalUrl": {"url": "https://b.com/markets/fed"}}}],
+    }
+    fake = types.ModuleType("yfinance")
+    fake.Ticker = lambda t: types.SimpleNamespace(news=feeds.get(t, []))
+    saved = sys.modules.get("yfinance")
+    sys.modules["yfinance"] = fake
+    try:
+        index = SearchIndex(tempfile.mktemp(suffix=".sqlite"))
+        summary = ingest_news(["aapl", "MSFT"], index=index)
+    finally:
+        if saved is None:
+            sys.modules.pop("yfinance")
+        else:
+            sys.modules["yfinance"] = saved
+
+    assert summary["articles"] == 4 and summary["new"] == 3 and not summary["failed"], summary
+    assert index.tickers("https://a.com/fed") == ["AAPL", "MSFT"]
+    assert index.fetched_at("AAPL") is not None
+
+    week = 7 * day
+    assert [n["url"] for n in index.latest(["MSFT"], max_age=week)] == ["https://a.com/fed"]
+    assert [n["url"] for n in index.latest(["AAPL"], max_age=week)] == ["https://a.com/fed", "https://a.com/lawsuit"]
+    assert [n["url"] for n in index.search("lawsuit", max_age=week, tickers=["AAPL"])] == ["https://a.com/lawsuit"]
+    assert index.search("lawsuit", max_age=week, tickers=["MSFT"]) == []
+    print("✅ News index Passed")
+
+if __name__ == "__main__":
+    test_url_normalization()
+    test_fan_out_dedup_and_ranking()
+    test_merge_is_weighted()
+    test_index_does_not_double_count_live_results()
+    test_local_index()
+    test_news_index()
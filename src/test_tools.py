@@ -1,6 +1,6 @@
-from tools.market import YFinanceNewsTool
-from tools.analysis import TechnicalAnalysisTool
-from tools.duck_search import DuckSearchTool
+from src.tools.market import YFinanceNewsTool
+from src.tools.analysis import TechnicalAnalysisTool
+from src.tools.duck_search import DuckSearchTool
 import sys
 
 def test_market_tool():
@@ -0,0 +1,65 @@
+from src.tools.caching import cached_tool, traced_tool
+from src.utils.progress import ProgressRoute, bind_route, unbind_route
+from src.utils.tracing import MetricsRegistry, RunTrace, Span
+
+class EchoTool:
+    """Minimal stand-in for a BaseTool subclass."""
+
+    @cached_tool(ttl=60, normalize={"ticker": str.upper})
+    def _run(self, ticker: str) -> str:
+        return f"report for {ticker}"
+
+class FailingTool:
+    @traced_tool
+    def _run(self, query: str) -> str:
+        return "Error calculating risk: no ticker given"
+
+def test_tool_spans_reach_the_run_trace():
+    print("\n--- Testing tool spans in a run trace ---")
+    tool, failing, route, trace = EchoTool(), FailingTool(), ProgressRoute(), RunTrace("analysis", "AAPL")
+    events = []
+    bind_route([tool, failing], route)
+    try:
+        with route.attach(events.append, "AAPL", trace=trace):
+            tool._run("aapl")
+            tool._run("AAPL ")
+            failing._run("?")
+    finally:
+        unbind_route([tool, failing])
+
+    spans = [s for s in trace.spans if s.kind == "tool"]
+    assert [s.attrs.get("cache") for s in spans] == ["miss", "hit", None]
+    assert all(s.ticker == "AAPL" for s in spans)
+    assert spans[0].attrs["input_bytes"] == 4 and spans[0].attrs["output_bytes"] == len("report for AAPL")
+
+    rows = {r["name"]: r for r in trace.summary()}
+    assert rows["EchoTool"]["calls"] == 2 and rows["EchoTool"]["cache_hits"] == 1
+    assert rows["FailingTool"]["errors"] == 1
+    assert [e.kind for e in events] == ["tool_start", "tool_end"] * 3
+    assert events[-1].data["cache"] == "uncached"
+    print(trace.format_table())
+    print("✅ Tool spans Passed")
+
+def test_prometheus_rendering():
+    print("\n--- Testing Prometheus text output ---")
+    registry = MetricsRegistry(buckets=(0.1, 1.0, float("inf")))
+    registry.observe(Span("tool", "TechnicalAnalysisTool", 0.05, attrs={"cache": "miss", "output_bytes": 300}))
+    registry.observe(Span("tool", "TechnicalAnalysisTool", 0.5, attrs={"cache": "hit"}))
+    registry.observe(Span("llm", "Analyst", 2.0, attrs={"prompt_tokens": 900, "completion_tokens": 120}))
+    registry.observe(Span("llm", "Scout", 1.0, attrs={"error": True}))
+    text = registry.render()
+
+    labels = 'kind="tool",name="TechnicalAnalysisTool"'
+    assert f'gryphon_span_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'gryphon_span_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+    assert f'gryphon_span_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"gryphon_span_duration_seconds_count{{{labels}}} 2" in text
+    assert 'gryphon_llm_tokens_total{agent="Analyst",type="prompt"} 900' in text
+    assert 'gryphon_cache_requests_total{kind="tool",name="TechnicalAnalysisTool",result="hit"} 1' in text
+    assert 'gryphon_span_errors_total{kind="llm",name="Scout"} 1' in text
+    assert "# TYPE gryphon_span_duration_seconds histogram" in text
+    print("✅ Prometheus output Passed")
+
+if __name__ == "__main__":
+    test_tool_spans_reach_the_run_trace()
+    test_prometheus_rendering()
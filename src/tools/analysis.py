@@ -1,51 +1,130 @@
-import yfinance as yf
-import pandas_ta as ta
+import json
+import os
+import threading
+import time
+import pandas as pd
 from crewai.tools import BaseTool
+from ..data.price_store import get_price_store
+from ..utils.paths import get_data_dir
+from .indicators import latest_indicators
+from .indicator_state import get_indicator_states
+from .caching import cached_tool
+from .formatting import DEFAULT_DETAIL, detail_level, fmt_pct, key_values
+
+# Latest indicator values per ticker, filled in one vectorized pass over a universe
+_snapshot: dict[str, tuple[pd.Series, float]] = {}
+SNAPSHOT_TTL = 900
+
+# Snapshot saved by the nightly precompute, reloaded when the file changes
+_precomputed: dict = {"mtime": None, "data": {}}
+_precomputed_lock = threading.Lock()
+
+def _precomputed_path():
+    return get_data_dir("precomputed") / "technical.json"
+
+def prime_technical_snapshot(tickers: list[str], period: str = "2y", persist: bool = False) -> pd.DataFrame:
+    """
+    Computes the indicators for every ticker at once so later tool calls are plain lookups.
+
+    With `persist`, the values are also saved for other processes, tagged with
+    each ticker's last bar date; they are served until a newer session has
+    finished (a forming intraday bar does not invalidate them).
+    """
+    closes = get_price_store().closes(tickers, period=period).dropna(axis=1, how="all")
+    table = latest_indicators(closes)
+    now = time.time()
+    for ticker, row in table.iterrows():
+        _snapshot[ticker] = (row, now)
+
+    if persist:
+        data = {
+            ticker: {
+                "as_of": f"{closes[ticker].last_valid_index():%Y-%m-%d}",
+                "values": {k: None if pd.isna(v) else float(v) for k, v in row.items()},
+            }
+            for ticker, row in table.iterrows()
+        }
+        path = _precomputed_path()
+        tmp = path.with_suffix(".tmp.json")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    return table
+
+def _load_precomputed(ticker: str) -> pd.Series | None:
+    path = _precomputed_path()
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    with _precomputed_lock:
+        if _precomputed["mtime"] != mtime:
+            with open(path) as f:
+                _precomputed.update(mtime=mtime, data=json.load(f))
+        entry = _precomputed["data"].get(ticker)
+
+    # Valid until a newer session has finished for the ticker
+    store = get_price_store()
+    current = {f"{d:%Y-%m-%d}" for d in (store.last_date(ticker), store.last_completed_date(ticker)) if d is not None}
+    if entry is None or entry["as_of"] not in current:
+        return None
+    return pd.Series(entry["values"], dtype=float, name=ticker)
+
+def _lookup(ticker: str) -> pd.Series | None:
+    entry = _snapshot.get(ticker)
+    if entry and time.time() - entry[1] < SNAPSHOT_TTL:
+        return entry[0]
+    return _load_precomputed(ticker)
+
+def _signals(latest, detail: str) -> list[str]:
+    """Plain-word reading of the indicators, so the LLM does not have to derive it."""
+    close, rsi = latest['Close'], latest['RSI_14']
+    signals = []
+    # Simple interpretation help for the LLM
+    if pd.isna(rsi):
+        signals.append("RSI insufficient data")
+    elif rsi > 70:
+        signals.append("RSI overbought (>70)")
+    elif rsi < 30:
+        signals.append("RSI oversold (<30)")
+    else:
+        signals.append("RSI neutral")
+    for window in (50, 200):
+        sma = latest[f'SMA_{window}']
+        if pd.notna(sma) and sma:
+            side = "above" if close >= sma else "below"
+            signals.append(f"{side} SMA{window} ({fmt_pct(close / sma - 1)})" if detail != "brief" else f"{side} SMA{window}")
+    macd, macd_signal = latest['MACD_12_26_9'], latest['MACDs_12_26_9']
+    if pd.notna(macd) and pd.notna(macd_signal):
+        signals.append("MACD above signal" if macd >= macd_signal else "MACD below signal")
+    if detail == "full" and pd.notna(latest['SMA_50']) and pd.notna(latest['SMA_200']):
+        signals.append("SMA50 above SMA200 (golden cross regime)" if latest['SMA_50'] >= latest['SMA_200']
+                       else "SMA50 below SMA200 (death cross regime)")
+    return signals
 
 class TechnicalAnalysisTool(BaseTool):
     name: str = "Technical Analyst"
-    description: str = "Perform technical analysis (RSI, SMA, MACD) on a stock ticker."
+    description: str = ("Perform technical analysis (RSI, SMA, MACD) on a stock ticker: indicator values and their reading. "
+                        "Optional detail: brief, standard or full.")
 
-    def _run(self, ticker: str) -> str:
+    @cached_tool(ttl=900, normalize={"ticker": str.upper, "detail": str.lower})
+    def _run(self, ticker: str, detail: str = DEFAULT_DETAIL) -> str:
         try:
-            # Fetch data (requires more than just last 20 days for some indicators)
-            stock = yf.Ticker(ticker)
-            df = stock.history(period="2y")
-            
-            if df.empty:
-                return f"No data found for {ticker}."
-
-            # Calculate Indicators
-            # RSI
-            df.ta.rsi(length=14, append=True)
-            # SMA 50 and 200
-            df.ta.sma(length=50, append=True)
-            df.ta.sma(length=200, append=True)
-            # MACD
-            df.ta.macd(append=True)
-
-            # Get latest values
-            latest = df.iloc[-1]
-            
-            report = f"""
-            Technical Analysis Report for {ticker}:
-            - Price: {latest['Close']:.2f}
-            - RSI (14): {latest['RSI_14']:.2f}
-            - SMA (50): {latest['SMA_50']:.2f}
-            - SMA (200): {latest['SMA_200']:.2f}
-            - MACD Line: {latest['MACD_12_26_9']:.2f}
-            - MACD Signal: {latest['MACDs_12_26_9']:.2f}
-            - MACD Histogram: {latest['MACDh_12_26_9']:.2f}
-            """
-            
-            # Simple interpretation help for the LLM
-            rsi = latest['RSI_14']
-            if rsi > 70:
-                report += "\nInterp: Overbought (RSI > 70)"
-            elif rsi < 30:
-                report += "\nInterp: Oversold (RSI < 30)"
-            
-            return report
+            detail = detail_level(detail)
+            latest = _lookup(ticker)
+            if latest is None:
+                # Advance the saved indicator state over any new bars (seeded from 2y history once)
+                latest = get_indicator_states().latest(ticker, period="2y")
+                
+                if latest is None:
+                    return f"No data found for {ticker}."
+
+            values = {"close": latest['Close'], "rsi14": latest['RSI_14']}
+            if detail != "brief":
+                values.update(sma50=latest['SMA_50'], sma200=latest['SMA_200'], macd=latest['MACD_12_26_9'],
+                              macd_signal=latest['MACDs_12_26_9'])
+            values["macd_hist"] = latest['MACDh_12_26_9']
+            return f"{ticker} technicals: {key_values(values)}\nsignals: {'; '.join(_signals(latest, detail))}"
 
         except Exception as e:
             return f"Error performing analysis on {ticker}: {str(e)}"
@@ -1,9 +1,155 @@
+"""
+Search providers and the concurrent fan-out behind the Web Search tool.
+
+Providers implement `BaseSearch` and are registered by name. `multi_search`
+runs every (query, provider) pair concurrently, merges the result lists with
+reciprocal rank fusion (a URL found by several queries or providers rises) and
+keeps one result per normalized URL. Results an index-backed provider holds
+from another provider only fill in for that provider's failed queries, so
+having been fetched before does not count as a second vote.
+"""
+import os
+import re
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .caching import TTLCache
+
+RRF_K = 60                # Rank-fusion damping: 1 / (RRF_K + rank)
+PROVIDER_TIMEOUT = 10.0   # Seconds to wait for the slowest provider before merging without it
+RESULT_TTL = 1800         # Seconds a provider's results for a query are reused
+
+@dataclass
+class SearchResult:
+    title: str
+    url: str
+    snippet: str = ""
+    source: str = ""            # Provider that returned it
+    origin: str = ""            # Provider an indexed result was first fetched from
+    published: str | None = None
+    score: float = 0.0          # Fused score (set by merge_results)
+    providers: list[str] = field(default_factory=list)
 
 class BaseSearch(ABC):
     """Abstract interface for search providers."""
-    
+
+    name: str = "base"
+    weight: float = 1.0  # Multiplies the provider's contribution to the fused score
+    fallback_for: tuple[str, ...] = ()  # Providers whose results (by `origin`) this one only stands in for
+
     @abstractmethod
-    def search(self, query: str) -> str:
-        """Execute a search query and return the results."""
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        """Execute a search query and return the results, best first."""
         pass
+
+# --- Registry ---
+
+_providers: dict[str, BaseSearch] = {}
+_providers_lock = threading.Lock()
+
+def register_provider(provider: BaseSearch):
+    """Adds (or replaces) a provider under its `name`."""
+    with _providers_lock:
+        _providers[provider.name] = provider
+
+def unregister_provider(name: str):
+    with _providers_lock:
+        _providers.pop(name, None)
+
+def get_providers() -> list[BaseSearch]:
+    """The registered providers; on first use, the defaults named in GRYPHON_SEARCH_PROVIDERS."""
+    with _providers_lock:
+        if not _providers:
+            for provider in _default_providers():
+                _providers[provider.name] = provider
+        return list(_providers.values())
+
+def _default_providers() -> list[BaseSearch]:
+    from .duck_search import DuckDuckGoSearch, LocalIndexSearch
+
+    available = {"duckduckgo": DuckDuckGoSearch, "local": LocalIndexSearch}
+    names = os.getenv("GRYPHON_SEARCH_PROVIDERS", "duckduckgo,local").split(",")
+    return [available[n.strip()]() for n in names if n.strip() in available]
+
+# --- Fan-out and merging ---
+
+_TRACKING = re.compile(r"^(utm_|fbclid$|gclid$|mc_|ref$|ref_src$|guccounter)")
+
+def normalize_url(url: str) -> str:
+    """Key for deduplication: scheme-less, lower-case host without www., no tracking parameters or fragment."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING.match(k.lower())))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, query, ""))
+
+def merge_results(ranked_lists: list[tuple[BaseSearch, list[SearchResult]]], limit: int) -> list[SearchResult]:
+    """Reciprocal rank fusion over several result lists, one result per normalized URL."""
+    merged: dict[str, SearchResult] = {}
+    for provider, results in ranked_lists:
+        for rank, result in enumerate(results):
+            if not result.url:
+                continue
+            key = normalize_url(result.url)
+            best = merged.get(key)
+            if best is None:
+                best = merged[key] = SearchResult(result.title, result.url, result.snippet, result.source,
+                                                  result.published)
+            elif len(result.snippet) > len(best.snippet):
+                best.snippet = result.snippet  # Keep the most informative snippet
+            best.score += provider.weight / (RRF_K + rank + 1)
+            if provider.name not in best.providers:
+                best.providers.append(provider.name)
+    return sorted(merged.values(), key=lambda r: -r.score)[:limit]
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_results_cache = TTLCache(ttl=RESULT_TTL, max_entries=1024)
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv("GRYPHON_SEARCH_WORKERS", 8)),
+                                           thread_name_prefix="gryphon-search")
+        return _executor
+
+def _provider_search(provider: BaseSearch, query: str, max_results: int) -> list[SearchResult]:
+    key = (provider.name, query.lower(), max_results)
+    found, results = _results_cache.get(key)
+    if not found:
+        results = provider.search(query, max_results)
+        _results_cache.set(key, results)
+    return results
+
+def multi_search(queries: list[str], providers: list[BaseSearch] | None = None, max_results: int = 5,
+                 limit: int = 8, timeout: float = PROVIDER_TIMEOUT) -> tuple[list[SearchResult], list[str]]:
+    """
+    Runs every query on every provider concurrently and merges the results.
+
+    Returns (merged results, errors). A provider that fails or misses the
+    timeout is left out of the merge and reported in `errors`.
+    """
+    providers = get_providers() if providers is None else providers
+    queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+    executor = _get_executor()
+    futures = {executor.submit(_provider_search, p, q, max_results): (p, q) for q in queries for p in providers}
+    done, pending = wait(futures, timeout=timeout)
+
+    answered, errors = [], []
+    for future, (provider, query) in futures.items():  # Submission order: merge is deterministic
+        if future in pending:
+            errors.append(f"{provider.name} timed out on '{query}'")
+        elif future.exception() is not None:
+            errors.append(f"{provider.name} failed on '{query}': {future.exception()}")
+        else:
+            answered.append((provider, query, future.result()))
+
+    # Copies of another provider's results count only where that provider did not answer
+    succeeded = {(p.name, q) for p, q, _ in answered}
+    ranked = [(p, [r for r in results if not (r.origin in p.fallback_for and (r.origin, q) in succeeded)])
+              for p, q, results in answered]
+    return merge_results(ranked, limit), errors
@@ -0,0 +1,222 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from ..utils.events import log_event
+from ..utils.progress import route_for
+from ..utils.tracing import Span, payload_bytes, record_span
+from .formatting import estimate_tokens
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being stored."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> tuple[bool, Any]:
+        """Returns (found, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        self._calls: dict[Any, "SingleFlight._Call"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Runs `fn` unless an identical call is in flight; returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class ToolCache:
+    """Per-tool TTL cache, single-flight group and hit counters."""
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.cache = TTLCache(ttl, max_entries)
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()  # Counters are bumped by concurrent analyses
+
+    def count(self, outcome: str):
+        """Counts a call as "hits", "misses" or "coalesced"."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+        total = hits + misses + coalesced
+        return {"tool": self.name, "hits": hits, "misses": misses, "coalesced": coalesced,
+                "entries": len(self.cache), "saved_rate": (hits + coalesced) / total if total else 0.0}
+
+_tool_caches: dict[str, ToolCache] = {}
+
+class _ToolCall:
+    """Reporting of one tool call: progress events, a TOOL_CALL event and a tool span (with the output's token count)."""
+
+    def __init__(self, tool, name: str, args: tuple, kwargs: dict):
+        self.name = name
+        self.route = route_for(tool)
+        self.input = " ".join(map(str, [*args, *kwargs.values()]))
+        self.start = time.perf_counter()
+        if self.route:
+            self.route.emit("tool_start", tool=name, input=self.input)
+
+    def finish(self, result, cache: str | None):
+        duration = time.perf_counter() - self.start
+        outcome = {
+            "cache": cache or "uncached",
+            "duration_ms": round(duration * 1000, 1),
+            "error": isinstance(result, str) and result.startswith("Error"),
+            "tokens": estimate_tokens(str(result)),
+        }
+        log_event("TOOL_CALL", tool=self.name, **outcome)
+        span = Span("tool", self.name, duration, attrs={
+            "input_bytes": payload_bytes(self.input), "output_bytes": payload_bytes(result),
+            "output_tokens": outcome["tokens"],
+            "error": outcome["error"], **({"cache": cache} if cache else {}),
+        })
+        if self.route:
+            self.route.record(span)
+            self.route.emit("tool_end", tool=self.name, **outcome)
+        else:
+            record_span(span)
+
+def cached_tool(ttl: float, max_entries: int = 256, normalize: dict[str, Callable[[str], str]] | None = None):
+    """
+    Decorates a tool's `_run` with a shared TTL/LRU cache and request coalescing.
+
+    The cache is per tool class and shared by all its instances (and therefore by
+    concurrent analyses). Arguments are bound to `_run`'s signature (defaults
+    filled in), so positional and keyword calls share entries. String arguments
+    are stripped, and those named in `normalize` are passed through their
+    function (e.g. {"ticker": str.upper}) before both the lookup and the call.
+    Error strings returned by the tool ("Error ...") are never cached. Every call
+    is logged as a TOOL_CALL event with its duration and cache outcome, reported
+    as tool_start/tool_end progress to the run using the tool, and traced as a
+    span with its payload sizes.
+    """
+    normalize = normalize or {}
+
+    def decorator(run: Callable) -> Callable:
+        name = run.__qualname__.split(".")[0]
+        tool_cache = _tool_caches.setdefault(name, ToolCache(name, ttl, max_entries))
+        signature = inspect.signature(run)
+
+        def _normalized(arg: str, value):
+            if isinstance(value, str):
+                value = value.strip()
+                return normalize[arg](value) if arg in normalize else value
+            return value
+
+        def _hashable(value):
+            return tuple(sorted(value.items())) if isinstance(value, dict) else value  # **kwargs
+
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {arg: _normalized(arg, value) for arg, value in list(bound.arguments.items())[1:]}
+            bound.arguments.update(arguments)
+            key = tuple((arg, _hashable(value)) for arg, value in arguments.items())
+            call = _ToolCall(self, name, (), arguments)
+
+            found, value = tool_cache.cache.get(key)
+            if found:
+                tool_cache.count("hits")
+                call.finish(value, "hit")
+                return value
+
+            def fetch():
+                result = run(*bound.args, **bound.kwargs)
+                if not (isinstance(result, str) and result.startswith("Error")):
+                    tool_cache.cache.set(key, result)
+                return result
+
+            result, shared = tool_cache.flight.do(key, fetch)
+            tool_cache.count("coalesced" if shared else "misses")
+            call.finish(result, "coalesced" if shared else "miss")
+            return result
+
+        return wrapper
+    return decorator
+
+def traced_tool(run: Callable) -> Callable:
+    """Reports and traces a tool's `_run` like `cached_tool` does, for tools whose results are not cached."""
+    name = run.__qualname__.split(".")[0]
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        call = _ToolCall(self, name, args, kwargs)
+        result = run(self, *args, **kwargs)
+        call.finish(result, None)
+        return result
+
+    return wrapper
+
+def tool_cache_stats() -> list[dict]:
+    """Hit/miss/coalesce counters for every cached tool."""
+    return [c.stats() for c in _tool_caches.values()]
+
+def clear_tool_caches():
+    for c in _tool_caches.values():
+        c.cache.clear()
@@ -1,21 +1,83 @@
+from urllib.parse import urlsplit
 from crewai.tools import BaseTool
-from duckduckgo_search import DDGS
+from .base_search import BaseSearch, SearchResult, multi_search
+from .caching import cached_tool
+from .formatting import DEFAULT_DETAIL, detail_level
+
+MAX_QUERIES = 5  # Queries fanned out per tool call
+
+class DuckDuckGoSearch(BaseSearch):
+    """DuckDuckGo web results; every result is also added to the local index."""
+
+    name = "duckduckgo"
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        from duckduckgo_search import DDGS  # Imported on first use to keep CLI startup fast
+        from ..data.search_index import get_search_index
+
+        results = [SearchResult(r.get("title", ""), r.get("href", ""), r.get("body", ""), source=self.name)
+                   for r in DDGS().text(query, max_results=max_results) or []]
+        try:
+            get_search_index().add([{"url": r.url, "title": r.title, "body": r.snippet, "source": r.source}
+                                    for r in results])
+        except Exception as e:
+            print(f"Warning: could not index search results: {e}")
+        return results
+
+class LocalIndexSearch(BaseSearch):
+    """
+    Offline provider over the local full-text index of previously seen results.
+
+    Results DuckDuckGo added to the index only fill in for queries DuckDuckGo
+    failed on; news and other indexed documents always count.
+    """
+
+    name = "local"
+    weight = 0.5  # Older than live results, so it ranks below them on ties
+    fallback_for = ("duckduckgo",)
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        from ..data.search_index import get_search_index
+
+        return [SearchResult(d["title"], d["url"], d["body"], source=self.name, origin=d["source"] or "",
+                             published=d["published"])
+                for d in get_search_index().search(query, limit=max_results)]
+
+def split_queries(query: str) -> list[str]:
+    """Several related queries may be given at once, separated by ';', '|' or new lines."""
+    parts = [q.strip() for q in query.replace("|", ";").replace("\n", ";").split(";")]
+    return [q for q in parts if q][:MAX_QUERIES]
 
 class DuckSearchTool(BaseTool):
     name: str = "Web Search"
-    description: str = "Useful for searching the internet to find current news, sentiment, and market information."
+    description: str = ("Useful for searching the internet to find current news, sentiment, and market information. "
+                        "Pass several related queries at once separated by ';' (e.g. 'AAPL earnings; AAPL analyst "
+                        "rating; Apple lawsuit'); they run in parallel and duplicate pages are merged. "
+                        "Optional detail: brief, standard or full (adds links).")
 
-    def _run(self, query: str) -> str:
+    @cached_tool(ttl=1800, normalize={"detail": str.lower})
+    def _run(self, query: str, detail: str = DEFAULT_DETAIL) -> str:
         """Execute the search."""
         try:
-            results = DDGS().text(query, max_results=5)
+            detail = detail_level(detail)
+            queries = split_queries(query)
+            if not queries:
+                return "Error performing search: empty query."
+
+            results, errors = multi_search(queries, limit=5 if detail == "brief" else 8)
             if not results:
-                return "No results found."
-            
-            formatted_results = []
-            for result in results:
-                formatted_results.append(f"Title: {result['title']}\nLink: {result['href']}\nSnippet: {result['body']}\n")
-            
-            return "\n---\n".join(formatted_results)
+                return f"Error performing search: {'; '.join(errors)}" if errors else "No results found."
+
+            lines = []
+            for r in results:
+                host = urlsplit(r.url).netloc.removeprefix("www.")
+                if detail == "brief":
+                    lines.append(f"- {r.title} ({host})")
+                    continue
+                snippet = r.snippet if detail == "full" else r.snippet[:200]
+                lines.append(f"- {r.title} ({host}): {snippet}")
+                if detail == "full":
+                    lines.append(f"  {r.url} [{', '.join(r.providers)}]")
+            return "\n".join(lines)
         except Exception as e:
             return f"Error performing search: {str(e)}"
@@ -0,0 +1,94 @@
+"""
+Compact, token-efficient text for tool outputs.
+
+Whatever a tool returns is pasted into the next LLM prompt, so tools report
+rounded numbers as CSV or as derived statistics instead of padded tables and
+prose. Three detail levels trade size for depth:
+
+    brief     one line of key figures
+    standard  key figures plus a short recent window (default)
+    full      the whole window the tool looked at
+
+Agents can ask for another level per call (`detail="full"`); the default comes
+from GRYPHON_TOOL_DETAIL. `estimate_tokens` approximates the prompt cost of an
+output and is recorded with every tool call.
+"""
+import os
+import re
+import numpy as np
+import pandas as pd
+
+DETAIL_LEVELS = ("brief", "standard", "full")
+DEFAULT_DETAIL = os.getenv("GRYPHON_TOOL_DETAIL", "standard")
+
+_DIGIT = re.compile(r"\d")
+
+def detail_level(value: str | None) -> str:
+    """Normalizes a requested detail level, falling back to the default for unknown values."""
+    value = (value or "").strip().lower()
+    return value if value in DETAIL_LEVELS else DEFAULT_DETAIL
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate LLM tokens of `text`: one per digit plus one per ~4 other characters.
+
+    Gemini (like most SentencePiece vocabularies) splits numbers into single
+    digits, so rounding shortens prompts about as much as dropping columns does.
+    """
+    if not text:
+        return 0
+    digits = len(_DIGIT.findall(text))
+    return digits + -(-(len(text) - digits) // 4)
+
+def fmt_num(value, decimals: int = 2) -> str:
+    """Rounded number without trailing zeros; millions and billions get an M/B suffix."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "na"
+    value, suffix = float(value), ""
+    for bound, unit in ((1e9, "B"), (1e6, "M")):
+        if abs(value) >= bound:
+            value, suffix = value / bound, unit
+            break
+    text = f"{value:.{decimals}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return (text if text != "-0" else "0") + suffix
+
+def fmt_pct(value, decimals: int = 1) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "na"
+    return f"{value * 100:+.{decimals}f}%"
+
+def compact_csv(df: pd.DataFrame, columns: dict[str, str] | None = None, decimals: int = 2) -> str:
+    """
+    CSV of `df` with short headers (`columns` maps column -> header), dates as
+    YYYY-MM-DD and numbers through `fmt_num`.
+    """
+    if columns:
+        df = df[[c for c in columns if c in df.columns]].rename(columns=columns)
+    index = [d.strftime("%Y-%m-%d") if isinstance(d, pd.Timestamp) else str(d) for d in df.index]
+    lines = [",".join(["date", *map(str, df.columns)])]
+    for label, row in zip(index, df.itertuples(index=False)):
+        lines.append(",".join([label, *(fmt_num(v, decimals) for v in row)]))
+    return "\n".join(lines)
+
+def key_values(pairs: dict[str, object], decimals: int = 2) -> str:
+    """`k=v` pairs separated by spaces, numbers through `fmt_num`."""
+    return " ".join(f"{k}={fmt_num(v, decimals) if isinstance(v, (int, float, np.floating)) else v}"
+                    for k, v in pairs.items())
+
+def price_summary(bars: pd.DataFrame) -> dict[str, object]:
+    """Derived statistics of an OHLCV window: last close, returns, range, volatility and volume."""
+    close = bars["Close"].dropna()
+    returns = close.pct_change().dropna()
+    change = lambda days: close.iloc[-1] / close.iloc[-days - 1] - 1 if len(close) > days else np.nan
+    return {
+        "last": close.iloc[-1],
+        "chg1d": fmt_pct(change(1)),
+        "chg5d": fmt_pct(change(5)),
+        f"chg{len(close) - 1}d": fmt_pct(close.iloc[-1] / close.iloc[0] - 1),
+        "hi": bars["High"].max(),
+        "lo": bars["Low"].min(),
+        "vol_ann": fmt_pct(returns.std() * np.sqrt(252)).lstrip("+") if len(returns) > 1 else "na",
+        "avg_volume": bars["Volume"].mean(),
+    }
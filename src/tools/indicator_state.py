@@ -0,0 +1,347 @@
+"""
+Streaming versions of the Analyst's indicators with O(1) updates per new bar.
+
+Each state is seeded once from history, serialized to JSON and then advanced
+bar by bar. Fed the same closes, they produce the same values as the batch
+engine in `indicators.py` (and therefore pandas_ta).
+"""
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+import pandas as pd
+
+from ..data.price_store import ADJUSTMENT_TOLERANCE, get_price_store, session_cutoff
+from ..utils.paths import get_data_dir
+from .indicators import RSI_LENGTH, SMA_LENGTHS, MACD_FAST, MACD_SLOW, MACD_SIGNAL
+
+NAN = float("nan")
+
+class SMAState:
+    """Rolling simple moving average over the last `length` closes."""
+
+    # Re-add the window from scratch this often so the running sum cannot drift
+    RESYNC_EVERY = 1000
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.updates = 0
+
+    def peek(self, x: float) -> float:
+        if len(self.window) + 1 < self.length:
+            return NAN
+        oldest = self.window[0] if len(self.window) == self.length else 0.0
+        return (self.total - oldest + x) / self.length
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.length:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self.updates += 1
+        if self.updates % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.window)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total / self.length if len(self.window) == self.length else NAN
+
+    def to_dict(self) -> dict:
+        return {"length": self.length, "window": list(self.window)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SMAState":
+        state = cls(data["length"])
+        for x in data["window"]:
+            state.update(x)
+        return state
+
+class EMAState:
+    """Exponential moving average seeded with the SMA of the first `length` closes."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.seed_sum = 0.0
+        self.seen = 0
+        self.value = NAN
+
+    def _step(self, x: float) -> float:
+        if self.seen + 1 < self.length:
+            return NAN
+        if self.seen + 1 == self.length:
+            return (self.seed_sum + x) / self.length
+        return ((1 - self.alpha) * self.value + self.alpha * x) / ((1 - self.alpha) + self.alpha)
+
+    def peek(self, x: float) -> float:
+        return self._step(x)
+
+    def update(self, x: float) -> float:
+        self.value = self._step(x)
+        if self.seen < self.length:
+            self.seed_sum += x
+        self.seen += 1
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"length": self.length, "seed_sum": self.seed_sum, "seen": self.seen, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EMAState":
+        state = cls(data["length"])
+        state.seed_sum, state.seen, state.value = data["seed_sum"], data["seen"], data["value"]
+        return state
+
+class RMAState:
+    """Wilder's moving average (pandas ewm with alpha=1/length, adjust=True)."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.avg = NAN
+        self.weight = 0.0
+        self.count = 0
+
+    def _step(self, x: float) -> tuple[float, float]:
+        if math.isnan(self.avg):
+            return x, 1.0
+        weight = self.weight * self.decay
+        return (weight * self.avg + x) / (weight + 1), weight + 1
+
+    def peek(self, x: float) -> float:
+        avg, _ = self._step(x)
+        return avg if self.count + 1 >= self.length else NAN
+
+    def update(self, x: float) -> float:
+        self.avg, self.weight = self._step(x)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.avg if self.count >= self.length else NAN
+
+    def to_dict(self) -> dict:
+        return {"length": self.length, "avg": self.avg, "weight": self.weight, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RMAState":
+        state = cls(data["length"])
+        state.avg, state.weight, state.count = data["avg"], data["weight"], data["count"]
+        return state
+
+class RSIState:
+    """Wilder RSI: smoothed average gain vs. average loss."""
+
+    def __init__(self, length: int = RSI_LENGTH):
+        self.length = length
+        self.prev_close = NAN
+        self.gains = RMAState(length)
+        self.losses = RMAState(length)
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        total = gain + abs(loss)
+        return 100 * gain / total if total else NAN
+
+    def peek(self, x: float) -> float:
+        if math.isnan(self.prev_close):
+            return NAN
+        diff = x - self.prev_close
+        return self._rsi(self.gains.peek(max(diff, 0.0)), self.losses.peek(min(diff, 0.0)))
+
+    def update(self, x: float) -> float:
+        if not math.isnan(self.prev_close):
+            diff = x - self.prev_close
+            self.gains.update(max(diff, 0.0))
+            self.losses.update(min(diff, 0.0))
+        self.prev_close = x
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.gains.value, self.losses.value)
+
+    def to_dict(self) -> dict:
+        return {"length": self.length, "prev_close": self.prev_close,
+                "gains": self.gains.to_dict(), "losses": self.losses.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RSIState":
+        state = cls(data["length"])
+        state.prev_close = data["prev_close"]
+        state.gains = RMAState.from_dict(data["gains"])
+        state.losses = RMAState.from_dict(data["losses"])
+        return state
+
+class MACDState:
+    """MACD line, signal and histogram; the signal EMA starts once the line is defined."""
+
+    def __init__(self, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.line = NAN
+
+    def peek(self, x: float) -> tuple[float, float, float]:
+        line = self.fast.peek(x) - self.slow.peek(x)
+        signal = self.signal.peek(line) if not math.isnan(line) else NAN
+        return line, line - signal, signal
+
+    def update(self, x: float) -> tuple[float, float, float]:
+        self.line = self.fast.update(x) - self.slow.update(x)
+        if not math.isnan(self.line):
+            self.signal.update(self.line)
+        return self.value
+
+    @property
+    def value(self) -> tuple[float, float, float]:
+        return self.line, self.line - self.signal.value, self.signal.value
+
+    def to_dict(self) -> dict:
+        return {"fast": self.fast.to_dict(), "slow": self.slow.to_dict(),
+                "signal": self.signal.to_dict(), "line": self.line}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MACDState":
+        state = cls()
+        state.fast = EMAState.from_dict(data["fast"])
+        state.slow = EMAState.from_dict(data["slow"])
+        state.signal = EMAState.from_dict(data["signal"])
+        state.line = data["line"]
+        return state
+
+class TickerIndicators:
+    """All of the Analyst's indicators for one ticker, advanced one bar at a time."""
+
+    def __init__(self):
+        self.as_of: pd.Timestamp | None = None
+        self.close = NAN
+        self.rsi = RSIState()
+        self.smas = {length: SMAState(length) for length in SMA_LENGTHS}
+        self.macd = MACDState()
+
+    def update(self, date: pd.Timestamp, close: float):
+        """Commits a completed bar."""
+        self.as_of = date
+        self.close = close
+        self.rsi.update(close)
+        for state in self.smas.values():
+            state.update(close)
+        self.macd.update(close)
+
+    def seed(self, closes: pd.Series):
+        """Feeds a close series (oldest first) through the states."""
+        for date, close in closes.items():
+            self.update(date, float(close))
+
+    def latest(self, pending_close: float | None = None) -> dict:
+        """
+        Latest indicator values, keyed like the pandas_ta columns.
+        `pending_close` previews a still-forming bar without committing it.
+        """
+        suffix = f"{MACD_FAST}_{MACD_SLOW}_{MACD_SIGNAL}"
+        if pending_close is None:
+            line, hist, signal = self.macd.value
+            values = {"Close": self.close, f"RSI_{RSI_LENGTH}": self.rsi.value}
+            values.update({f"SMA_{n}": s.value for n, s in self.smas.items()})
+        else:
+            line, hist, signal = self.macd.peek(pending_close)
+            values = {"Close": pending_close, f"RSI_{RSI_LENGTH}": self.rsi.peek(pending_close)}
+            values.update({f"SMA_{n}": s.peek(pending_close) for n, s in self.smas.items()})
+        values.update({f"MACD_{suffix}": line, f"MACDh_{suffix}": hist, f"MACDs_{suffix}": signal})
+        return values
+
+    def to_dict(self) -> dict:
+        return {
+            "as_of": None if self.as_of is None else self.as_of.strftime("%Y-%m-%d"),
+            "close": self.close,
+            "rsi": self.rsi.to_dict(),
+            "smas": {str(n): s.to_dict() for n, s in self.smas.items()},
+            "macd": self.macd.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TickerIndicators":
+        state = cls()
+        state.as_of = None if data["as_of"] is None else pd.Timestamp(data["as_of"])
+        state.close = data["close"]
+        state.rsi = RSIState.from_dict(data["rsi"])
+        state.smas = {int(n): SMAState.from_dict(s) for n, s in data["smas"].items()}
+        state.macd = MACDState.from_dict(data["macd"])
+        return state
+
+class IndicatorStateStore:
+    """
+    Keeps a serialized TickerIndicators per ticker next to the price store.
+
+    A lookup advances the saved state over the bars stored since its `as_of`
+    date, so a refresh costs one update per new bar rather than a recompute.
+    Today's bar may still be forming (until the session has finished in market
+    time) and is only previewed, never committed. A state whose last close no
+    longer matches the stored bar (the history was re-adjusted for a split or
+    dividend) is seeded again.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else get_data_dir("indicators")
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str):
+        return self.root / f"{ticker.upper().replace('/', '_')}.json"
+
+    def load(self, ticker: str) -> TickerIndicators | None:
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return TickerIndicators.from_dict(json.load(f))
+
+    def save(self, ticker: str, state: TickerIndicators):
+        path = self._path(ticker)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp, path)
+
+    def latest(self, ticker: str, period: str = "2y") -> dict | None:
+        """Latest indicator values for `ticker`, or None if there is no price data."""
+        bars = get_price_store().history(ticker, period=period)["Close"]
+        if bars.empty:
+            return None
+
+        cutoff = session_cutoff()
+        completed, pending = bars[bars.index < cutoff], bars[bars.index >= cutoff]
+
+        with self._lock:
+            state = self.load(ticker)
+            if state is None or (state.as_of is not None and not self._continues(state, completed)):
+                # No state yet, a gap we cannot bridge or re-adjusted prices: seed from the stored history
+                state = TickerIndicators()
+            new_bars = completed if state.as_of is None else completed[completed.index > state.as_of]
+            if not new_bars.empty:
+                state.seed(new_bars)
+                self.save(ticker, state)
+
+        return state.latest(float(pending.iloc[-1]) if not pending.empty else None)
+
+    @staticmethod
+    def _continues(state: TickerIndicators, completed: pd.Series) -> bool:
+        """True if the stored bars still contain the close the state last consumed."""
+        if state.as_of not in completed.index:
+            return False
+        return math.isclose(float(completed.loc[state.as_of]), state.close, rel_tol=ADJUSTMENT_TOLERANCE)
+
+_states: IndicatorStateStore | None = None
+
+def get_indicator_states() -> IndicatorStateStore:
+    """Returns the process-wide IndicatorStateStore."""
+    global _states
+    if _states is None:
+        _states = IndicatorStateStore()
+    return _states
@@ -0,0 +1,141 @@
+"""
+Vectorized technical indicators over a (dates x tickers) close-price matrix,
+matching the pandas_ta defaults used by the Analyst (RSI 14, SMA 50/200, MACD 12/26/9).
+
+Each column is "packed" first (its valid closes moved to the bottom, contiguous)
+so every ticker is computed exactly as if its own series went through pandas_ta.
+"""
+import numpy as np
+import pandas as pd
+
+RSI_LENGTH = 14
+SMA_LENGTHS = (50, 200)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+def _pack(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Moves each column's non-NaN values to the bottom, keeping their order."""
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+def _unpack(packed: np.ndarray, order: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Inverse of `_pack`; dates without a close in the input stay NaN."""
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    out[~valid] = np.nan
+    return out
+
+def _first_valid(values: np.ndarray) -> np.ndarray:
+    """Row of the first non-NaN value per column (len(values) if none)."""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Simple moving average over packed columns (pandas rolling mean, min_periods=length)."""
+    filled = np.nan_to_num(values)
+    csum = np.cumsum(filled, axis=0)
+    count = np.cumsum(~np.isnan(values), axis=0)
+
+    out = np.full(values.shape, np.nan)
+    if len(values) < length:
+        return out
+    window_sum = csum[length - 1:].copy()
+    window_sum[1:] -= csum[:-length]
+    window_count = count[length - 1:].copy()
+    window_count[1:] -= count[:-length]
+
+    out[length - 1:] = np.where(window_count == length, window_sum / length, np.nan)
+    return out
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Exponential moving average over packed columns, as pandas_ta computes it:
+    seeded with the SMA of the first `length` values, then ewm(adjust=False).
+    """
+    alpha = 2.0 / (length + 1)
+    seed_row = _first_valid(values) + length - 1
+    seeds = sma(values, length)[np.minimum(seed_row, len(values) - 1), np.arange(values.shape[1])]
+
+    out = np.full(values.shape, np.nan)
+    prev = np.full(values.shape[1], np.nan)
+    for t in range(len(values)):
+        # Same arithmetic as pandas' ewm(adjust=False) kernel
+        step = ((1 - alpha) * prev + alpha * values[t]) / ((1 - alpha) + alpha)
+        prev = np.where(seed_row == t, seeds, step)
+        out[t] = prev
+    return out
+
+def rma(values: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's moving average over packed columns (ewm(alpha=1/length, adjust=True, min_periods=length))."""
+    decay = 1.0 - 1.0 / length
+    avg = np.full(values.shape[1], np.nan)
+    weight = np.zeros(values.shape[1])
+    count = np.zeros(values.shape[1])
+
+    out = np.full(values.shape, np.nan)
+    for t in range(len(values)):
+        x = values[t]
+        valid = ~np.isnan(x)
+        weight = np.where(np.isnan(avg), weight, weight * decay)
+        started = ~np.isnan(avg)
+        avg = np.where(valid & started, (weight * avg + x) / (weight + 1), np.where(valid, x, avg))
+        weight = np.where(valid, weight + 1, weight)
+        count += valid
+        out[t] = np.where(count >= length, avg, np.nan)
+    return out
+
+def rsi(values: np.ndarray, length: int = RSI_LENGTH) -> np.ndarray:
+    """Relative Strength Index over packed columns (pandas_ta rsi, Wilder smoothing)."""
+    diff = np.full(values.shape, np.nan)
+    diff[1:] = values[1:] - values[:-1]
+    gains = np.where(np.isnan(diff), np.nan, np.clip(diff, 0, None))
+    losses = np.where(np.isnan(diff), np.nan, np.clip(diff, None, 0))
+
+    avg_gain = rma(gains, length)
+    avg_loss = np.abs(rma(losses, length))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * avg_gain / (avg_gain + avg_loss)
+
+def macd(values: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+    """Returns (macd, histogram, signal) over packed columns, as pandas_ta macd."""
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(line, signal)
+    return line, line - signal_line, signal_line
+
+def _compute_packed(packed: np.ndarray) -> dict[str, np.ndarray]:
+    line, hist, signal_line = macd(packed)
+    result = {
+        "Close": packed,
+        f"RSI_{RSI_LENGTH}": rsi(packed),
+    }
+    for length in SMA_LENGTHS:
+        result[f"SMA_{length}"] = sma(packed, length)
+    suffix = f"{MACD_FAST}_{MACD_SLOW}_{MACD_SIGNAL}"
+    result[f"MACD_{suffix}"] = line
+    result[f"MACDh_{suffix}"] = hist
+    result[f"MACDs_{suffix}"] = signal_line
+    return result
+
+def compute_indicators(closes: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Computes every indicator for a (dates x tickers) close frame.
+
+    Returns a dict mapping pandas_ta column names (e.g. "RSI_14", "MACD_12_26_9")
+    to frames shaped like `closes`.
+    """
+    values = closes.to_numpy(dtype=float)
+    packed, order = _pack(values)
+    valid = ~np.isnan(values)
+    return {
+        name: pd.DataFrame(_unpack(array, order, valid), index=closes.index, columns=closes.columns)
+        for name, array in _compute_packed(packed).items()
+    }
+
+def latest_indicators(closes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest value of every indicator per ticker, as of each ticker's last close.
+
+    Returns a frame indexed by ticker with one column per indicator.
+    """
+    packed, _ = _pack(closes.to_numpy(dtype=float))
+    latest = {name: array[-1] for name, array in _compute_packed(packed).items()}
+    return pd.DataFrame(latest, index=closes.columns)
@@ -1,69 +1,103 @@
-import yfinance as yf
 from crewai.tools import BaseTool
+from ..data.news import NEWS_WINDOW, ensure_news
+from ..data.price_store import get_price_store
+from ..data.search_index import get_search_index
+from .caching import cached_tool
+from .formatting import DEFAULT_DETAIL, compact_csv, detail_level, fmt_num, key_values, price_summary
 
 class YFinanceNewsTool(BaseTool):
     name: str = "Market News Finder"
-    description: str = "Get the latest news for a specific stock ticker using Yahoo Finance."
+    description: str = ("Get the past week's news headlines for a stock ticker (Yahoo Finance, served from the local "
+                        "news index). Optional query searches that week of news, e.g. 'lawsuit' or 'guidance'. "
+                        "Optional detail: brief (3 headlines), standard (5 with dates) or full (with links and summaries).")
 
-    def _run(self, ticker: str) -> str:
+    @cached_tool(ttl=600, normalize={"ticker": str.upper, "detail": str.lower})
+    def _run(self, ticker: str, detail: str = DEFAULT_DETAIL, query: str = "") -> str:
         try:
-            stock = yf.Ticker(ticker)
-            news = stock.news
+            detail = detail_level(detail)
+            try:
+                ensure_news(ticker)  # Only fetches when the index holds no recent fetch of the ticker
+                error = None
+            except Exception as e:
+                error = e  # Serve what the index already has
+
+            index = get_search_index()
+            limit = 3 if detail == "brief" else 5
+            news = (index.search(query, limit=limit, max_age=NEWS_WINDOW, tickers=[ticker]) if query.strip()
+                    else index.latest([ticker], limit=limit, max_age=NEWS_WINDOW))
             if not news:
-                return f"No news found for {ticker}."
-            
-            formatted_news = []
-            for item in news[:5]: # Top 5 news
-                # Handle new yfinance structure where data is in 'content'
-                content = item.get('content', item) # Fallback to item if content missing
-                
-                title = content.get('title', 'No Title')
-                
-                # Link can be canonicalUrl or clickThroughUrl
-                link = content.get('canonicalUrl', content.get('clickThroughUrl', '#'))
-                
-                # Provider might be a dict
-                provider = content.get('provider', {})
-                if isinstance(provider, dict):
-                    publisher = provider.get('displayName', 'Unknown')
-                else:
-                    publisher = str(provider)
-                    
-                formatted_news.append(f"- {title} ({publisher}): {link}")
-            
-            return "\n".join(formatted_news)
+                if error is not None:
+                    return f"Error fetching news for {ticker}: {str(error)}"
+                return f"No news found for {ticker}" + (f" matching '{query}'." if query.strip() else ".")
+
+            lines = [f"{ticker} news" + (f" matching '{query}':" if query.strip() else ":")]
+            for n in news:
+                if detail == "brief":
+                    lines.append(f"- {n['title']}")
+                    continue
+                meta = ", ".join(x for x in (n['source'], (n['published'] or '')[:10]) if x)
+                lines.append(f"- {n['title']} ({meta})")
+                if detail == "full":
+                    if n['body']:
+                        lines.append(f"  {n['body'][:240]}")
+                    lines.append(f"  {n['url']}")
+            return "\n".join(lines)
         except Exception as e:
             return f"Error fetching news for {ticker}: {str(e)}"
 
 class YFinancePriceTool(BaseTool):
     name: str = "Stock Price Checker"
-    description: str = "Get the current price and basic info for a stock ticker."
+    description: str = ("Get the current price of a stock ticker. "
+                        "Optional detail: full adds the day range, 52-week range, market cap and P/E.")
 
-    def _run(self, ticker: str) -> str:
+    @cached_tool(ttl=60, normalize={"ticker": str.upper, "detail": str.lower})
+    def _run(self, ticker: str, detail: str = DEFAULT_DETAIL) -> str:
         try:
+            import yfinance as yf
+            detail = detail_level(detail)
             stock = yf.Ticker(ticker)
             info = stock.info
             price = info.get('currentPrice') or info.get('regularMarketPrice')
             currency = info.get('currency', 'USD')
-            return f"Current price of {ticker}: {price} {currency}"
+            result = f"{ticker} price={fmt_num(price)} {currency}"
+            if detail == "full":
+                extra = {
+                    "prev_close": info.get('previousClose'),
+                    "day_lo": info.get('dayLow'), "day_hi": info.get('dayHigh'),
+                    "52w_lo": info.get('fiftyTwoWeekLow'), "52w_hi": info.get('fiftyTwoWeekHigh'),
+                    "mcap": info.get('marketCap'), "pe": info.get('trailingPE'),
+                }
+                result += " " + key_values({k: v for k, v in extra.items() if v is not None})
+            return result
         except Exception as e:
             return f"Error fetching price for {ticker}: {str(e)}"
 
+HISTORY_COLUMNS = {
+    "standard": {"Close": "close", "Volume": "vol"},
+    "full": {"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "vol"},
+}
+
 class YFinanceHistoryTool(BaseTool):
     name: str = "Stock Price History"
-    description: str = "Get historical price data for a stock ticker for the last 1 month."
+    description: str = ("Get the last month of daily prices for a stock ticker: summary statistics plus CSV rows. "
+                        "Optional detail: brief (statistics only), standard (10 days of close/volume) "
+                        "or full (20 days of OHLCV).")
 
-    def _run(self, ticker: str) -> str:
+    @cached_tool(ttl=900, normalize={"ticker": str.upper, "detail": str.lower})
+    def _run(self, ticker: str, detail: str = DEFAULT_DETAIL) -> str:
         try:
-            stock = yf.Ticker(ticker)
+            detail = detail_level(detail)
             # Default to 1 month for MVP analysis
-            history = stock.history(period="1mo")
+            history = get_price_store().history(ticker, period="1mo")
             if history.empty:
                 return f"No history found for {ticker}."
-            
-            # Return last 5 days as a sample string, or summary?
-            # Creating a CSV-like string for the Analyst to read
-            return history.tail(20).to_string() # Last 20 trading days
-            
+
+            # Derived statistics first; the rows are rounded CSV, not a padded table
+            summary = f"{ticker} 1mo daily: " + key_values(price_summary(history))
+            if detail == "brief":
+                return summary
+            rows = history.tail(10 if detail == "standard" else 20)
+            return summary + "\n" + compact_csv(rows, HISTORY_COLUMNS[detail])
+
         except Exception as e:
             return f"Error fetching history for {ticker}: {str(e)}"
@@ -1,25 +1,90 @@
+import re
 from crewai.tools import BaseTool
+from ..portfolio.simulation import monte_carlo_risk, MAX_ALLOCATION
+from .caching import traced_tool
+
+# A bare position: "AAPL", "$AAPL" or "AAPL:0.6" (upper case, so free text is not read as tickers)
+_BARE_POSITION = re.compile(r"^\$?[A-Z][A-Z0-9.\-]{0,9}(:\d+(\.\d*)?)?$")
+
+def parse_risk_query(query: str) -> dict:
+    """
+    Parses "key=value" pairs separated by commas or semicolons.
+
+    Positions come from `ticker=AAPL` or `positions=AAPL:0.6 MSFT:0.4`; a bare
+    "AAPL" or "AAPL MSFT" is read as an equally weighted list of tickers, but
+    only if every word looks like a ticker: free text yields no holdings.
+    """
+    params, holdings = {}, {}
+    parts = [p.strip() for p in query.replace(";", ",").split(",") if p.strip()]
+    if not any("=" in p for p in parts):
+        tokens = query.replace(",", " ").replace(";", " ").split()
+        parts = [f"positions={' '.join(tokens)}"] if tokens and all(_BARE_POSITION.match(t) for t in tokens) else []
+
+    for part in parts:
+        if "=" not in part:
+            continue
+        key, value = (s.strip() for s in part.split("=", 1))
+        key = key.lower()
+        if key in ("ticker", "tickers", "positions", "portfolio"):
+            for token in value.replace("|", " ").split():
+                ticker, _, weight = token.partition(":")
+                holdings[ticker.strip("$").upper()] = float(weight) if weight else 1.0
+        else:
+            params[key] = value.strip("$")
+    return {"holdings": holdings, "params": params}
 
 class RiskCalculatorTool(BaseTool):
     name: str = "Risk Calculator"
-    description: str = "Calculate position sizing and risk exposure."
+    description: str = (
+        "Calculate position sizing and risk exposure with a Monte Carlo simulation "
+        "(Value at Risk, Expected Shortfall, stop-loss and position size). "
+        "Input examples: 'ticker=AAPL, price=150, portfolio_value=100000' or "
+        "'positions=AAPL:0.6 MSFT:0.4, portfolio_value=100000'. "
+        "Optional: horizon=10 (trading days), confidence=0.95, method=bootstrap|parametric."
+    )
 
+    @traced_tool
     def _run(self, portfolio_str: str) -> str:
-        # portfolio_str could be "Buying $AAPL at 150, stop 140, total capital 100000"
-        # For this MVP, we will accept a query like "ticker=AAPL, price=150, stop_loss=140, portfolio_value=100000"
-        # Or more simply, checks if a trade is safe.
-        
-        # Simplified logic for MVP
         try:
-            # Mock risk logic
-            # "Is it safe to buy 10% AAPL?" -> "Yes/No"
-            return """
-            Risk Analysis:
-            1. Position Sizing: Recommended max 5% of portfolio per trade.
-            2. Stop Loss: Recommend 5-8% below entry.
-            3. Exposure: Check correlation with existing Tech holdings.
-            
-            Veridct: SAFE to proceed if position size < 5%.
-            """
+            query = parse_risk_query(portfolio_str)
+            holdings, params = query["holdings"], query["params"]
+            if not holdings:
+                return "Error calculating risk: no ticker given (use 'ticker=AAPL' or 'positions=AAPL:0.6 MSFT:0.4')."
+
+            capital = float(params.get("portfolio_value") or params.get("capital") or 0) or None
+            horizon = int(params.get("horizon", 10))
+            report = monte_carlo_risk(
+                holdings,
+                capital=capital,
+                confidence=float(params.get("confidence", 0.95)),
+                horizon=horizon,
+                method=params.get("method", "bootstrap"),
+                seed=0,  # Same question, same answer
+            )
+            if "error" in report:
+                return f"Error calculating risk: {report['error']}"
+
+            conf = f"{report['confidence']:.0%}"
+            lines = [
+                f"Risk Analysis ({', '.join(report['tickers'])}, {report['paths']:,} {report['method']} paths, {horizon}-day horizon):",
+                f"1. Value at Risk ({conf}): {report['var']:.2%} loss",
+                f"2. Expected Shortfall / CVaR ({conf}): {report['cvar']:.2%} loss",
+                f"3. Expected Return: {report['expected_return']:.2%}; Probability of Loss: {report['prob_loss']:.0%}",
+                f"4. Position Sizing: {report['suggested_allocation']:.2%} of portfolio (house max {MAX_ALLOCATION:.0%})",
+                f"5. Stop Loss: {report['stop_loss_pct']:.2%} below entry",
+            ]
+            if "price" in params:
+                price = float(params["price"])
+                lines.append(f"   Suggested stop price: {price * (1 - report['stop_loss_pct']):.2f} (entry {price:.2f})")
+                if "stop_loss" in params:
+                    stop = float(params["stop_loss"])
+                    verdict = "WIDER" if stop < price * (1 - report['stop_loss_pct']) else "TIGHTER"
+                    lines.append(f"   Proposed stop {stop:.2f} is {verdict} than the simulated {conf} move.")
+            if capital:
+                lines.append(
+                    f"6. Suggested Position: ${report['suggested_position_value']:,.2f} "
+                    f"(VaR ${report['var_amount']:,.2f}, CVaR ${report['cvar_amount']:,.2f})"
+                )
+            return "\n".join(lines)
         except Exception as e:
             return f"Error calculating risk: {str(e)}"
@@ -0,0 +1,83 @@
+"""
+Streamlit caches for the UI layer.
+
+Streamlit reruns the whole script on every interaction. Clients and the engine
+are process-wide resources (`st.cache_resource`). Query results and computed
+metrics are cached per argument with a TTL (`st.cache_data`). Writers call the
+matching `invalidate_*` helper right after an insert or delete, so the next
+rerun reads fresh data.
+"""
+import streamlit as st
+
+from src.utils.db import get_supabase
+
+DATA_TTL = 300       # Portfolios, positions and stored reports (seconds)
+MARKET_TTL = 900     # Market data as-of date and metrics computed from it
+
+# --- Resources (one per server process) ---
+
+@st.cache_resource
+def get_client():
+    """Supabase client shared by every session."""
+    return get_supabase()
+
+@st.cache_resource
+def get_engine():
+    """GryphonEngine on the shared agent pool, with the pool warmed up."""
+    from src.main_crew import GryphonEngine
+    from src.agents.pool import get_agent_pool
+
+    pool = get_agent_pool()
+    try:
+        pool.warm()
+    except Exception as e:
+        print(f"Agent pool warm-up skipped: {e}")
+    return GryphonEngine(pool=pool)
+
+# --- Data ---
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def load_portfolios(user_id: str) -> list[dict]:
+    return get_client().table("portfolios").select("*").eq("user_id", user_id).execute().data
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def load_positions(portfolio_id: str) -> list[dict]:
+    return get_client().table("positions").select("*").eq("portfolio_id", portfolio_id).execute().data
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def load_report(portfolio_id: str, content_hash: str, risk_profile: str | None = None) -> dict | None:
+    from src.portfolio.reports import find_report
+
+    return find_report(get_client(), portfolio_id, content_hash, risk_profile)
+
+@st.cache_data(ttl=MARKET_TTL, show_spinner=False)
+def load_market_as_of():
+    from src.portfolio.reports import market_as_of
+
+    return market_as_of()
+
+@st.cache_data(ttl=MARKET_TTL, show_spinner=False)
+def load_metrics(holdings: tuple[tuple[str, float], ...], as_of) -> tuple[dict, dict | None]:
+    """
+    Metrics (with rolling series) and risk contributions for `holdings` as of a market date.
+
+    `holdings` is a sorted tuple of (ticker, shares) so equal portfolios share an entry.
+    """
+    from src.portfolio.analytics import calculate_portfolio_metrics, calculate_risk_contributions, ROLLING_WINDOWS
+
+    holdings_dict = dict(holdings)
+    metrics = calculate_portfolio_metrics(holdings_dict, rolling_windows=ROLLING_WINDOWS)
+    if "error" in metrics:
+        raise ValueError(metrics["error"])  # Exceptions are not cached, so the next click retries
+    return metrics, calculate_risk_contributions(holdings_dict)
+
+# --- Invalidation (call after writes) ---
+
+def invalidate_portfolios():
+    load_portfolios.clear()
+
+def invalidate_positions():
+    load_positions.clear()
+
+def invalidate_reports():
+    load_report.clear()
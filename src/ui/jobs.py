@@ -0,0 +1,97 @@
+import os
+import streamlit as st
+
+from src.jobs.queue import get_job_queue, Job, QUEUED, RUNNING, DONE, FAILED
+from src.ui.progress import ProgressView
+from src.utils.progress import ProgressEvent
+
+POLL_SECONDS = 2
+INTERACTIVE_PRIORITY = 10  # Jobs a user is waiting for go ahead of batch work (priority 0)
+
+@st.cache_resource
+def get_worker_pool():
+    """Starts the local worker processes once per server (GRYPHON_JOB_WORKERS=0 to rely on external workers)."""
+    from src.jobs.worker import WorkerPool
+
+    workers = int(os.getenv("GRYPHON_JOB_WORKERS", 2))
+    return WorkerPool(workers).start() if workers > 0 else None
+
+def submit_job(kind: str, payload: dict, user_id: str) -> Job:
+    get_worker_pool()
+    return get_job_queue().submit(kind, payload, priority=INTERACTIVE_PRIORITY, user_id=user_id)
+
+def replay_progress(job: Job, view: ProgressView):
+    for e in job.events:
+        view.handle(ProgressEvent(e["kind"], e["ticker"], e["data"], e["time"]))
+
+def _analysis_jobs(user_id: str, job_ids: list[str], limit: int) -> list[Job]:
+    queue = get_job_queue()
+    jobs = {j.id: j for j in queue.jobs(user_id=user_id, limit=50) if j.kind == "analysis"}
+    for job_id in job_ids:
+        if job_id not in jobs and (job := queue.get(job_id)):
+            jobs[job_id] = job
+    return sorted(jobs.values(), key=lambda j: j.created_at, reverse=True)[:limit]
+
+def _polling(pending: bool) -> float | None:
+    """`run_every` of a job fragment: poll only while a job can still change."""
+    return POLL_SECONDS if pending else None
+
+def render_analysis_jobs(user_id: str, job_ids: list[str] = (), limit: int = 10):
+    """
+    Recent analysis jobs, refreshed in place while any is pending.
+
+    Shows the user's own jobs plus `job_ids` (the ones submitted in this
+    session, which may be older than the newest 50).
+    """
+    pending = any(not j.done for j in _analysis_jobs(user_id, job_ids, limit))
+    st.fragment(_render_analysis_jobs, run_every=_polling(pending))(user_id, job_ids, limit, pending)
+
+def _render_analysis_jobs(user_id: str, job_ids: list[str], limit: int, polling: bool):
+    jobs = _analysis_jobs(user_id, job_ids, limit)
+    pending = sum(not j.done for j in jobs)
+    if polling and not pending:
+        st.rerun()  # Every job has ended (done, failed or cancelled): render once more without polling
+    if not jobs:
+        st.info("No analyses submitted yet.")
+        return
+
+    st.caption(f"{pending} pending · refreshes every {POLL_SECONDS}s" if pending else "All analyses finished.")
+    for job in jobs:
+        ticker = job.payload.get("ticker")
+        if job.status == QUEUED:
+            st.status(f"{ticker}: queued", state="running", expanded=False)
+        elif job.status == RUNNING:
+            view = ProgressView([ticker])
+            replay_progress(job, view)
+        elif job.status == DONE:
+            with st.expander(f"📊 Verdict: {ticker}", expanded=job is jobs[0]):
+                st.markdown(str(job.result))
+                st.caption(f"Finished in {job.finished_at - job.started_at:.0f}s")
+        elif job.status == FAILED:
+            st.error(f"Error analyzing {ticker}: {job.error}")
+        else:
+            st.caption(f"{ticker}: {job.status}")
+
+def render_job_result(job_id: str, on_done=None):
+    """Polls one job until it ends; calls `on_done(job)` once when it has succeeded."""
+    job = get_job_queue().get(job_id)
+    pending = job is not None and not job.done
+    st.fragment(_render_job_result, run_every=_polling(pending))(job_id, on_done, pending)
+
+def _render_job_result(job_id: str, on_done, polling: bool):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return
+    if polling and job.done:
+        st.rerun()  # Ended (done, failed or cancelled): render once more without polling
+    if job.status in (QUEUED, RUNNING):
+        st.status(f"Advisor is thinking... ({job.status})", state="running", expanded=False)
+    elif job.status == DONE:
+        st.markdown("### 📝 Rebalancing Recommendations")
+        st.markdown(str(job.result))
+        handled = st.session_state.setdefault("handled_jobs", set())
+        if on_done and job.id not in handled:
+            handled.add(job.id)
+            on_done(job)
+    else:
+        st.error(f"Advisor Error: {job.error or job.status}")
@@ -1,26 +1,49 @@
 import streamlit as st
 import pandas as pd
-import os
-from src.utils.db import get_supabase
-from src.portfolio.analytics import calculate_portfolio_metrics
-from src.agents.factory import AdvisorAgent
-from src.tasks import GryphonTasks
-from crewai import Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI
+from src.portfolio.reports import portfolio_content_hash, save_report, encode_report, decode_report
+from src.ui.cache import (get_client, load_portfolios, load_positions, load_report, load_market_as_of,
+                          load_metrics, invalidate_portfolios, invalidate_positions, invalidate_reports)
+from src.ui.jobs import submit_job, render_job_result
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def render_rolling_metrics(rolling: dict):
+    """Charts rolling beta, volatility, Sharpe and drawdown for each window."""
+    labels = {"beta": "Beta", "volatility": "Volatility", "sharpe_ratio": "Sharpe", "drawdown": "Drawdown"}
+    tabs = st.tabs([f"Rolling {label}" for label in labels.values()])
+    for tab, metric in zip(tabs, labels):
+        with tab:
+            chart_df = pd.DataFrame({f"{w}d": frame[metric] for w, frame in rolling.items()})
+            st.line_chart(chart_df.dropna(how="all"))
+
+def render_metrics(metrics: dict, contributions: dict | None = None):
+    """Key metrics, rolling charts and risk contributions of a computed or stored report."""
+    m_col1, m_col2, m_col3, m_col4 = st.columns(4)
+    m_col1.metric("Beta", metrics['beta'])
+    m_col2.metric("Sharpe", metrics['sharpe_ratio'])
+    m_col3.metric("Volatility", metrics['volatility'])
+    m_col4.metric("Max Drawdown", metrics['max_drawdown'])
+    
+    st.caption(f"Total Value: ${metrics['total_value']:,.2f}")
+    
+    # Rolling risk over time, one line per window
+    if metrics.get("rolling"):
+        render_rolling_metrics(metrics["rolling"])
+    
+    if contributions and "positions" in contributions:
+        st.markdown("**Risk Contribution**")
+        st.dataframe(pd.DataFrame(contributions["positions"]).T, use_container_width=True)
+
 def render_portfolio_dashboard(user):
     # ... existing start ...
-    sb = get_supabase()
+    sb = get_client()
     
     st.markdown("## 💼 Portfolio Manager")
     
-    # 1. Fetch Portfolios
+    # 1. Fetch Portfolios (cached across reruns until a write invalidates them)
     try:
-        res = sb.table("portfolios").select("*").eq("user_id", user.id).execute()
-        portfolios = res.data
+        portfolios = load_portfolios(user.id)
     except Exception as e:
         st.error(f"Failed to fetch portfolios: {str(e)}")
         portfolios = []
@@ -45,6 +68,7 @@ def render_portfolio_dashboard(user):
             if st.button("Create"):
                 try:
                     sb.table("portfolios").insert({"user_id": user.id, "name": new_name}).execute()
+                    invalidate_portfolios()
                     st.success("Created!")
                     st.rerun()
                 except Exception as e:
@@ -58,8 +82,7 @@ def render_portfolio_dashboard(user):
     # 2. Manage Positions
     # Fetch positions
     try:
-        pos_res = sb.table("positions").select("*").eq("portfolio_id", selected_portfolio_id).execute()
-        positions = pos_res.data
+        positions = load_positions(selected_portfolio_id)
     except Exception as e:
         st.error(f"Failed to load positions: {str(e)}")
         positions = []
@@ -75,26 +98,48 @@ def render_portfolio_dashboard(user):
             
             # --- RISK METRICS & ADVISOR ---
             if st.button("📊 Calculate Risk Metrics"):
-                with st.spinner("Fetching market data (2y)..."):
-                    holdings_dict = {p['ticker']: float(p['shares']) for p in positions}
-                    metrics = calculate_portfolio_metrics(holdings_dict)
-                    
-                    if "error" in metrics:
-                        st.error(metrics["error"])
-                    else:
+                holdings_dict = {p['ticker']: float(p['shares']) for p in positions}
+                
+                # Unchanged positions + unchanged market data = the stored report is still valid
+                try:
+                    as_of = load_market_as_of()
+                except Exception:
+                    as_of = None
+                content_hash = portfolio_content_hash(holdings_dict, as_of)
+                try:
+                    report = load_report(selected_portfolio_id, content_hash) if as_of is not None else None
+                except Exception:
+                    report = None  # Reports are an optimization; compute if the table is unavailable
+                
+                if report:
+                    metrics, contributions = decode_report(report["risk_metrics"])
+                    st.caption(f"Saved report from {str(report.get('created_at', ''))[:16]} (market data as of {as_of:%Y-%m-%d}).")
+                else:
+                    with st.spinner("Fetching market data (2y)..."):
+                        try:
+                            # Metrics plus which positions the volatility comes from
+                            metrics, contributions = load_metrics(tuple(sorted(holdings_dict.items())), as_of)
+                        except ValueError as e:
+                            metrics, contributions = {"error": str(e)}, None
+                    if "error" not in metrics and as_of is not None:
+                        try:
+                            save_report(sb, selected_portfolio_id, content_hash, encode_report(metrics, contributions))
+                            invalidate_reports()
+                        except Exception as e:
+                            st.warning(f"Could not save report: {str(e)}")
+                
+                if "error" in metrics:
+                    st.error(metrics["error"])
+                else:
+                    if not report:
                         st.success("Calculation Complete")
-                        # Display nicely
-                        m_col1, m_col2, m_col3, m_col4 = st.columns(4)
-                        m_col1.metric("Beta", metrics['beta'])
-                        m_col2.metric("Sharpe", metrics['sharpe_ratio'])
-                        m_col3.metric("Volatility", metrics['volatility'])
-                        m_col4.metric("Max Drawdown", metrics['max_drawdown'])
-                        
-                        st.caption(f"Total Value: ${metrics['total_value']:,.2f}")
-                        
-                        # Store metrics in session state for the Advisor to use
-                        st.session_state["last_metrics"] = metrics
-                        st.session_state["last_holdings"] = holdings_dict
+                    render_metrics(metrics, contributions)
+                    
+                    # Store metrics in session state for the Advisor to use
+                    metrics.pop("rolling", None)
+                    st.session_state["last_metrics"] = metrics
+                    st.session_state["last_holdings"] = holdings_dict
+                    st.session_state["last_report"] = (selected_portfolio_id, content_hash)
             
             st.divider()
             
@@ -107,37 +152,41 @@ def render_portfolio_dashboard(user):
                 )
                 
                 if st.button("Generate Rebalancing Plan"):
-                    with st.status("Advisor is thinking...", expanded=True):
+                    report_portfolio_id, content_hash = st.session_state.get("last_report", (None, None))
+                    try:
+                        saved = load_report(report_portfolio_id, content_hash, risk_profile) if content_hash else None
+                    except Exception:
+                        saved = None
+                    
+                    if saved:
+                        st.session_state.pop("advisor_job", None)
+                        st.markdown("### 📝 Rebalancing Recommendations")
+                        st.markdown(saved["rebalance_recommendation"])
+                        st.caption(f"Saved plan from {str(saved.get('created_at', ''))[:16]} (portfolio and market data unchanged).")
+                    else:
+                        # The Advisor runs on a background worker instead of blocking this session
+                        job = submit_job("rebalance", {
+                            "holdings": st.session_state["last_holdings"],
+                            "metrics": st.session_state["last_metrics"],
+                            "risk_profile": risk_profile,
+                        }, user_id=user.id)
+                        st.session_state["advisor_job"] = (job.id, report_portfolio_id, content_hash, risk_profile)
+                
+                advisor_job = st.session_state.get("advisor_job")
+                if advisor_job and advisor_job[1] == selected_portfolio_id:
+                    job_id, report_portfolio_id, content_hash, job_profile = advisor_job
+                    
+                    def save_plan(job):
+                        if not content_hash:
+                            return
                         try:
-                            # 1. Setup LLM
-                            api_key = os.getenv("GOOGLE_API_KEY")
-                            model_name = os.getenv("GOOGLE_MODEL_NAME", "gemini-1.5-flash")
-                            llm = ChatGoogleGenerativeAI(model=model_name, temperature=0.2, google_api_key=api_key)
-                            
-                            # 2. Setup Agent & Task
-                            advisor_agent = AdvisorAgent(llm).create()
-                            tasks = GryphonTasks()
-                            t_rebalance = tasks.rebalance_task(
-                                agent=advisor_agent,
-                                holdings=st.session_state["last_holdings"],
-                                metrics=st.session_state["last_metrics"],
-                                risk_profile=risk_profile
-                            )
-                            
-                            # 3. Run Crew
-                            crew = Crew(
-                                agents=[advisor_agent],
-                                tasks=[t_rebalance],
-                                verbose=True
-                            )
-                            result = crew.kickoff()
-                            
-                            st.write("Planning Complete.")
-                            st.markdown("### 📝 Rebalancing Recommendations")
-                            st.markdown(result)
-                            
+                            save_report(sb, report_portfolio_id, content_hash, encode_report(job.payload["metrics"]),
+                                        risk_profile=job_profile, recommendation=str(job.result))
+                            invalidate_reports()
                         except Exception as e:
-                            st.error(f"Advisor Error: {str(e)}")
+                            st.warning(f"Could not save plan: {str(e)}")
+                    
+                    render_job_result(job_id, on_done=save_plan)
 
         else:
             st.info("No positions added yet.")
@@ -154,6 +203,7 @@ def render_portfolio_dashboard(user):
                         "ticker": ticker,
                         "shares": shares
                     }).execute()
+                    invalidate_positions()
                     st.success("Added!")
                     st.rerun()
                 except Exception as e:
@@ -166,6 +216,7 @@ def render_portfolio_dashboard(user):
                      try:
                         # naive delete by ticker for this portfolio
                         sb.table("positions").delete().eq("portfolio_id", selected_portfolio_id).eq("ticker", t_to_remove).execute()
+                        invalidate_positions()
                         st.rerun()
                      except Exception as e:
                          st.error(str(e))
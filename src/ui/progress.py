@@ -0,0 +1,70 @@
+import time
+import pandas as pd
+import streamlit as st
+
+from src.utils.progress import ProgressEvent
+
+TOKEN_TAIL = 600        # Characters of the streaming LLM output shown per ticker
+REDRAW_INTERVAL = 0.25  # Seconds between redraws of a ticker's streaming text
+
+class ProgressView:
+    """Live panels for a batch: one status box per ticker with its task and tool activity, then its trace summary."""
+
+    def __init__(self, tickers: list[str]):
+        self.panels = {}
+        for ticker in tickers:
+            status = st.status(f"{ticker}: queued", expanded=len(tickers) <= 2)
+            with status:
+                activity = st.empty()
+                stream = st.empty()
+                trace = st.empty()
+            self.panels[ticker] = {"status": status, "activity": activity, "stream": stream, "trace": trace,
+                                   "lines": [], "tokens": "", "drawn": 0.0}
+        self.log: list[str] = []
+
+    def handle(self, event: ProgressEvent):
+        panel = self.panels.get(event.ticker)
+        if panel is None:
+            return
+        d = event.data
+
+        if event.kind == "llm_token":
+            panel["tokens"] = (panel["tokens"] + d.get("token", ""))[-TOKEN_TAIL:]
+            if event.time - panel["drawn"] >= REDRAW_INTERVAL:
+                panel["stream"].caption(panel["tokens"])
+                panel["drawn"] = event.time
+            return
+
+        line = None
+        if event.kind == "analysis_start":
+            panel["status"].update(label=f"{event.ticker}: running", state="running")
+        elif event.kind == "task_start":
+            line = f"▶️ **{d['task']}** started"
+            panel["status"].update(label=f"{event.ticker}: {d['task']}")
+        elif event.kind == "task_end":
+            line = f"✅ **{d['task']}** finished in {d['duration_s']:.1f}s"
+            panel["tokens"] = ""
+        elif event.kind == "tool_start":
+            line = f"🔧 {d['tool']}({d.get('input', '')})"
+        elif event.kind == "tool_end":
+            flag = " ⚠️" if d.get("error") else ""
+            tokens = f" · {d['tokens']} tok" if "tokens" in d else ""
+            line = f"&nbsp;&nbsp;↳ {d['tool']}: {d['duration_ms']:.0f} ms ({d['cache']}){tokens}{flag}"
+        elif event.kind == "run_trace":
+            rows = pd.DataFrame(d["rows"])
+            if not rows.empty:
+                rows["total_s"] = rows["total_s"].round(2)
+                panel["trace"].dataframe(rows[["kind", "name", "calls", "total_s", "prompt_tokens", "completion_tokens",
+                                               "cache_hits", "errors"]], hide_index=True)
+        elif event.kind == "analysis_end":
+            if d.get("ok"):
+                panel["status"].update(label=f"{event.ticker}: done in {d['duration_s']:.0f}s", state="complete", expanded=False)
+            else:
+                panel["status"].update(label=f"{event.ticker}: failed", state="error")
+                line = f"❌ {d.get('error')}"
+            panel["stream"].empty()
+
+        if line:
+            panel["lines"].append(line)
+            panel["activity"].markdown("  \n".join(panel["lines"][-12:]))
+            self.log.append(f"{time.strftime('%H:%M:%S', time.localtime(event.time))} [{event.ticker}] {line}")
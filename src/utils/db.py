@@ -14,3 +14,20 @@ supabase: Client = create_client(url, key)
 
 def get_supabase() -> Client:
     return supabase
+
+_service_client: Client | None = None
+
+def get_service_supabase() -> Client:
+    """
+    Client authenticated with the service role key, for background processes
+    (job workers, the nightly precompute) that act for every user.
+
+    It bypasses row level security: never use it for requests made by a user.
+    """
+    global _service_client
+    if _service_client is None:
+        service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+        if not service_key:
+            raise ValueError("SUPABASE_SERVICE_ROLE_KEY not found in .env (needed by background jobs)")
+        _service_client = create_client(url, service_key)
+    return _service_client
@@ -0,0 +1,165 @@
+"""
+Buffered, non-blocking event logging into `public.events`.
+
+`log_event` only appends to an in-memory queue; a background thread writes the
+events in bulk inserts, either when `batch_size` events are waiting or when
+`flush_interval` seconds have passed. When the queue is full new events are
+dropped (and counted) rather than blocking the caller.
+"""
+import atexit
+import contextvars
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+# User the events logged in the current context belong to (copied into worker threads by run_many)
+_current_user: contextvars.ContextVar[str | None] = contextvars.ContextVar("gryphon_event_user", default=None)
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
+_STOP = object()
+
+class EventLogger:
+    """
+    Collects events in a bounded queue and bulk-inserts them from a daemon thread.
+
+    Args:
+        client: Supabase client (or anything with `.table(name).insert(rows).execute()`).
+        table: Target table.
+        batch_size: Insert as soon as this many events are buffered.
+        flush_interval: Maximum seconds an event waits in the buffer.
+        max_queue: Events held in memory before new ones are dropped.
+    """
+
+    def __init__(self, client, table: str = "events", batch_size: int = 50,
+                 flush_interval: float = 2.0, max_queue: int = 10_000):
+        self.client = client
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._counts = {"logged": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name="gryphon-events", daemon=True)
+        self._thread.start()
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counts[name] += n
+
+    def log(self, event_type: str, details: dict | None = None, user_id: str | None = None) -> bool:
+        """Queues an event without blocking; returns False if it was dropped."""
+        if self._closed:
+            self._count("dropped")
+            return False
+        row = {
+            "event_type": event_type,
+            "details": details or {},
+            "user_id": user_id or _current_user.get(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("logged")
+        return True
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Writes everything queued so far; returns False if that did not finish within `timeout`."""
+        if not self._thread.is_alive():
+            return False
+        request = _Flush()
+        self._queue.put(request)  # Control messages may wait for space; events never do
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float | None = 5.0):
+        """Flushes the buffer and stops the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "queued": self._queue.qsize()}
+
+    def _write(self, batch: list[dict]):
+        if not batch:
+            return
+        try:
+            self.client.table(self.table).insert(batch).execute()
+            self._count("written", len(batch))
+            self._count("batches")
+        except Exception as e:
+            # Monitoring must never break the app: count the loss and carry on
+            self._count("failed", len(batch))
+            print(f"Warning: could not write {len(batch)} events: {e}")
+        batch.clear()
+
+    def _worker(self):
+        batch: list[dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # Time-based flush
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _Flush):
+                self._write(batch)
+                deadline = None
+                item.done.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            due = deadline is not None and time.monotonic() >= deadline
+            if len(batch) >= self.batch_size or (due and batch):
+                self._write(batch)
+                deadline = None
+
+_logger: EventLogger | None = None
+_logger_lock = threading.Lock()
+
+def configure_event_logger(client, **kwargs) -> EventLogger:
+    """Starts the process-wide logger writing through `client` (once; later calls return it)."""
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            _logger = EventLogger(client, **kwargs)
+            atexit.register(_logger.close)
+        return _logger
+
+def get_event_logger() -> EventLogger | None:
+    return _logger
+
+def log_event(event_type: str, user_id: str | None = None, **details: Any) -> bool:
+    """Queues an event on the process-wide logger; a no-op until one is configured."""
+    logger = _logger
+    if logger is None:
+        return False
+    return logger.log(event_type, details, user_id=user_id)
+
+@contextmanager
+def event_user(user_id: str | None) -> Iterator[None]:
+    """Attributes the events logged inside the block to `user_id`."""
+    token = _current_user.set(user_id)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from .paths import get_data_dir
+
+# Outcome of this thread's latest lookup. LangChain looks up the cache and then
+# reports the call's end on the same thread, so tracing can tell hits apart.
+_lookups = threading.local()
+
+def consume_cache_hit() -> bool | None:
+    """True/False if the latest lookup on this thread hit/missed (None if none since the last call)."""
+    hit = getattr(_lookups, "hit", None)
+    _lookups.hit = None
+    return hit
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Disk-backed LLM response cache, plugged into LangChain chat models via `cache=`.
+
+    Entries are keyed on the model's `llm_string` (model name, temperature and the
+    other call parameters) plus the full prompt. Entries older than `ttl` seconds
+    are ignored, and the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float = 86400, max_entries: int = 5000):
+        self.path = str(path or get_data_dir() / "llm_cache.sqlite")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                create table if not exists llm_cache (
+                    key text primary key,
+                    response text not null,
+                    created_at real not null,
+                    last_access real not null
+                )
+            """)
+            conn.execute("create index if not exists llm_cache_last_access on llm_cache (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("select response, created_at from llm_cache where key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute("update llm_cache set last_access = ? where key = ?", (now, key))
+            else:
+                if row:
+                    conn.execute("delete from llm_cache where key = ?", (key,))
+                row = None
+
+        _lookups.hit = row is not None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "insert or replace into llm_cache (key, response, created_at, last_access) values (?, ?, ?, ?)",
+                (self._key(prompt, llm_string), dumps(return_val), now, now),
+            )
+            # Size-based eviction: keep only the most recently used entries
+            conn.execute("""
+                delete from llm_cache where key in (
+                    select key from llm_cache order by last_access desc limit -1 offset ?
+                )
+            """, (self.max_entries,))
+
+    def clear(self, **kwargs) -> None:
+        with self._connect() as conn:
+            conn.execute("delete from llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def describe(self) -> str:
+        s = self.stats()
+        return f"LLM cache: {s['hits']} hits / {s['hits'] + s['misses']} calls ({s['hit_rate']:.0%})"
+
+_cache: SQLiteLLMCache | None = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> SQLiteLLMCache | None:
+    """Returns the process-wide LLM cache, or None if disabled with GRYPHON_LLM_CACHE=0."""
+    global _cache
+    if os.getenv("GRYPHON_LLM_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLiteLLMCache(ttl=float(os.getenv("GRYPHON_LLM_CACHE_TTL", 86400)))
+        return _cache
@@ -0,0 +1,147 @@
+"""
+In-process stand-in for the Supabase client, for tests and offline runs.
+
+It implements the slice of the postgrest query builder Gryphon uses
+(`table(...).select/insert/update/delete`, `eq`, `in_`, `is_`, `order`,
+`limit`, `range`, `execute`) plus `rpc` for functions registered with
+`register_rpc`. Rows live in plain dicts, and `calls` records every executed
+request.
+"""
+import copy
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+@dataclass
+class MemoryResponse:
+    data: list[dict]
+    count: int | None = None
+
+class _Query:
+    def __init__(self, db: "MemorySupabase", table: str):
+        self.db = db
+        self.table_name = table
+        self.action = "select"
+        self.payload: list[dict] | dict | None = None
+        self.columns = "*"
+        self.count = None
+        self.head = False
+        self.filters: list[Callable[[dict], bool]] = []
+        self.ordering: list[tuple[str, bool]] = []
+        self.max_rows: int | None = None
+        self.offset = 0
+
+    def select(self, columns: str = "*", count: str | None = None, head: bool = False) -> "_Query":
+        self.columns, self.count, self.head = columns, count, head
+        return self
+
+    def insert(self, rows: list[dict] | dict) -> "_Query":
+        self.action, self.payload = "insert", rows
+        return self
+
+    def update(self, values: dict) -> "_Query":
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self) -> "_Query":
+        self.action = "delete"
+        return self
+
+    def eq(self, column: str, value) -> "_Query":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values) -> "_Query":
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def is_(self, column: str, value) -> "_Query":
+        value = {"null": None, "true": True, "false": False}.get(value, value)
+        self.filters.append(lambda row: row.get(column) is value)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "_Query":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self.max_rows = n
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self.offset, self.max_rows = start, end - start + 1
+        return self
+
+    def _matches(self, row: dict) -> bool:
+        return all(f(row) for f in self.filters)
+
+    def _project(self, row: dict) -> dict:
+        if self.columns.strip() == "*":
+            return copy.deepcopy(row)
+        return {c.strip(): copy.deepcopy(row.get(c.strip())) for c in self.columns.split(",")}
+
+    def execute(self) -> MemoryResponse:
+        return self.db._execute(self)
+
+class MemorySupabase:
+    """Dict-backed replacement for `supabase.Client`, safe to share between threads."""
+
+    def __init__(self, tables: dict[str, list[dict]] | None = None):
+        self.tables: dict[str, list[dict]] = {name: [dict(r) for r in rows] for name, rows in (tables or {}).items()}
+        self.functions: dict[str, Callable[..., Any]] = {}
+        self.calls: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def register_rpc(self, name: str, fn: Callable[..., Any]):
+        """Makes `rpc(name, params)` call `fn(db, **params)`."""
+        self.functions[name] = fn
+
+    def rpc(self, name: str, params: dict | None = None):
+        db = self
+
+        class _Call:
+            def execute(self) -> MemoryResponse:
+                if name not in db.functions:
+                    raise LookupError(f"function public.{name} does not exist")
+                with db._lock:
+                    db.calls.append(("rpc", name))
+                result = db.functions[name](db, **(params or {}))
+                return MemoryResponse(data=result if isinstance(result, list) else [result])
+
+        return _Call()
+
+    def _execute(self, query: _Query) -> MemoryResponse:
+        with self._lock:
+            self.calls.append((query.action, query.table_name))
+            rows = self.tables.setdefault(query.table_name, [])
+
+            if query.action == "insert":
+                now = datetime.now(timezone.utc).isoformat()
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                inserted = [{"id": str(uuid.uuid4()), "created_at": now, **copy.deepcopy(r)} for r in payload]
+                rows.extend(inserted)
+                return MemoryResponse(data=copy.deepcopy(inserted))
+
+            matched = [r for r in rows if query._matches(r)]
+            if query.action == "update":
+                for r in matched:
+                    r.update(copy.deepcopy(query.payload))
+                return MemoryResponse(data=copy.deepcopy(matched))
+            if query.action == "delete":
+                self.tables[query.table_name] = [r for r in rows if not query._matches(r)]
+                return MemoryResponse(data=copy.deepcopy(matched))
+
+            for column, desc in reversed(query.ordering):
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            total = len(matched)
+            matched = matched[query.offset:]
+            if query.max_rows is not None:
+                matched = matched[:query.max_rows]
+            data = [] if query.head else [query._project(r) for r in matched]
+            return MemoryResponse(data=data, count=total if query.count else None)
@@ -0,0 +1,13 @@
+import os
+from pathlib import Path
+
+def get_data_dir(*parts: str) -> Path:
+    """Returns (and creates) a directory under the local Gryphon data root.
+
+    The root defaults to `.gryphon/` in the working directory and can be moved
+    with the GRYPHON_DATA_DIR environment variable.
+    """
+    root = Path(os.getenv("GRYPHON_DATA_DIR", ".gryphon"))
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,156 @@
+"""
+Structured progress events for live views of a running analysis.
+
+A `ProgressRoute` belongs to one pooled agent set. While the set is checked out
+for a run, the route forwards the events of that run to a callback: task
+start/finish, tool calls with timings and streamed LLM tokens, and records
+spans into the run's RunTrace (see tracing.py). Tools and the LLM handler find
+their route through their own identity, not through thread-local state, so
+events also arrive from the threads CrewAI starts for async tasks.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from .tracing import RunTrace, Span, payload_bytes, record_span
+
+@dataclass
+class ProgressEvent:
+    kind: str  # analysis_start/end, task_start/end, tool_start/end, llm_token, run_trace
+    ticker: str | None = None
+    data: dict = field(default_factory=dict)
+    time: float = field(default_factory=time.time)
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+class ProgressRoute:
+    """Forwards events to the callback of the run currently using an agent set."""
+
+    def __init__(self):
+        self.callback: ProgressCallback | None = None
+        self.ticker: str | None = None
+        self.trace: RunTrace | None = None
+
+    def emit(self, kind: str, **data: Any):
+        callback = self.callback
+        if callback is None:
+            return
+        try:
+            callback(ProgressEvent(kind, self.ticker, data))
+        except Exception:
+            pass  # A broken listener must never break the analysis
+
+    def record(self, span: Span):
+        """Records a span of the current run (process-wide metrics and the run's trace)."""
+        span.ticker = span.ticker or self.ticker
+        record_span(span, self.trace)
+
+    @contextmanager
+    def attach(self, callback: ProgressCallback | None, ticker: str | None,
+               trace: RunTrace | None = None) -> Iterator["ProgressRoute"]:
+        self.callback, self.ticker, self.trace = callback, ticker, trace
+        try:
+            yield self
+        finally:
+            self.callback, self.ticker, self.trace = None, None, None
+
+# id(tool) -> (tool, route); the tool is held so its id cannot be reused while bound
+_routes: dict[int, tuple[Any, ProgressRoute]] = {}
+_routes_lock = threading.Lock()
+
+def bind_route(objects: Iterable[Any], route: ProgressRoute):
+    with _routes_lock:
+        for obj in objects:
+            _routes[id(obj)] = (obj, route)
+
+def unbind_route(objects: Iterable[Any]):
+    with _routes_lock:
+        for obj in objects:
+            _routes.pop(id(obj), None)
+
+def route_for(obj: Any) -> ProgressRoute | None:
+    entry = _routes.get(id(obj))
+    return entry[1] if entry and entry[0] is obj else None
+
+_handler_class = None
+
+def _token_usage(response) -> tuple[int, int]:
+    """(prompt, completion) tokens of a LangChain LLMResult, from the messages or the provider output."""
+    prompt = completion = 0
+    for generations in response.generations:
+        for g in generations:
+            usage = getattr(getattr(g, "message", None), "usage_metadata", None) or {}
+            prompt += usage.get("input_tokens", 0)
+            completion += usage.get("output_tokens", 0)
+    if not (prompt or completion):
+        output = response.llm_output or {}
+        usage = output.get("token_usage") or output.get("usage_metadata") or {}
+        prompt = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+        completion = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    return prompt, completion
+
+def llm_progress_callback(route: ProgressRoute, name: str = "llm"):
+    """LangChain callback handler streaming the LLM's tokens to `route` and recording a span per call."""
+    global _handler_class
+    if _handler_class is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class ProgressCallbackHandler(BaseCallbackHandler):
+            def __init__(self, route: ProgressRoute, name: str):
+                self.route = route
+                self.name = name
+                self._calls: dict[Any, tuple[float, int]] = {}  # run_id -> (start, prompt bytes)
+
+            def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs: Any) -> None:
+                from .llm_cache import consume_cache_hit
+
+                consume_cache_hit()  # Forget lookups of earlier calls on this thread
+                size = sum(payload_bytes(m.content) for batch in messages for m in batch)
+                self._calls[run_id] = (time.perf_counter(), size)
+
+            def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs: Any) -> None:
+                from .llm_cache import consume_cache_hit
+
+                consume_cache_hit()
+                self._calls[run_id] = (time.perf_counter(), sum(payload_bytes(p) for p in prompts))
+
+            def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+                if token:
+                    self.route.emit("llm_token", token=token)
+
+            def on_llm_end(self, response, *, run_id=None, **kwargs: Any) -> None:
+                from .llm_cache import consume_cache_hit
+
+                start, sent = self._calls.pop(run_id, (time.perf_counter(), 0))
+                hit = consume_cache_hit()
+                prompt, completion = (0, 0) if hit else _token_usage(response)
+                text = "".join(g.text for generations in response.generations for g in generations)
+                self.route.record(Span("llm", self.name, time.perf_counter() - start, attrs={
+                    "input_bytes": sent, "output_bytes": payload_bytes(text),
+                    "prompt_tokens": prompt, "completion_tokens": completion,
+                    **({"cache": "hit" if hit else "miss"} if hit is not None else {}),
+                }))
+
+            def on_llm_error(self, error, *, run_id=None, **kwargs: Any) -> None:
+                start, sent = self._calls.pop(run_id, (time.perf_counter(), 0))
+                self.route.record(Span("llm", self.name, time.perf_counter() - start,
+                                       attrs={"input_bytes": sent, "error": True}))
+
+        _handler_class = ProgressCallbackHandler
+    return _handler_class(route, name)
+
+def with_progress(llm, route: ProgressRoute, name: str = "llm"):
+    """
+    Copy of a LangChain chat model that streams tokens to `route` and traces its calls as `name`.
+
+    The copy is shallow, so the underlying API client (and its connections) stay
+    shared. Models that cannot be copied this way are returned unchanged.
+    """
+    if not hasattr(llm, "model_copy"):
+        return llm
+    update = {"callbacks": [*(getattr(llm, "callbacks", None) or []), llm_progress_callback(route, name)]}
+    if "streaming" in type(llm).model_fields:
+        update["streaming"] = True
+    return llm.model_copy(update=update)
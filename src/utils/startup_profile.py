@@ -0,0 +1,80 @@
+"""
+Per-module import cost of the CLI, measured with `python -X importtime`.
+
+The profile runs in a fresh interpreter so nothing is already cached in
+`sys.modules`. It has two phases: the imports `main.py` pays before it does any
+work, and the imports that are deferred until the first crew run.
+"""
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Modules main.py loads lazily once it has tickers to analyze
+RUN_MODULES = ("src.main_crew", "crewai", "langchain_google_genai", "src.tasks", "src.agents.factory", "src.utils.llm_cache")
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Parses the `import time: self | cumulative | module` lines written by -X importtime."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            timings.append(ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            ))
+        except ValueError:
+            continue
+    return timings
+
+def measure_imports(statement: str) -> list[ImportTiming]:
+    """Runs `statement` in a fresh interpreter from the repo root and returns its import timings."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"Profiling exited with status {proc.returncode}")
+    return parse_importtime(proc.stderr)
+
+def _format_phase(title: str, timings: list[ImportTiming], top: int) -> list[str]:
+    top_depth = min((t.depth for t in timings), default=0)
+    roots = [t for t in timings if t.depth == top_depth]
+    total_ms = sum(t.cumulative_us for t in roots) / 1000
+    lines = [f"{title}: {total_ms:,.1f} ms over {len(timings)} modules", f"  {'cumulative':>12} {'self':>10}  module"]
+    for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {t.cumulative_us / 1000:>9,.1f} ms {t.self_us / 1000:>7,.1f} ms  {'  ' * t.depth}{t.module}")
+    return lines
+
+def startup_report(top: int = 25) -> str:
+    """Human-readable report of the startup and first-run import costs, heaviest modules first."""
+    # Leave out what the bare interpreter imports anyway (site, encodings, ...)
+    baseline = {t.module for t in measure_imports("pass")}
+    startup = [t for t in measure_imports("import main") if t.module not in baseline]
+    lines = _format_phase("Startup (import main)", startup, top)
+    lines.append("")
+
+    try:
+        full = measure_imports("import main; " + "; ".join(f"import {m}" for m in RUN_MODULES))
+    except RuntimeError as e:
+        lines.append(f"Deferred to first crew run: could not import ({e})")
+        return "\n".join(lines)
+
+    loaded_at_startup = baseline | {t.module for t in startup}
+    deferred = [t for t in full if t.module not in loaded_at_startup]
+    lines += _format_phase("Deferred to first crew run", deferred, top)
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+"""
+Latency, payload and token tracing for tools, agent tasks and LLM calls.
+
+Every traced call becomes a `Span`. Spans go to the process-wide
+`MetricsRegistry` (exported in the Prometheus text format, to a file or a small
+HTTP endpoint) and, when the call belongs to a crew run, to that run's
+`RunTrace`, which prints a per-run summary table. A run's trace hangs off its
+ProgressRoute, so tools and LLM callbacks find it the same way they find the
+route: through their own identity, from whichever thread they run on.
+
+    GRYPHON_METRICS_FILE=.gryphon/metrics-{pid}.prom   # rewritten after every run
+    GRYPHON_METRICS_PORT=9464                          # app: serve /metrics
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+SPAN_KINDS = ("run", "task", "tool", "llm")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+
+@dataclass
+class Span:
+    kind: str           # run, task, tool or llm
+    name: str           # run type, task, tool class or agent
+    duration_s: float
+    ticker: str | None = None
+    start: float = 0.0  # Wall clock (time.time()) at the start
+    attrs: dict[str, Any] = field(default_factory=dict)  # input_bytes, output_bytes, output_tokens (tools),
+                                                         # prompt_tokens, completion_tokens (LLM), cache, error
+
+    def __post_init__(self):
+        if not self.start:
+            self.start = time.time() - self.duration_s
+
+def payload_bytes(value: Any) -> int:
+    return len(str(value).encode("utf-8", errors="replace")) if value is not None else 0
+
+class RunTrace:
+    """Spans of one crew run (an analysis or a rebalancing plan)."""
+
+    def __init__(self, name: str, ticker: str | None = None):
+        self.name = name
+        self.ticker = ticker
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> list[dict]:
+        """One row per (kind, name): calls, wall time, payload sizes, tokens and cache hits."""
+        rows: dict[tuple[str, str], dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            row = rows.setdefault((s.kind, s.name), {
+                "kind": s.kind, "name": s.name, "calls": 0, "total_s": 0.0, "max_s": 0.0,
+                "input_bytes": 0, "output_bytes": 0, "output_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cache_hits": 0, "errors": 0,
+            })
+            row["calls"] += 1
+            row["total_s"] += s.duration_s
+            row["max_s"] = max(row["max_s"], s.duration_s)
+            for key in ("input_bytes", "output_bytes", "output_tokens", "prompt_tokens", "completion_tokens"):
+                row[key] += s.attrs.get(key, 0)
+            row["cache_hits"] += s.attrs.get("cache") == "hit"
+            row["errors"] += bool(s.attrs.get("error"))
+        order = {kind: i for i, kind in enumerate(SPAN_KINDS)}
+        return sorted(rows.values(), key=lambda r: (order.get(r["kind"], len(order)), -r["total_s"]))
+
+    def format_table(self) -> str:
+        header = f"{'kind':<5} {'name':<26} {'calls':>5} {'total s':>8} {'max s':>7} {'in KB':>7} {'out KB':>7} " \
+                 f"{'out tok':>7} {'prompt tok':>10} {'compl tok':>9} {'hits':>4} {'err':>3}"
+        lines = [f"Trace: {self.name}" + (f" {self.ticker}" if self.ticker else ""), header, "-" * len(header)]
+        for r in self.summary():
+            lines.append(f"{r['kind']:<5} {r['name'][:26]:<26} {r['calls']:>5} {r['total_s']:>8.2f} {r['max_s']:>7.2f} "
+                         f"{r['input_bytes'] / 1024:>7.1f} {r['output_bytes'] / 1024:>7.1f} {r['output_tokens']:>7} "
+                         f"{r['prompt_tokens']:>10} {r['completion_tokens']:>9} {r['cache_hits']:>4} {r['errors']:>3}")
+        return "\n".join(lines)
+
+class MetricsRegistry:
+    """Process-wide span aggregates, rendered in the Prometheus text exposition format."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._durations: dict[tuple[str, str], list] = {}  # (kind, name) -> [bucket counts, sum, count]
+        self._counters: dict[tuple[str, tuple], float] = {}  # (metric, label pairs) -> value
+
+    def _inc(self, metric: str, value: float = 1, **labels: str):
+        key = (metric, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, span: Span):
+        a = span.attrs
+        with self._lock:
+            hist = self._durations.setdefault((span.kind, span.name), [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if span.duration_s <= bound:
+                    hist[0][i] += 1
+            hist[1] += span.duration_s
+            hist[2] += 1
+
+            labels = {"kind": span.kind, "name": span.name}
+            if a.get("error"):
+                self._inc("gryphon_span_errors_total", **labels)
+            for direction in ("input", "output"):
+                if a.get(f"{direction}_bytes"):
+                    self._inc("gryphon_span_payload_bytes_total", a[f"{direction}_bytes"], direction=direction, **labels)
+            if a.get("output_tokens"):
+                self._inc("gryphon_tool_output_tokens_total", a["output_tokens"], **labels)
+            if a.get("cache"):
+                self._inc("gryphon_cache_requests_total", result=a["cache"], **labels)
+            for kind in ("prompt", "completion"):
+                if a.get(f"{kind}_tokens"):
+                    self._inc("gryphon_llm_tokens_total", a[f"{kind}_tokens"], agent=span.name, type=kind)
+
+    def render(self) -> str:
+        help_text = {
+            "gryphon_span_errors_total": "Traced calls that failed.",
+            "gryphon_span_payload_bytes_total": "Bytes passed into and returned from traced calls.",
+            "gryphon_cache_requests_total": "Cache outcome of tool and LLM calls.",
+            "gryphon_llm_tokens_total": "LLM tokens used, by agent (cache hits excluded).",
+            "gryphon_tool_output_tokens_total": "Estimated tokens of tool outputs (prompt input of the next LLM call).",
+        }
+        with self._lock:
+            durations = {k: (list(v[0]), v[1], v[2]) for k, v in self._durations.items()}
+            counters = dict(self._counters)
+
+        out = ["# HELP gryphon_span_duration_seconds Wall time of traced runs, tasks, tools and LLM calls.",
+               "# TYPE gryphon_span_duration_seconds histogram"]
+        for (kind, name), (counts, total, count) in sorted(durations.items()):
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            for bound, n in zip(self.buckets, counts):
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                out.append(f'gryphon_span_duration_seconds_bucket{{{labels},le="{le}"}} {n}')
+            out.append(f"gryphon_span_duration_seconds_sum{{{labels}}} {total:.6f}")
+            out.append(f"gryphon_span_duration_seconds_count{{{labels}}} {count}")
+
+        for metric in help_text:
+            series = sorted((labels, v) for (m, labels), v in counters.items() if m == metric)
+            if not series:
+                continue
+            out += [f"# HELP {metric} {help_text[metric]}", f"# TYPE {metric} counter"]
+            for labels, value in series:
+                label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                out.append(f"{metric}{{{label_text}}} {value:g}")
+        return "\n".join(out) + "\n"
+
+    def write(self, path: str):
+        """Writes the metrics atomically (for node_exporter's textfile collector or a sidecar)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._counters.clear()
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+def record_span(span: Span, trace: RunTrace | None = None):
+    """Adds a span to the process-wide metrics and, if given, to its run's trace."""
+    _registry.observe(span)
+    if trace is not None:
+        trace.add(span)
+
+def flush_metrics():
+    """Rewrites GRYPHON_METRICS_FILE (if set; `{pid}` is replaced by the process id)."""
+    path = os.getenv("GRYPHON_METRICS_FILE")
+    if not path:
+        return
+    try:
+        _registry.write(path.format(pid=os.getpid()))
+    except Exception as e:
+        print(f"Warning: could not write metrics to {path}: {e}")
+
+_server: ThreadingHTTPServer | None = None
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serves the registry at http://host:port/metrics from a daemon thread (once per process)."""
+    global _server
+    if _server is not None:
+        return _server
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = _registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a log line each
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=_server.serve_forever, name="gryphon-metrics", daemon=True).start()
+    return _server